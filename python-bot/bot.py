@@ -2,11 +2,31 @@ import discord
 from discord.ext import commands
 import os
 import inspect
+from utils import database
+from utils.user_cache import user_cache
+from utils.cooldowns import cooldowns
+from utils.buffs import buffs
+from utils.maintenance import maintenance
+from utils.leaderboard import top_balances
+from utils import collection_stats
+from utils import items
+from utils import migrations
 
 # --- BOT SETUP ---
 intents = discord.Intents.all()
 
-bot = commands.Bot(
+
+class ShadowMilkBot(commands.Bot):
+    async def close(self):
+        # cogs are unloaded by super().close(), so nothing queues a write after this
+        await super().close()
+        await cooldowns.close()
+        await buffs.close()
+        await maintenance.close()
+        await database.shutdown()
+
+
+bot = ShadowMilkBot(
     command_prefix=["!", "sm ", "/"],  # Keep "!" for legacy commands if needed
     intents=intents,
     help_command=None
@@ -51,6 +71,11 @@ async def on_ready():
     )
     await bot.change_presence(activity=activity)
 
+    # bring every database to the current schema before any cog touches it
+    await migrations.run()
+    await items.prepare()
+    maintenance.start()
+
     print("\n📦 Loading cogs...")
     for folder in os.listdir("python-bot/cogs"):
         if folder.endswith(".py") and not folder.startswith("__"):
@@ -81,6 +106,49 @@ async def sync(ctx):
         await ctx.send(f"<:SMCx:1432661563470254172> Sync failed: {e}")
 
 
+@bot.command()
+@commands.is_owner()
+async def cachestats(ctx):
+    """Show user cache hit rate and memory use (bot owner only)"""
+    s = user_cache.stats()
+    await ctx.send(
+        f"User cache: {s['entries']} entries, {s['bytes'] / 1024:.1f}/{s['max_bytes'] / 1024:.0f} KiB, "
+        f"{s['hits']} hits / {s['misses']} misses ({s['hit_rate'] * 100:.1f}%), {s['evictions']} evictions"
+    )
+
+
+@bot.command()
+@commands.is_owner()
+async def lbcheck(ctx):
+    """Compare the in-memory balance leaderboard with the database (bot owner only)"""
+    problems = await top_balances.check_consistency()
+    if not problems:
+        return await ctx.send(f"<a:SMCcheck:1367520031914590269> Leaderboard matches the database (top {top_balances.k}).")
+    await ctx.send("⚠️ Leaderboard mismatch:\n" + "\n".join(problems[:10]))
+
+
+@bot.command()
+@commands.is_owner()
+async def rebuildstats(ctx):
+    """Recompute every user's collection stats from the cookies table (bot owner only)"""
+    rows = await collection_stats.rebuild()
+    await ctx.send(f"<a:SMCcheck:1367520031914590269> Rebuilt collection stats ({rows} rows).")
+
+
+@bot.command(name="maintenance")
+@commands.is_owner()
+async def run_maintenance(ctx, *jobs: str):
+    """Run database maintenance jobs now and show their timings (bot owner only)"""
+    unknown = [name for name in jobs if name not in maintenance.jobs]
+    if unknown:
+        return await ctx.send(f"<:SMCx:1432661563470254172> Unknown job(s): {', '.join(unknown)}. "
+                              f"Jobs: {', '.join(maintenance.jobs)}")
+    await ctx.send("<a:SMCloading:1433000133179736186> Running maintenance...")
+    # naming a job runs it as an owner action: `maintenance vacuum` may convert a file with a full VACUUM
+    report = await maintenance.run(list(jobs) or None, manual=bool(jobs))
+    await ctx.send("\n".join(f"**{name}** ({seconds:.2f}s): {summary}" for name, seconds, summary in report))
+
+
 # --- FakeInteraction for text commands ---
 class FakeInteraction:
     def __init__(self, message, bot=None):
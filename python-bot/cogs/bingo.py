@@ -4,14 +4,13 @@ from discord.ext import commands
 from discord.ui import View, Button
 import random
 import asyncio
-import aiosqlite
 import io
 
-from python-bot.utils.bingo_card import generate_bingo_card, generate_card_image
+from utils.bingo_card import generate_bingo_card, generate_card_image
+from utils import accounts
 
 REWARD_LINE = 500
 REWARD_FILL = 5000
-DATABASE_PATH = "python-bot/data/economy.db"
 
 
 class Bingo(commands.Cog):
@@ -325,14 +324,7 @@ def check_full(marked):
 
 async def award_loD(user_id: int, amount: int):
     try:
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            await db.execute(
-                "INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, 0)", (user_id,)
-            )
-            await db.execute(
-                "UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id)
-            )
-            await db.commit()
+        await accounts.add_balance(user_id, amount)
     except Exception as e:
         print("Failed to award Light of Deceit:", e)
 
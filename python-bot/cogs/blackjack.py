@@ -2,18 +2,24 @@ import discord
 from discord.ext import commands
 import random
 import asyncio
+from utils.buffs import buffs
+from utils.cooldowns import cooldowns, command_key, format_remaining
 
 CURRENCY = "<:LoD:1411031656055177276>"
 TAROT = "<a:tarot_card:1376843676860547163>"
+BLACKJACK_COOLDOWN = 60
 
 class Blackjack(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @commands.hybrid_command(name="blackjack", description="Play Blackjack for Light of Deceit!")
-    @commands.cooldown(1, 60, commands.BucketType.user)
     async def blackjack(self, ctx, bet: int):
         """Simple emoji Blackjack game with tarot vibes."""
+        remaining = cooldowns.check(command_key(ctx.author.id, "blackjack"), BLACKJACK_COOLDOWN)
+        if remaining:
+            return await ctx.send(f"⏳ **Cooldown!** You can use this command again in **{format_remaining(remaining)}**.")
+
         from cogs.economy import Economy  # reuse balance system
         econ: Economy = ctx.bot.get_cog("Economy")
 
@@ -98,14 +104,12 @@ class Blackjack(commands.Cog):
         await ctx.send(embed=embed)
         
         # Check Orchid Locket buff
-        async with aiosqlite.connect("economy.db") as db:
-            async with db.execute("SELECT value FROM active_buffs WHERE user_id = ? AND type = 'blackjack_luck' AND expires_at > strftime('%s','now')", (ctx.author.id,)) as cur:
-                row = await cur.fetchone()
-                if row and random.random() < row[0]:
-                    # Force a win
-                    await econ.add_balance(ctx.author.id, bet)
-                    embed = discord.Embed(title="🌸 Orchid Luck Shines", description=f"You won {CURRENCY}**{bet}** thanks to the Orchid Locket’s grace!", color=0x22BB33)
-                    return await ctx.send(embed=embed)
+        luck = buffs.get(ctx.author.id, "blackjack_luck")
+        if luck and random.random() < luck:
+            # Force a win
+            await econ.add_balance(ctx.author.id, bet)
+            embed = discord.Embed(title="🌸 Orchid Luck Shines", description=f"You won {CURRENCY}**{bet}** thanks to the Orchid Locket’s grace!", color=0x22BB33)
+            return await ctx.send(embed=embed)
 
 
 async def setup(bot):
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 from datetime import datetime
+from utils.database import connection, CONFESSIONS_DB
 
 class Confess(commands.Cog):
     def __init__(self, bot):
@@ -27,15 +27,7 @@ class Confess(commands.Cog):
                         ephemeral=True
                     )
 
-                async with aiosqlite.connect("python-bot/data/confessions.db") as db:
-                    await db.execute("""
-                        CREATE TABLE IF NOT EXISTS confessions (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            user_id INTEGER,
-                            confession TEXT,
-                            timestamp TEXT
-                        )
-                    """)
+                async with connection(CONFESSIONS_DB) as db:
                     await db.execute(
                         "INSERT INTO confessions (user_id, confession, timestamp) VALUES (?, ?, ?)",
                         (
@@ -1,118 +1,38 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from discord.ui import View, Button
-import aiosqlite
 import math
 import time
-from utils.gacha_sim import RARITY_POOLS, COOKIE_EMOJIS
+from utils.gacha_sim import COOKIE_EMOJIS
+from utils import cookie_catalog
+from utils import collection_stats
+from utils import cookie_store
+from utils.pull_history import last_pulled
+from utils.paginator import LazyPaginator
 
 # User-provided emojis
 LOCKED_EMOJI = "<:sm_lock:1439610863911829627>"
 UNLOCKED_EMOJI = "<:sm_unlock:1439610901912354906>"
 
-LEFT_ARROW = "<:arrowleft:1433000307452940309>"
-RIGHT_ARROW = "<:arrowright:1433000252306100294>"
-
-# Rarity order rarest -> common
-RARITY_ORDER = [
-    "Ancient",
-    "Beast",
-    "Legendary",
-    "SuperEpic",
-    "Epic",
-    "Rare",
-    "Common"
-]
-
 ITEMS_PER_PAGE = 9  # 3x3 grid
 
 
-class _CookiesPaginator(View):
-    def __init__(self, bot, pages, author_id):
-        super().__init__(timeout=180)
-        self.bot = bot
-        self.pages = pages
-        self.author_id = author_id
-        self.current = 0
-
-        self.left = Button(style=discord.ButtonStyle.secondary, emoji=LEFT_ARROW)
-        self.left.callback = self.on_left
-        self.add_item(self.left)
-
-        self.right = Button(style=discord.ButtonStyle.secondary, emoji=RIGHT_ARROW)
-        self.right.callback = self.on_right
-        self.add_item(self.right)
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.author_id:
-            await interaction.response.send_message(
-                "Only the command invoker may use these buttons.",
-                ephemeral=True
-            )
-            return False
-        return True
-
-    async def on_left(self, interaction: discord.Interaction):
-        self.current = (self.current - 1) % len(self.pages)
-        await interaction.response.edit_message(embed=self.pages[self.current], view=self)
-
-    async def on_right(self, interaction: discord.Interaction):
-        self.current = (self.current + 1) % len(self.pages)
-        await interaction.response.edit_message(embed=self.pages[self.current], view=self)
-
-
 class Cookies(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    def _build_all_cookie_list(self):
-        all_cookies = []
-        for rarity in RARITY_ORDER:
-            pool = RARITY_POOLS.get(rarity, [])
-            for name in sorted(pool, key=lambda s: s.lower()):
-                all_cookies.append((rarity, name))
-        return all_cookies
+    def _build_all_cookie_list(self, sort: str = "rarity"):
+        """Every (rarity, name), already in /cookies order for the rarity and alpha sorts."""
+        return cookie_catalog.BY_ALPHA if sort == "alpha" else cookie_catalog.BY_RARITY
 
     async def _fetch_user_cookies(self, user_id: int):
-        user_cookie_map = {}
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("""
-                SELECT cookie_name, soulstones, stars, ascension_level, unlocked
-                FROM cookies WHERE user_id = ?
-            """, (user_id,)) as cursor:
-                rows = await cursor.fetchall()
-                for name, soulstones, stars, asc, unlocked in rows:
-                    user_cookie_map[name] = {
-                        "soulstones": soulstones,
-                        "stars": stars,
-                        "ascension": asc,
-                        "unlocked": bool(unlocked)
-                    }
-        return user_cookie_map
-
-    async def _get_recent_score(self, user_id: int, cookie_name: str):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("""
-                SELECT MAX(timestamp)
-                FROM recent_pulls
-                WHERE user_id = ? AND cookie_name = ?
-            """, (user_id, cookie_name)) as cursor:
-                row = await cursor.fetchone()
-                return row[0] or 0
+        """A user's cookies with their last pull time."""
+        return await cookie_store.fetch_collection(user_id)
 
     async def cookie_autocomplete(self, interaction: discord.Interaction, current: str):
-        current = current.lower()
-        suggestions = []
-
-        for rarity, pool in RARITY_POOLS.items():
-            for name in pool:
-                if current in name.lower():
-                    suggestions.append(name)
-
         return [
             app_commands.Choice(name=name, value=name)
-            for name in suggestions[:25]
+            for name in cookie_catalog.search(current)
         ]
 
     # FIXED — cookie_name removed (unused & broke sync)
@@ -133,12 +53,12 @@ class Cookies(commands.Cog):
 
         await ctx.defer()
 
-        all_cookies = self._build_all_cookie_list()
+        all_cookies = self._build_all_cookie_list(sort)
         user_map = await self._fetch_user_cookies(member.id)
 
         entries = []
         for rarity, cname in all_cookies:
-            data = user_map.get(cname, {"soulstones": 0, "stars": 0, "ascension": 0, "unlocked": False})
+            data = user_map.get(cname, {"soulstones": 0, "stars": 0, "ascension": 0, "unlocked": False, "recent_ts": 0})
             unlocked = data["unlocked"]
 
             if mode == "unlocked" and not unlocked:
@@ -146,10 +66,6 @@ class Cookies(commands.Cog):
             if mode == "locked" and unlocked:
                 continue
 
-            recent_ts = 0
-            if sort == "recent":
-                recent_ts = await self._get_recent_score(member.id, cname)
-
             entries.append({
                 "rarity": rarity,
                 "name": cname,
@@ -158,30 +74,30 @@ class Cookies(commands.Cog):
                 "stars": data["stars"],
                 "ascension": data["ascension"],
                 "unlocked": unlocked,
-                "recent_ts": recent_ts
+                "recent_ts": data["recent_ts"]
             })
 
         if not entries:
             return await ctx.send(f"{member.display_name} has no cookies matching that view.")
 
-        # sorting
-        order_index = {r: i for i, r in enumerate(RARITY_ORDER)}
-        if sort == "rarity":
-            entries.sort(key=lambda e: (order_index[e["rarity"]], e["name"].lower()))
-        elif sort == "alpha":
-            entries.sort(key=lambda e: e["name"].lower())
-        elif sort == "stars":
+        # sorting (rarity and alpha come pre-sorted from the catalog)
+        if sort == "stars":
             entries.sort(key=lambda e: (-e["stars"], e["name"].lower()))
         elif sort == "soulstones":
             entries.sort(key=lambda e: (-e["soulstones"], e["name"].lower()))
         elif sort == "recent":
             entries.sort(key=lambda e: (-e["recent_ts"], e["name"].lower()))
 
-        # pagination
-        pages = []
+        collection = await collection_stats.get_stats(member.id)
+        header = (
+            f"**{collection['unlocked']}/{collection['total']}** unlocked • {collection['stars']}⭐ • "
+            f"{collection['ascensions']} ascensions • {collection['soulstones']} SS"
+        )
+
+        # pagination — pages are rendered as they are shown
         total_pages = math.ceil(len(entries) / ITEMS_PER_PAGE)
 
-        for p in range(total_pages):
+        def render(p):
             slice = entries[p * ITEMS_PER_PAGE:(p + 1) * ITEMS_PER_PAGE]
 
             emojis = [
@@ -209,14 +125,14 @@ class Cookies(commands.Cog):
 
             embed = discord.Embed(
                 title=f"🍪 {member.display_name}'s Cookies ({mode.title()})",
-                description=f"{grid}\n\n" + ("\n".join(stats)),
+                description=f"{header}\n\n{grid}\n\n" + ("\n".join(stats)),
                 color=0x0082e4
             )
             embed.set_footer(text=f"Page {p+1}/{total_pages} • Total: {len(entries)} • Sort: {sort}")
-            pages.append(embed)
+            return embed
 
-        view = _CookiesPaginator(self.bot, pages, ctx.author.id)
-        await ctx.send(embed=pages[0], view=view)
+        view = LazyPaginator(total_pages, render, ctx.author.id)
+        await ctx.send(embed=await view.page(0), view=view)
 
     # FIXED — proper command name & fixed member reference
     @commands.hybrid_command(name="cookie", description="View a single cookie's details.")
@@ -230,42 +146,19 @@ class Cookies(commands.Cog):
         await ctx.defer()
 
         # normalize cookie name
-        rarity_found = None
-        for r, pool in RARITY_POOLS.items():
-            for n in pool:
-                if n.lower() == cookie_name.lower():
-                    cookie_name = n
-                    rarity_found = r
-                    break
-            if rarity_found:
-                break
-
-        if not rarity_found:
+        canonical = cookie_catalog.canonical(cookie_name)
+        if not canonical:
             return await ctx.send(f"Cookie `{cookie_name}` does not exist.")
+        cookie_name = canonical
+        rarity_found = cookie_catalog.rarity_of(cookie_name)
 
         user_id = member.id
 
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("""
-                SELECT soulstones, stars, ascension_level, unlocked
-                FROM cookies
-                WHERE user_id = ? AND cookie_name = ?
-            """, (user_id, cookie_name)) as c:
-                row = await c.fetchone()
-
-                if row:
-                    soulstones, stars, asc, unlocked = row
-                    unlocked = bool(unlocked)
-                else:
-                    soulstones = stars = asc = 0
-                    unlocked = False
-
-            async with db.execute("""
-                SELECT MAX(timestamp) FROM recent_pulls
-                WHERE user_id = ? AND cookie_name = ?
-            """, (user_id, cookie_name)) as c2:
-                r2 = await c2.fetchone()
-                last_ts = r2[0] if r2 and r2[0] else None
+        state = await cookie_store.fetch_cookie(user_id, cookie_name)
+        soulstones, stars, asc, unlocked = state or cookie_store.EMPTY
+        unlocked = bool(unlocked)
+
+        last_ts = await last_pulled(user_id, cookie_name)
 
         emoji = COOKIE_EMOJIS.get(cookie_name, "🍪")
         asc_text = f"{stars}⭐"
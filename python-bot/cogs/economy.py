@@ -1,8 +1,12 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 import random
 from datetime import datetime, timedelta
+from utils import accounts
+from utils.cooldowns import cooldowns, command_key, format_remaining
+from utils.buffs import buffs
+from utils.names import resolve_names
+from utils.leaderboard import top_balances
 
 CURRENCY = "<:LoD:1411031656055177276>"
 
@@ -75,86 +79,26 @@ async def safe_send(ctx, *args, **kwargs):
 class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # start DB init/migration in background
+        # load in-memory state in background
         bot.loop.create_task(self.setup_db())
 
-    # ---------------- DB setup & migration ----------------
+    # ---------------- In-memory state ----------------
     async def setup_db(self):
-        """
-        Creates tables if missing and migrates missing columns.
-        This preserves existing data and adds columns when needed.
-        """
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            # create base tables if they don't exist (safe)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER DEFAULT 0,
-                    last_daily TEXT DEFAULT '1970-01-01'
-                    -- work_streak may be added by migration below
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS protections (
-                    user_id INTEGER PRIMARY KEY,
-                    type TEXT,
-                    expires_at INTEGER
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS cooldowns (
-                    user_id INTEGER,
-                    command_name TEXT,
-                    last_used INTEGER,
-                    PRIMARY KEY(user_id, command_name)
-                )
-            """)
-            await db.commit()
-
-            # migrate users table to ensure columns exist (safe ALTER ADD)
-            async with db.execute("PRAGMA table_info(users)") as cur:
-                rows = await cur.fetchall()
-                cols = [r[1] for r in rows]
-
-            # If work_streak missing -> add it
-            if "work_streak" not in cols:
-                try:
-                    await db.execute("ALTER TABLE users ADD COLUMN work_streak INTEGER DEFAULT 0")
-                    await db.commit()
-                    print("✅ Migrated DB: added 'work_streak' column to users")
-                except Exception as e:
-                    print(f"⚠️ Could not add work_streak column: {e}")
-
-            # If last_daily missing for some reason, add it
-            if "last_daily" not in cols:
-                try:
-                    await db.execute("ALTER TABLE users ADD COLUMN last_daily TEXT DEFAULT '1970-01-01'")
-                    await db.commit()
-                    print("✅ Migrated DB: added 'last_daily' column to users")
-                except Exception as e:
-                    print(f"⚠️ Could not add last_daily column: {e}")
-
-        print("✅ Economy database initialized / migrated.")
+        """Load cooldowns, buffs and the balance leaderboard (tables come from utils/migrations.py)."""
+        await cooldowns.load(COOLDOWNS)
+        await buffs.load()
+        await top_balances.load()
+        print("✅ Economy state loaded.")
 
     # ---------------- Helper functions ----------------
     async def get_balance(self, user_id: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                return int(row[0]) if row else 0
+        return await accounts.get_balance(user_id)
 
     async def add_balance(self, user_id: int, amount: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            # ensure user exists
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, ?)", (user_id, 0))
-            await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
-            await db.commit()
+        return await accounts.add_balance(user_id, amount)
 
     async def set_balance(self, user_id: int, amount: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, ?)", (user_id, 0))
-            await db.execute("UPDATE users SET balance = ? WHERE user_id = ?", (amount, user_id))
-            await db.commit()
+        await accounts.set_balance(user_id, amount)
 
     # ---------------- Cooldown handling ----------------
     async def check_cooldown(self, user_id: int, command_name: str):
@@ -162,25 +106,9 @@ class Economy(commands.Cog):
         Returns None if allowed; otherwise returns a human-readable remaining time string.
         Note: this function only updates last_used when the command is allowed (prevents resetting cooldown on failed attempts).
         """
-        now = int(datetime.utcnow().timestamp())
-        cooldown_time = COOLDOWNS.get(command_name, 0)
-
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT last_used FROM cooldowns WHERE user_id = ? AND command_name = ?", (user_id, command_name)) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    last_used = int(row[0])
-                    remaining = cooldown_time - (now - last_used)
-                    if remaining > 0:
-                        minutes, seconds = divmod(remaining, 60)
-                        if minutes > 0:
-                            return f"{minutes}m {seconds}s"
-                        return f"{seconds}s"
-
-            # allowed -> set last_used to now
-            await db.execute("INSERT OR REPLACE INTO cooldowns (user_id, command_name, last_used) VALUES (?, ?, ?)", (user_id, command_name, now))
-            await db.commit()
-
+        remaining = cooldowns.check(command_key(user_id, command_name), COOLDOWNS.get(command_name, 0))
+        if remaining > 0:
+            return format_remaining(remaining)
         return None
 
     # ---------------- Commands ----------------
@@ -204,21 +132,8 @@ class Economy(commands.Cog):
         if remaining:
             return await safe_send(ctx, f"⏳ **Cooldown!** You can use this command again in **{remaining}**.")
 
-        # ensure user exists and has work_streak column (migration may have added it)
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance, work_streak, last_daily) VALUES (?, ?, ?, ?)",
-                             (ctx.author.id, 0, 0, "1970-01-01"))
-            await db.commit()
-            async with db.execute("SELECT work_streak FROM users WHERE user_id = ?", (ctx.author.id,)) as cursor:
-                row = await cursor.fetchone()
-                streak = int(row[0]) if row and row[0] is not None else 0
-
         earnings = 300 + random.randint(500, 1200)
-        streak += 1
-        await self.add_balance(ctx.author.id, earnings)
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("UPDATE users SET work_streak = ? WHERE user_id = ?", (streak, ctx.author.id))
-            await db.commit()
+        _, streak = await accounts.work(ctx.author.id, earnings)
 
         embed = discord.Embed(
             title="<:SMCparkles:1402273494758199347> Work Complete",
@@ -283,11 +198,7 @@ class Economy(commands.Cog):
             color = 0x22BB33
         else:
             # lose some money, limited by balance
-            loss = random.randint(300, 700)
-            bal = await self.get_balance(ctx.author.id)
-            loss = min(loss, bal)
-            if loss > 0:
-                await self.add_balance(ctx.author.id, -loss)
+            loss = await accounts.take_up_to(ctx.author.id, random.randint(300, 700))
             template = random.choice(self.FAIL_CRIME_MSGS)
             msg = template.format(amt=f"{CURRENCY}**{loss}**")
             color = 0xBB2222
@@ -306,24 +217,10 @@ class Economy(commands.Cog):
         if remaining:
             return await safe_send(ctx, f"⏳ **Cooldown!** You can use this command again in **{remaining}**.")
 
-        user_id = ctx.author.id
         today = datetime.utcnow().date()
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance, last_daily) VALUES (?, ?, ?)",
-                             (user_id, 0, "1970-01-01"))
-            await db.commit()
-            async with db.execute("SELECT last_daily FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                last_claim = datetime.strptime(row[0], "%Y-%m-%d").date() if row and row[0] else datetime(1970, 1, 1).date()
-
-        if last_claim == today:
-            return await safe_send(ctx, "You’ve already claimed your daily reward today!")
-
         reward = random.randint(200, 400)
-        await self.add_balance(user_id, reward)
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("UPDATE users SET last_daily = ? WHERE user_id = ?", (today.isoformat(), user_id))
-            await db.commit()
+        if await accounts.claim_daily(ctx.author.id, today.isoformat(), reward) is None:
+            return await safe_send(ctx, "You’ve already claimed your daily reward today!")
 
         await safe_send(ctx, f"You claimed your daily reward of {CURRENCY}**{reward}**! Come back tomorrow!")
         profile_cog = self.bot.get_cog("Profile")
@@ -344,12 +241,9 @@ class Economy(commands.Cog):
             await self.add_balance(member.id, amount)
             return await safe_send(ctx, f"✨ {ctx.author.display_name} gifted {member.display_name} {CURRENCY}**{amount}**!")
 
-        bal = await self.get_balance(ctx.author.id)
-        if bal < amount:
+        if not await accounts.transfer(ctx.author.id, member.id, amount):
             return await safe_send(ctx, "You don’t have enough Light of Deceit!")
 
-        await self.add_balance(ctx.author.id, -amount)
-        await self.add_balance(member.id, amount)
         await safe_send(ctx, f"{ctx.author.display_name} paid {member.display_name} {CURRENCY}**{amount}**!")
 
     # ---------------- Steal ----------------
@@ -364,58 +258,36 @@ class Economy(commands.Cog):
         if target.bot:
             return await safe_send(ctx, "You can’t steal from a bot!")
 
-        target_balance = await self.get_balance(target.id)
-        if target_balance < 50:
+        # balance check, Lamp protection and the payout all resolve in one transaction
+        outcome, amount = await accounts.steal(ctx.author.id, target.id)
+        if outcome == "poor":
             return await safe_send(ctx, "That user is too poor to steal from!")
 
-        # Lamp protection
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute(
-                "SELECT type FROM protections WHERE user_id = ? AND type = 'lamp' AND expires_at > strftime('%s','now')",
-                (target.id,)
-            ) as cur:
-                protected = await cur.fetchone()
-
-        if protected:
+        if outcome == "lamp":
             gif = "https://cdn.discordapp.com/attachments/1286016432538386587/1435287997246472364/M40215-m40215-skill1.gif"
             embed = discord.Embed(title="<:LampOfDeceit:1434966495812653187> The Lamp of Deceit activates!",
-                                  description=f"You are fined {CURRENCY}**1000**!",
+                                  description=f"You are fined {CURRENCY}**{amount}**!",
                                   color=0xFF0000)
             embed.set_image(url=gif)
-            await safe_send(ctx, embed=embed)
-            await self.add_balance(ctx.author.id, -1000)
-            async with aiosqlite.connect("python-bot/data/economy.db") as db:
-                await db.execute("DELETE FROM protections WHERE user_id = ?", (target.id,))
-                await db.commit()
-            return
-
-        if random.random() < 0.5:
-            stolen = random.randint(20, min(150, target_balance))
-            await self.add_balance(ctx.author.id, stolen)
-            await self.add_balance(target.id, -stolen)
-            await safe_send(ctx, f"You successfully stole {CURRENCY}**{stolen}** from {target.display_name}!")
+            return await safe_send(ctx, embed=embed)
+
+        if outcome == "stolen":
+            await safe_send(ctx, f"You successfully stole {CURRENCY}**{amount}** from {target.display_name}!")
         else:
-            fine = random.randint(30, 100)
-            await self.add_balance(ctx.author.id, -fine)
-            await safe_send(ctx, f"You got caught trying to steal from {target.display_name} and lost {CURRENCY}**{fine}**!")
+            await safe_send(ctx, f"You got caught trying to steal from {target.display_name} and lost {CURRENCY}**{amount}**!")
 
     # ---------------- Leaderboard ----------------
     @commands.hybrid_command(name="leaderboard", description="View the richest users.")
     async def leaderboard(self, ctx):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT user_id, balance FROM users ORDER BY balance DESC LIMIT 10") as cursor:
-                rows = await cursor.fetchall()
+        rows = await top_balances.top()
 
         if not rows:
             return await safe_send(ctx, "No data found yet. Go earn some Light of Deceit first!")
 
+        names = await resolve_names(self.bot, [user_id for user_id, _ in rows], ctx.guild)
         embed = discord.Embed(title="<a:cyanstars:1433000579566665798> Shadow Milk’s Richest Souls", color=0xFFD700)
         for rank, (user_id, balance) in enumerate(rows, start=1):
-            try:
-                user = await self.bot.fetch_user(user_id)
-                name = user.display_name if user else f"User {user_id}"
-            except Exception:
-                name = f"User {user_id}"
+            name = names[user_id]
             embed.add_field(name=f"#{rank} — {name}", value=f"{CURRENCY} **{balance}**", inline=False)
         await safe_send(ctx, embed=embed)
 
@@ -1,8 +1,10 @@
 import discord
 from discord.ext import commands
 import random
-import aiosqlite
-from datetime import datetime
+from utils import accounts
+from utils import items
+from utils.buffs import buffs
+from utils.cooldowns import cooldowns, command_key
 
 CURRENCY = "<:LoD:1411031656055177276>"
 
@@ -15,71 +17,22 @@ COOLDOWNS = {
 class FunEconomy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        bot.loop.create_task(self.setup_db())
-
-    async def setup_db(self):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            # Ensure users table exists
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER DEFAULT 0
-                )
-            """)
-            # Cooldowns table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS cooldowns (
-                    user_id INTEGER,
-                    command_name TEXT,
-                    last_used INTEGER,
-                    PRIMARY KEY(user_id, command_name)
-                )
-            """)
-            # Inventory table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    user_id INTEGER,
-                    item_name TEXT,
-                    quantity INTEGER DEFAULT 1,
-                    UNIQUE(user_id, item_name)
-                )
-            """)
-            await db.commit()
-        print("✅ FunEconomy database initialized.")
 
     # --------- Helper functions ---------
     async def add_balance(self, user_id: int, amount: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, 0)", (user_id,))
-            await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
-            await db.commit()
+        return await accounts.add_balance(user_id, amount)
 
     async def add_item(self, user_id: int, item_name: str):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                INSERT INTO inventory (user_id, item_name, quantity)
-                VALUES (?, ?, 1)
-                ON CONFLICT(user_id, item_name)
-                DO UPDATE SET quantity = quantity + 1
-            """, (user_id, item_name))
-            await db.commit()
+        await accounts.add_item(user_id, item_name)
+
+    def boosted(self, user_id: int, reward: int) -> int:
+        # Wizard Wand's LoD multiplier
+        return int(reward * (buffs.get(user_id, "lod_multiplier") or 1))
 
     # --------- Cooldown checker ---------
     async def check_cooldown(self, user_id: int, command_name: str):
-        now = int(datetime.utcnow().timestamp())
-        cooldown_time = COOLDOWNS.get(command_name, 0)
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT last_used FROM cooldowns WHERE user_id = ? AND command_name = ?", (user_id, command_name)) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    last_used = row[0]
-                    remaining = cooldown_time - (now - last_used)
-                    if remaining > 0:
-                        return remaining
-            # Update last used time (this enforces cooldown immediately on command invocation)
-            await db.execute("INSERT OR REPLACE INTO cooldowns (user_id, command_name, last_used) VALUES (?, ?, ?)", (user_id, command_name, now))
-            await db.commit()
-        return 0
+        # starts the cooldown immediately on command invocation
+        return cooldowns.check(command_key(user_id, command_name), COOLDOWNS.get(command_name, 0))
 
     # --------- Commands ---------
     @commands.hybrid_command(name="beg", description="Beg for Light of Deceit… maybe Shadow Milk will show mercy.")
@@ -89,8 +42,8 @@ class FunEconomy(commands.Cog):
             return await ctx.send(f"⏳ **Cooldown!** You can use this command again in **{remaining:.0f} seconds**.")
 
         author = ctx.author
-        success = random.random() < 0.55
-        reward = random.randint(30, 120)
+        success = random.random() < 0.55 + (buffs.get(author.id, "beg_success") or 0)
+        reward = self.boosted(author.id, random.randint(30, 120))
         responses_success = [
             "Shadow Milk rolls his eyes and throws you a few {c} crumbs.",
             "‘Tch… fine,’ he mutters, tossing some {c} your way.",
@@ -122,7 +75,7 @@ class FunEconomy(commands.Cog):
 
             # Small chance of random item drop
             if random.random() < 0.1:
-                item = "<:PV_coin:1351245204203634799> Old Coin"
+                item = items.OLD_COIN.full_name
                 await self.add_item(author.id, item)
                 msg += f"\nYou also managed to get an **{item}** while begging Shadow Milk!"
             color = 0x00AEEF
@@ -184,7 +137,7 @@ class FunEconomy(commands.Cog):
 
                 # Run the exact same search logic (success/fail/drop)
                 success = random.random() < 0.55
-                reward = random.randint(40, 200)
+                reward = self.boosted(interaction.user.id, random.randint(40, 200))
 
                 success_msgs = [
                     f"You searched {place} and found {CURRENCY}**{reward}**!",
@@ -207,10 +160,10 @@ class FunEconomy(commands.Cog):
                     await self.add_balance(interaction.user.id, reward)
 
                     # Chance of random item
-                    if random.random() < 0.01:
+                    if random.random() < 0.01 + (buffs.get(interaction.user.id, "search_luck") or 0):
                         item = random.choice([
-                            "<:Lost_Portrait:1434580123063029860> Mysterious Portrait",
-                            "<:Gem:1434993304654581842> Wind Gem"
+                            items.MYSTERIOUS_PORTRAIT.full_name,
+                            items.WIND_GEM.full_name
                         ])
                         await self.add_item(interaction.user.id, item)
                         msg += f"\nYou lucky little cookie. . . you also found a **{item}**!"
@@ -1,169 +1,203 @@
 import discord
 from discord.ext import commands
 import asyncio
-import aiosqlite
 import time
-from python-bot.utils.gacha_sim import simulate_gacha, RARITY_COLORS, RARITY_POOLS, ASCENSION_COSTS, MAX_STARS
-
-CUTTER_NAME = "<:SMC_cutter:1411067252681211996> Deceitful Cutter"
+from utils.database import connection, transaction, ECONOMY_DB
+from utils import accounts
+from utils import cookie_catalog
+from utils import collection_stats
+from utils import cookie_store
+from utils import items
+from utils.gacha_sim import (
+    simulate_gacha, plan_ascension, get_ascension_cost,
+    RARITY_COLORS, RARITY_POOLS, COOKIE_EMOJIS, MAX_STARS
+)
+
+CUTTER_NAME = items.DECEITFUL_CUTTER.full_name
 LOADING_EMOJI = "<a:SMCloading:1433000133179736186>"
+UNLOCK_COST = 20
+DRAW_SIZES = (1, 10, 100)
 
 class Gacha(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.bot.loop.create_task(self.ensure_tables())
-
-    async def ensure_tables(self):
-        """Create tables and run safe migrations (add unlocked column if missing)."""
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            # Create base tables if they don't exist
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS cookies (
-                    user_id INTEGER,
-                    cookie_name TEXT,
-                    soulstones INTEGER DEFAULT 0,
-                    stars INTEGER DEFAULT 0,
-                    ascension_level INTEGER DEFAULT 0,
-                    UNIQUE(user_id, cookie_name)
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    user_id INTEGER,
-                    item_name TEXT,
-                    quantity INTEGER DEFAULT 1,
-                    UNIQUE(user_id, item_name)
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS recent_pulls (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    cookie_name TEXT,
-                    rarity TEXT,
-                    soulstones INTEGER,
-                    timestamp INTEGER
-                )
-            """)
-            await db.commit()
+        self.bot.loop.create_task(self.prepare_storage())
+
+    async def prepare_storage(self):
+        """Move cookies into the configured storage layout and backfill collection stats if needed."""
+        await cookie_store.prepare()
+
+        # Backfill collection_stats the first time it exists next to existing cookies
+        async with connection(ECONOMY_DB) as db:
+            async with db.execute("""
+                SELECT EXISTS (SELECT 1 FROM collection_stats),
+                       EXISTS (SELECT 1 FROM cookies) OR EXISTS (SELECT 1 FROM cookie_state)
+            """) as cur:
+                has_stats, has_cookies = await cur.fetchone()
 
-            # Migration: add unlocked column if missing
-            async with db.execute("PRAGMA table_info(cookies)") as cur:
-                cols = await cur.fetchall()
-                col_names = [c[1] for c in cols]
-                if "unlocked" not in col_names:
-                    await db.execute("ALTER TABLE cookies ADD COLUMN unlocked INTEGER DEFAULT 0")
-                    await db.commit()
+        if has_cookies and not has_stats:
+            rows = await collection_stats.rebuild()
+            print(f"✅ Backfilled collection stats ({rows} rows).")
 
     # --------- DB Helpers ----------
     async def get_item(self, user_id: int, item_name: str):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute(
-                "SELECT quantity FROM inventory WHERE user_id = ? AND item_name = ?",
-                (user_id, item_name),
-            ) as cursor:
-                row = await cursor.fetchone()
-                return row[0] if row else 0
+        return await accounts.get_item(user_id, item_name)
 
     async def remove_item(self, user_id: int, item_name: str, qty: int = 1):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                UPDATE inventory
-                SET quantity = quantity - ?
-                WHERE user_id = ? AND item_name = ?
-            """, (qty, user_id, item_name))
-            await db.execute("DELETE FROM inventory WHERE quantity <= 0")
-            await db.commit()
+        await accounts.remove_item(user_id, item_name, qty)
+
+    @staticmethod
+    def _grant_soulstones(conn, user_id: int, per_cookie: dict):
+        """
+        Adds soulstones per cookie, unlocking a locked cookie that reaches UNLOCK_COST
+        (keeping the remainder), and adds the matching collection_stats deltas.
+        Runs inside the caller's transaction.
+        """
+        current = cookie_store.load(conn, user_id, per_cookie)
+        states, deltas = {}, {}
+        for cookie, amount in per_cookie.items():
+            soulstones, stars, asc, unlocked = current.get(cookie, cookie_store.EMPTY)
+            if not unlocked and soulstones + amount >= UNLOCK_COST:
+                states[cookie] = (soulstones + amount - UNLOCK_COST, stars, asc, 1)
+                collection_stats.add_delta(deltas, cookie, unlocked=1, soulstones=amount - UNLOCK_COST)
+            else:
+                states[cookie] = (soulstones + amount, stars, asc, unlocked)
+                collection_stats.add_delta(deltas, cookie, soulstones=amount)
+
+        cookie_store.save(conn, user_id, states)
+        collection_stats.add_deltas(conn, user_id, deltas)
 
     async def add_soulstones(self, user_id: int, cookie_name: str, amount: int):
         """
         Adds soulstones for a user cookie. Ensures row exists. If cookie is locked and
         total soulstones >= 20 -> unlock and subtract 20 leaving remainder.
         """
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            # ensure row exists
-            await db.execute("""
-                INSERT INTO cookies (user_id, cookie_name, soulstones, stars, ascension_level, unlocked)
-                VALUES (?, ?, 0, 0, 0, 0)
-                ON CONFLICT(user_id, cookie_name) DO NOTHING
-            """, (user_id, cookie_name))
-
-            # add soulstones
-            await db.execute("""
-                UPDATE cookies
-                SET soulstones = soulstones + ?
-                WHERE user_id = ? AND cookie_name = ?
-            """, (amount, user_id, cookie_name))
-
-            # check total and unlock if needed
-            async with db.execute("""
-                SELECT soulstones, unlocked FROM cookies WHERE user_id = ? AND cookie_name = ?
-            """, (user_id, cookie_name)) as cursor:
-                row = await cursor.fetchone()
-                total = row[0] if row else 0
-                unlocked = row[1] if row else 0
-
-            if not unlocked and total >= 20:
-                remaining = total - 20
-                await db.execute("""
-                    UPDATE cookies
-                    SET soulstones = ?, unlocked = 1
-                    WHERE user_id = ? AND cookie_name = ?
-                """, (remaining, user_id, cookie_name))
-
-            await db.commit()
+        await cookie_store.ensure_ids([cookie_name])
+        await transaction(ECONOMY_DB, lambda conn: self._grant_soulstones(conn, user_id, {cookie_name: amount}))
+
+    async def apply_pulls(self, user_id: int, pulls) -> bool:
+        """
+        Spends one cutter per pull and grants every result in a single transaction:
+        soulstones are summed per cookie first, then upserted and logged with executemany.
+        Returns False (and changes nothing) if the user no longer has enough cutters.
+        """
+        per_cookie = {}
+        for result in pulls:
+            per_cookie[result["cookie"]] = per_cookie.get(result["cookie"], 0) + result["soulstones"]
+        now = int(time.time())
+        recent = [(user_id, r["cookie"], r["rarity"], r["soulstones"], now) for r in pulls]
+        await cookie_store.ensure_ids(per_cookie)
+
+        def apply(conn):
+            left = conn.execute("""
+                UPDATE inventory SET quantity = quantity - ?
+                WHERE user_id = ? AND item_id = ? AND quantity >= ?
+                RETURNING quantity
+            """, (len(pulls), user_id, items.DECEITFUL_CUTTER.item_id, len(pulls))).fetchone()
+            if left is None:
+                return False
+            if left[0] <= 0:
+                conn.execute(
+                    "DELETE FROM inventory WHERE user_id = ? AND item_id = ?",
+                    (user_id, items.DECEITFUL_CUTTER.item_id)
+                )
+            self._grant_soulstones(conn, user_id, per_cookie)
+            conn.executemany("""
+                INSERT INTO recent_pulls (user_id, cookie_name, rarity, soulstones, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """, recent)
+            return True
+
+        return await transaction(ECONOMY_DB, apply)
 
     async def update_cookie(self, user_id: int, cookie_name: str, stars=None, ascension=None, soulstones=None, unlocked=None):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            updates, params = [], []
-            if stars is not None:
-                updates.append("stars = ?")
-                params.append(stars)
-            if ascension is not None:
-                updates.append("ascension_level = ?")
-                params.append(ascension)
-            if soulstones is not None:
-                updates.append("soulstones = ?")
-                params.append(soulstones)
-            if unlocked is not None:
-                updates.append("unlocked = ?")
-                params.append(1 if unlocked else 0)
-            if not updates:
+        """Overwrites the given fields of a cookie the user has, keeping collection_stats in step."""
+        def apply(conn):
+            current = cookie_store.load(conn, user_id, [cookie_name]).get(cookie_name)
+            if current is None:
                 return
-            params.extend([user_id, cookie_name])
-            await db.execute(f"""
-                UPDATE cookies SET {', '.join(updates)}
-                WHERE user_id = ? AND cookie_name = ?
-            """, tuple(params))
-            await db.commit()
+            new = (
+                current[0] if soulstones is None else soulstones,
+                current[1] if stars is None else stars,
+                current[2] if ascension is None else ascension,
+                current[3] if unlocked is None else int(bool(unlocked)),
+            )
+            cookie_store.save(conn, user_id, {cookie_name: new})
+            deltas = {}
+            collection_stats.add_delta(
+                deltas, cookie_name,
+                unlocked=new[3] - current[3], stars=new[1] - current[1],
+                ascensions=new[2] - current[2], soulstones=new[0] - current[0]
+            )
+            collection_stats.add_deltas(conn, user_id, deltas)
+
+        await transaction(ECONOMY_DB, apply)
+
+    async def ascend_all(self, user_id: int, rarity: str = None):
+        """
+        Ascends every unlocked cookie (optionally of one rarity) as far as its soulstones allow.
+        The whole collection is read, planned and updated in one transaction.
+        Returns [(cookie_name, old_stars, old_asc, new_stars, new_asc, spent)] for the cookies that changed.
+        """
+        def apply(conn):
+            changes, updates, deltas = [], {}, {}
+            for name, (soulstones, stars, asc, unlocked) in cookie_store.load(conn, user_id).items():
+                if not unlocked or (rarity and cookie_catalog.rarity_of(name) != rarity):
+                    continue
+                new_stars, new_asc, left = plan_ascension(stars, asc, soulstones)
+                if (new_stars, new_asc) == (stars, asc):
+                    continue
+                changes.append((name, stars, asc, new_stars, new_asc, soulstones - left))
+                updates[name] = (left, new_stars, new_asc, unlocked)
+                collection_stats.add_delta(
+                    deltas, name, stars=new_stars - stars, ascensions=new_asc - asc, soulstones=left - soulstones
+                )
+
+            cookie_store.save(conn, user_id, updates)
+            collection_stats.add_deltas(conn, user_id, deltas)
+            return changes
+
+        return await transaction(ECONOMY_DB, apply)
+
+    async def apply_ascension(self, user_id: int, cookie_name: str, before, after) -> bool:
+        """
+        Moves one cookie from `before` to `after` (stars, ascension, soulstones) and updates
+        collection_stats in the same transaction. Returns False if the row no longer matches `before`.
+        """
+        def apply(conn):
+            current = cookie_store.load(conn, user_id, [cookie_name]).get(cookie_name)
+            if current is None or (current[1], current[2], current[0]) != tuple(before):
+                return False
+            cookie_store.save(conn, user_id, {cookie_name: (after[2], after[0], after[1], current[3])})
+            deltas = {}
+            collection_stats.add_delta(
+                deltas, cookie_name,
+                stars=after[0] - before[0], ascensions=after[1] - before[1], soulstones=after[2] - before[2]
+            )
+            collection_stats.add_deltas(conn, user_id, deltas)
+            return True
+
+        return await transaction(ECONOMY_DB, apply)
 
     async def get_cookie(self, user_id: int, cookie_name: str):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("""
-                SELECT soulstones, stars, ascension_level, unlocked
-                FROM cookies WHERE user_id = ? AND cookie_name = ?
-            """, (user_id, cookie_name)) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    return {"soulstones": row[0], "stars": row[1], "ascension": row[2], "unlocked": bool(row[3])}
-                return {"soulstones": 0, "stars": 0, "ascension": 0, "unlocked": False}
+        state = await cookie_store.fetch_cookie(user_id, cookie_name)
+        if state:
+            return {"soulstones": state[0], "stars": state[1], "ascension": state[2], "unlocked": bool(state[3])}
+        return {"soulstones": 0, "stars": 0, "ascension": 0, "unlocked": False}
 
     # --------- Gacha Command ----------
     @commands.hybrid_command(name="gacha", description="Pull cookies using your Deceitful Cutters!")
     async def gacha(self, ctx, draws: int = 1):
         await ctx.defer()
 
-        if draws not in [1, 10]:
-            return await ctx.send("You can only draw **1** or **10** times!")
+        if draws not in DRAW_SIZES:
+            return await ctx.send("You can only draw **1**, **10** or **100** times!")
 
         user_id = ctx.author.id
         cutters = await self.get_item(user_id, CUTTER_NAME)
         if cutters < draws:
             return await ctx.send(f"❌ You don’t have enough {CUTTER_NAME}! You need {draws}.")
 
-        # Remove cutters first
-        await self.remove_item(user_id, CUTTER_NAME, draws)
-
         # Send loading animation
         loading_msg = await ctx.send(f"{LOADING_EMOJI} Drawing cookies... Please wait!")
 
@@ -171,34 +205,28 @@ class Gacha(commands.Cog):
             # Simulate suspense delay
             await asyncio.sleep(2.5)
 
-            # Perform gacha draws
+            # Perform gacha draws, then spend cutters and grant results in one transaction
             pulls = simulate_gacha(draws)
-            desc_lines = []
-            rarity_counts = {}
+            if not await self.apply_pulls(user_id, pulls):
+                return await loading_msg.edit(content=f"❌ You don’t have enough {CUTTER_NAME}! You need {draws}.")
 
+            rarity_counts = {}
             for result in pulls:
                 rarity_counts[result["rarity"]] = rarity_counts.get(result["rarity"], 0) + 1
-                # add soulstones (may unlock)
-                await self.add_soulstones(user_id, result["cookie"], result["soulstones"])
-                # record recent pull
-                async with aiosqlite.connect("python-bot/data/economy.db") as db:
-                    await db.execute("""
-                        INSERT INTO recent_pulls (user_id, cookie_name, rarity, soulstones, timestamp)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (user_id, result["cookie"], result["rarity"], result["soulstones"], int(time.time())))
-                    await db.commit()
-
-                desc_lines.append(
-                    f"{result['emoji']} **{result['cookie']}** — *{result['rarity']}* (+{result['soulstones']} Soulstones)"
-                )
-
-            desc = "\n".join(desc_lines) or "No results?"
             if not rarity_counts:
                 rarity_counts = {"Common": 1}
             dominant_rarity = max(rarity_counts, key=rarity_counts.get)
 
+            if draws > 10:
+                desc = self.summarize_pulls(pulls, rarity_counts)
+            else:
+                desc = "\n".join(
+                    f"{result['emoji']} **{result['cookie']}** — *{result['rarity']}* (+{result['soulstones']} Soulstones)"
+                    for result in pulls
+                ) or "No results?"
+
             embed = discord.Embed(
-                title=f"🍪 {'10x Cookie Draw!' if draws == 10 else 'Cookie Draw!'}",
+                title=f"🍪 {f'{draws}x Cookie Draw!' if draws > 1 else 'Cookie Draw!'}",
                 description=desc,
                 color=RARITY_COLORS.get(dominant_rarity, 0xFFFFFF),
             )
@@ -210,13 +238,43 @@ class Gacha(commands.Cog):
             await loading_msg.edit(content=f"❌ An error occurred: `{e}`")
             raise  # Optional: keeps traceback visible in console
 
+    @staticmethod
+    def summarize_pulls(pulls, rarity_counts):
+        """One line per rarity and per cookie (rarest first) so big draws fit in an embed."""
+        per_cookie = {}
+        for result in pulls:
+            entry = per_cookie.setdefault(result["cookie"], [result["emoji"], result["rarity"], 0, 0])
+            entry[2] += 1
+            entry[3] += result["soulstones"]
+
+        order = list(RARITY_COLORS)
+        rarity_line = " • ".join(
+            f"*{rarity}* ×{rarity_counts[rarity]}" for rarity in sorted(rarity_counts, key=order.index, reverse=True)
+        )
+        cookies = sorted(per_cookie.items(), key=lambda kv: (-order.index(kv[1][1]), -kv[1][3]))
+        lines = [
+            f"{emoji} **{cookie}** ×{count} — *{rarity}* (+{stones} Soulstones)"
+            for cookie, (emoji, rarity, count, stones) in cookies
+        ]
+        desc = rarity_line + "\n\n"
+        for i, line in enumerate(lines):
+            if len(desc) + len(line) > 3900:
+                desc += f"…and {len(lines) - i} more cookies"
+                break
+            desc += line + "\n"
+        return desc
+
     # --------- Ascend Command ----------
-    @commands.hybrid_command(name="ascend", description="Ascend a cookie using soulstones!")
+    @commands.hybrid_command(name="ascend", description="Ascend a cookie, a whole rarity or `all` cookies using soulstones!")
     async def ascend(self, ctx, *, cookie_name: str):
         await ctx.defer()
 
         user_id = ctx.author.id
-        cookie_name = cookie_name.title()
+        rarity = next((r for r in RARITY_POOLS if r.lower() == cookie_name.strip().lower()), None)
+        if cookie_name.strip().lower() == "all" or rarity:
+            return await self.send_bulk_ascension(ctx, rarity)
+
+        cookie_name = cookie_catalog.canonical(cookie_name) or cookie_name.title()
         cookie_data = await self.get_cookie(user_id, cookie_name)
         if not cookie_data:
             return await ctx.send(f"❌ You do not own **{cookie_name}**.")
@@ -225,14 +283,10 @@ class Gacha(commands.Cog):
         asc = cookie_data["ascension"]
         soulstones = cookie_data["soulstones"]
 
-        cookie_type = "Beast" if cookie_name in RARITY_POOLS.get("Beast", []) else "Default"
+        cookie_type = "Beast" if cookie_catalog.is_beast(cookie_name) else "Default"
         max_level = MAX_STARS.get(cookie_type, "A5")
 
-        if stars < 5:
-            next_cost = ASCENSION_COSTS.get(stars + 1)
-        else:
-            key_map = ["A1", "A2", "A3", "A4", "A5"]
-            next_cost = ASCENSION_COSTS.get(key_map[asc]) if asc < 5 else None
+        next_cost = get_ascension_cost(stars, asc)
 
         if next_cost is None:
             return await ctx.send(f"✅ **{cookie_name}** has reached max ascension!")
@@ -240,17 +294,47 @@ class Gacha(commands.Cog):
         if soulstones < next_cost:
             return await ctx.send(f"❌ You need {next_cost} soulstones to ascend **{cookie_name}**. You currently have {soulstones}.")
 
+        before = (stars, asc, soulstones)
         soulstones -= next_cost
         if stars < 5:
             stars += 1
         else:
             asc += 1
 
-        await self.update_cookie(user_id, cookie_name, stars=stars, ascension=asc, soulstones=soulstones)
+        if not await self.apply_ascension(user_id, cookie_name, before, (stars, asc, soulstones)):
+            return await ctx.send(f"❌ **{cookie_name}** changed while ascending, please try again.")
         await ctx.send(
             f"✨ **{cookie_name}** has been ascended!\nNow: {stars}⭐ A{asc if asc > 0 else 0}\nRemaining Soulstones: {soulstones}"
         )
 
+    async def send_bulk_ascension(self, ctx, rarity: str = None):
+        changes = await self.ascend_all(ctx.author.id, rarity)
+        scope = f"{rarity} cookies" if rarity else "cookies"
+        if not changes:
+            return await ctx.send(f"❌ None of your unlocked {scope} have enough soulstones to ascend.")
+
+        def rank(stars, asc):
+            return f"{stars}⭐ A{asc}" if asc else f"{stars}⭐"
+
+        total_spent = sum(change[5] for change in changes)
+        total_steps = sum((new_stars + new_asc) - (stars + asc) for _, stars, asc, new_stars, new_asc, _ in changes)
+        desc = f"**{len(changes)}** cookies ascended **{total_steps}** times for **{total_spent}** soulstones.\n\n"
+
+        changes.sort(key=lambda c: (-c[5], c[0].lower()))
+        for i, (name, stars, asc, new_stars, new_asc, spent) in enumerate(changes):
+            line = f"{COOKIE_EMOJIS.get(name, '🍪')} **{name}** — {rank(stars, asc)} → {rank(new_stars, new_asc)} (-{spent} Soulstones)\n"
+            if len(desc) + len(line) > 3900:
+                desc += f"…and {len(changes) - i} more cookies"
+                break
+            desc += line
+
+        embed = discord.Embed(
+            title=f"✨ Ascended all {scope}!",
+            description=desc,
+            color=RARITY_COLORS.get(rarity, 0xFFD700)
+        )
+        await ctx.send(embed=embed)
+
 
 async def setup(bot):
     await bot.add_cog(Gacha(bot))
@@ -3,7 +3,7 @@ from discord import app_commands
 from discord.ext import commands
 import random
 import asyncio
-import aiosqlite
+from utils import accounts
 
 PLACEHOLDER = "❒"
 
@@ -203,10 +203,7 @@ class HangedCookie(commands.Cog):
         self.active_games.pop(channel.id, None)
 
     async def give_reward(self, user_id: int, amount: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, 0)", (user_id,))
-            await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
-            await db.commit()
+        await accounts.add_balance(user_id, amount)
 
     @staticmethod
     def format_display(display):
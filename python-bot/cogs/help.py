@@ -1,20 +1,19 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from discord.ui import View, Button
-
-LEFT_ARROW = "<:arrowleft:1433000307452940309>"
-RIGHT_ARROW = "<:arrowright:1433000252306100294>"
+from utils.paginator import LazyPaginator
 
 class Help(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._pages = None  # static, built on first /help and shared by every view
 
     @app_commands.command(name="help", description="Show Shadow Milk Cookie's help dashboard.")
     async def help(self, interaction: discord.Interaction):
-        pages = self.build_pages()
-        view = HelpPages(pages)
-        await interaction.response.send_message(embed=pages[0], view=view, ephemeral=False)
+        if self._pages is None:
+            self._pages = self.build_pages()
+        view = LazyPaginator(len(self._pages), self._pages.__getitem__, timeout=300)
+        await interaction.response.send_message(embed=await view.page(0), view=view, ephemeral=False)
 
     def build_pages(self):
         """Generate all help pages dynamically."""
@@ -222,28 +221,5 @@ class Help(commands.Cog):
         return pages
 
 
-class HelpPages(View):
-    def __init__(self, pages):
-        super().__init__(timeout=300)
-        self.pages = pages
-        self.current_page = 0
-
-        # Buttons
-        self.left_button = Button(emoji=LEFT_ARROW, style=discord.ButtonStyle.secondary)
-        self.right_button = Button(emoji=RIGHT_ARROW, style=discord.ButtonStyle.secondary)
-        self.left_button.callback = self.go_left
-        self.right_button.callback = self.go_right
-        self.add_item(self.left_button)
-        self.add_item(self.right_button)
-
-    async def go_left(self, interaction: discord.Interaction):
-        self.current_page = (self.current_page - 1) % len(self.pages)
-        await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-    async def go_right(self, interaction: discord.Interaction):
-        self.current_page = (self.current_page + 1) % len(self.pages)
-        await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
-
-
 async def setup(bot):
     await bot.add_cog(Help(bot))
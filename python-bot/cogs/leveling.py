@@ -1,98 +1,106 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 import random
+import asyncio
+import os
 import time
+from utils.database import connection, transaction, LEVELS_DB
+from utils.cooldowns import cooldowns
+from utils.level_settings import get_settings
+from utils.rank_index import guild_ranks
 
 XP_MIN = 10
 XP_MAX = 20
 BASE_COOLDOWN = 30  # seconds per user default
+XP_FLUSH_INTERVAL = float(os.getenv("XP_FLUSH_INTERVAL", "5"))  # seconds between batched XP writes
+XP_STATE_IDLE = 600  # drop in-memory totals of users idle this long (after they're flushed)
 
-DB = "python-bot/data/levels.db"
+DB = LEVELS_DB
 
 class LevelingCore(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # cooldowns: {guild_id: {user_id: last_ts}}
-        self.cooldowns = {}
+        # (guild_id, user_id) -> [xp, level, last_seen]; level-ups are decided on these totals
+        self.xp_state = {}
+        # keys changed since the last flush, written together in one executemany
+        self.dirty = set()
+        self.flush_lock = asyncio.Lock()
+        self.flush_task = None
 
     async def cog_load(self):
-        # ensure tables exist (if not created by config cog)
-        async with aiosqlite.connect(DB) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS leveling (
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    xp INTEGER,
-                    level INTEGER,
-                    PRIMARY KEY (guild_id, user_id)
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS level_config (
-                    guild_id INTEGER PRIMARY KEY,
-                    message TEXT,
-                    attachment_url TEXT,
-                    xp_multiplier REAL DEFAULT 1.0,
-                    level_channel_id INTEGER
-                    embed_color INTEGER DEFAULT 0x3498db
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS level_roles (
-                    guild_id INTEGER,
-                    level INTEGER,
-                    role_id INTEGER,
-                    PRIMARY KEY (guild_id, level)
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS level_block_channels (
-                    guild_id INTEGER,
-                    channel_id INTEGER,
-                    PRIMARY KEY (guild_id, channel_id)
-                )
-            """)
-            await db.commit()
-
-    def get_user_last(self, guild_id, user_id):
-        return self.cooldowns.get(guild_id, {}).get(user_id, 0)
-
-    def set_user_last(self, guild_id, user_id, ts):
-        self.cooldowns.setdefault(guild_id, {})[user_id] = ts
+        await guild_ranks.load()
+        self.flush_task = self.bot.loop.create_task(self.flush_loop())
+
+    async def cog_unload(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+        await self.flush_xp()
+
+    # ---------------- Batched XP ----------------
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(XP_FLUSH_INTERVAL)
+            try:
+                await self.flush_xp()
+            except Exception as e:
+                print(f"⚠️ XP flush failed: {e}")
+
+    async def flush_xp(self):
+        """Write every changed XP total in one transaction. A crash loses at most one interval."""
+        async with self.flush_lock:
+            if self.dirty:
+                keys, self.dirty = self.dirty, set()
+                rows = [(g, u, self.xp_state[(g, u)][0], self.xp_state[(g, u)][1]) for g, u in keys]
+
+                def apply(conn):
+                    conn.executemany("""
+                        INSERT INTO leveling (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(guild_id, user_id) DO UPDATE SET xp=excluded.xp, level=excluded.level
+                    """, rows)
 
+                try:
+                    await transaction(DB, apply)
+                except BaseException:
+                    # includes cancellation: keep them for the next (or the shutdown) flush
+                    self.dirty |= keys
+                    raise
+
+            cutoff = time.time() - XP_STATE_IDLE
+            for key in [k for k, s in self.xp_state.items() if s[2] < cutoff and k not in self.dirty]:
+                del self.xp_state[key]
+
+    async def get_xp_state(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        state = self.xp_state.get(key)
+        if state is None:
+            async with connection(DB) as db:
+                cursor = await db.execute("SELECT xp, level FROM leveling WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+                row = await cursor.fetchone()
+            # another message may have loaded it while we awaited
+            state = self.xp_state.setdefault(key, [row[0], row[1], time.time()] if row else [0, 1, time.time()])
+        return state
+
+    def peek_xp(self, guild_id, user_id):
+        """(xp, level) including unflushed gains, or None if not held in memory."""
+        state = self.xp_state.get((guild_id, user_id))
+        return (state[0], state[1]) if state else None
+
+    # config comes from the per-guild snapshot, so the message path never queries it
     async def is_channel_blocked(self, guild_id, channel_id):
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("SELECT 1 FROM level_block_channels WHERE guild_id=? AND channel_id=?", (guild_id, channel_id))
-            r = await cursor.fetchone()
-            return bool(r)
+        return channel_id in (await get_settings(guild_id))["blocked"]
 
     async def get_multiplier(self, guild_id):
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("SELECT xp_multiplier FROM level_config WHERE guild_id=?", (guild_id,))
-            row = await cursor.fetchone()
-            return row[0] if row and row[0] is not None else 1.0
+        return (await get_settings(guild_id))["multiplier"]
 
     async def get_level_role(self, guild_id, level):
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("SELECT role_id FROM level_roles WHERE guild_id=? AND level=?", (guild_id, level))
-            row = await cursor.fetchone()
-            return int(row[0]) if row else None
+        return (await get_settings(guild_id))["roles"].get(level)
 
     async def get_level_message(self, guild_id):
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("SELECT message, attachment_url FROM level_config WHERE guild_id=?", (guild_id,))
-            row = await cursor.fetchone()
-            if row:
-                return {"message": row[0] or "{user} leveled up to **Level {level}**!", "attachment": row[1]}
-            else:
-                return {"message": "{user} leveled up to **Level {level}**!", "attachment": None}
-            
+        cfg = await get_settings(guild_id)
+        return {"message": cfg["message"], "attachment": cfg["attachment"]}
+
     async def get_embed_color(self, guild_id):
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("SELECT embed_color FROM level_config WHERE guild_id=?", (guild_id,))
-            row = await cursor.fetchone()
-            return row[0] if row and row[0] is not None else 0x3498db
+        return (await get_settings(guild_id))["color"]
 
 
     @commands.Cog.listener()
@@ -110,59 +118,43 @@ class LevelingCore(commands.Cog):
             return
 
         # cooldown per user (can be adjusted per-guild later)
-        last = self.get_user_last(guild_id, user_id)
-        now = time.time()
-        if now - last < BASE_COOLDOWN:
+        if cooldowns.check(("xp", guild_id, user_id), BASE_COOLDOWN):
             return
 
-        self.set_user_last(guild_id, user_id, now)
-
         # xp with multiplier
         multiplier = await self.get_multiplier(guild_id)
         xp_gain = int(random.randint(XP_MIN, XP_MAX) * multiplier)
 
-        async with aiosqlite.connect(DB) as db:
-            # upsert
-            cursor = await db.execute("SELECT xp, level FROM leveling WHERE guild_id=? AND user_id=?", (guild_id, user_id))
-            row = await cursor.fetchone()
-            if row is None:
-                xp, level = xp_gain, 1
-                await db.execute("INSERT INTO leveling (guild_id, user_id, xp, level) VALUES (?, ?, ?, ?)", (guild_id, user_id, xp, level))
-            else:
-                xp, level = row
-                xp += xp_gain
-                await db.execute("UPDATE leveling SET xp=? WHERE guild_id=? AND user_id=?", (xp, guild_id, user_id))
-
-            # check level up threshold (simple formula: level * 100)
-            required = level * 100
-            if xp >= required:
-                new_level = level + 1
-                xp -= required
-                await db.execute("UPDATE leveling SET level=?, xp=? WHERE guild_id=? AND user_id=?", (new_level, xp, guild_id, user_id))
-                await db.commit()
-
-                # send level up embed and reward role
-                await self.handle_levelup(message, new_level)
-            else:
-                await db.commit()
+        # accumulate in memory; flush_loop persists it
+        state = await self.get_xp_state(guild_id, user_id)
+        state[0] += xp_gain
+        state[2] = time.time()
+        self.dirty.add((guild_id, user_id))
+
+        # check level up threshold (simple formula: level * 100)
+        required = state[1] * 100
+        leveled_up = state[0] >= required
+        if leveled_up:
+            state[0] -= required
+            state[1] += 1
+        guild_ranks.update(guild_id, user_id, state[1], state[0])
+
+        if leveled_up:
+            # send level up embed and reward role
+            await self.handle_levelup(message, state[1])
 
     async def handle_levelup(self, message: discord.Message, new_level: int):
         guild = message.guild
         member = message.author
 
-        # get level config from LevelConfig cog
-        config_cog = self.bot.get_cog("LevelConfig")
-        if config_cog:
-            cfg = await config_cog.get_config(guild.id)
-        else:
-            cfg = {"message": "{user} leveled up to **Level {level}**!", "attachment": None, "channel": None}
+        cfg = await get_settings(guild.id)
 
         text = cfg["message"].replace("{user}", member.mention)\
                              .replace("{username}", member.name)\
                              .replace("{level}", str(new_level))\
                              .replace("{avatar}", member.display_avatar.url)
 
-        color = cfg.get("color", 0x3498db)  # pulled from LevelConfig
+        color = cfg["color"]
         embed = discord.Embed(
             title="<a:SMC_SPARKLES:1435957094598578246> Level Up!",
             description=text,
@@ -184,7 +176,7 @@ class LevelingCore(commands.Cog):
         await message.channel.send(embed=embed)
 
         # give role reward if exists
-        role_id = await self.get_level_role(guild.id, new_level)
+        role_id = cfg["roles"].get(new_level)
         if role_id:
             role = guild.get_role(role_id)
             if role:
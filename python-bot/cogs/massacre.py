@@ -4,7 +4,7 @@ from discord.ext import commands
 from discord.ui import View, Button
 import asyncio
 import random
-from python-bot.utils.massacre_sim import run_massacre_simulation
+from utils.massacre_sim import run_massacre_simulation
 
 class Massacre(commands.Cog):
     def __init__(self, bot):
@@ -1,7 +1,10 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 import math
+from utils.database import connection, transaction, write, ECONOMY_DB
+from utils import accounts
+from utils import collection_stats
+from utils.user_cache import user_cache, read_through
 
 CURRENCY = "<:LoD:1411031656055177276>"
 BETA_BADGE = "<:Powder_Scale:1434580329829634048> Early Beta Tester"
@@ -9,92 +12,76 @@ BETA_BADGE = "<:Powder_Scale:1434580329829634048> Early Beta Tester"
 class Profile(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        bot.loop.create_task(self.setup_db())
-
-    async def setup_db(self):
-        """Initialize user levels & badges table."""
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS levels (
-                    user_id INTEGER PRIMARY KEY,
-                    xp INTEGER DEFAULT 0,
-                    level INTEGER DEFAULT 1
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS badges (
-                    user_id INTEGER,
-                    badge TEXT,
-                    UNIQUE(user_id, badge)
-                )
-            """)
-            await db.commit()
-        print("✅ Profile system initialized.")
 
     # ───────────────────────────
     # XP + LEVEL SYSTEM
     # ───────────────────────────
     async def add_xp(self, user_id: int, amount: int):
         """Adds XP to a user, levels them up if threshold reached."""
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO levels (user_id, xp, level) VALUES (?, 0, 1)", (user_id,))
-            await db.commit()
-
-            async with db.execute("SELECT xp, level FROM levels WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                if not row:
-                    xp, level = 0, 1
-                else:
-                    xp, level = row
-
+        def apply(conn):
+            # read and write in the same transaction so concurrent awards can't overwrite each other
+            row = conn.execute("SELECT xp, level FROM levels WHERE user_id = ?", (user_id,)).fetchone()
+            xp, level = row if row else (0, 1)
             xp += amount
 
             # XP needed for next level (simple curve)
             xp_needed = 1000 * level
-            leveled_up = False
+            levels_gained = 0
 
             while xp >= xp_needed and level < 100:
                 xp -= xp_needed
                 level += 1
                 xp_needed = 1000 * level
-                leveled_up = True
-
+                levels_gained += 1
+
+            conn.execute(
+                "INSERT INTO levels (user_id, xp, level) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET xp = excluded.xp, level = excluded.level",
+                (user_id, xp, level)
+            )
+            balance = None
+            if levels_gained:
                 # Award 10k LoD per level up
-                async with aiosqlite.connect("python-bot/data/economy.db") as db2:
-                    await db2.execute(
-                        "UPDATE users SET balance = balance + ? WHERE user_id = ?",
-                        (10000, user_id)
-                    )
-                    await db2.commit()
-
-            await db.execute("UPDATE levels SET xp = ?, level = ? WHERE user_id = ?", (xp, level, user_id))
-            await db.commit()
-        return leveled_up
+                balance = conn.execute(
+                    "UPDATE users SET balance = balance + ? WHERE user_id = ? RETURNING balance",
+                    (10000 * levels_gained, user_id)
+                ).fetchone()
+            return xp, level, levels_gained, balance
+
+        xp, level, levels_gained, balance = await transaction(ECONOMY_DB, apply)
+        user_cache.update(("levels", user_id), lambda _: (xp, level))
+        if balance:
+            accounts.update_cached_user(user_id, balance=balance[0])
+        return levels_gained > 0
 
     async def get_level_data(self, user_id: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT xp, level FROM levels WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                if not row:
-                    return 0, 1
-                return row[0], row[1]
+        async def load():
+            async with connection(ECONOMY_DB) as db:
+                async with db.execute("SELECT xp, level FROM levels WHERE user_id = ?", (user_id,)) as cursor:
+                    row = await cursor.fetchone()
+                    if not row:
+                        return 0, 1
+                    return row[0], row[1]
+
+        return await read_through(("levels", user_id), load)
 
     async def get_balance(self, user_id: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                return row[0] if row else 0
+        return await accounts.get_balance(user_id)
 
     async def get_badges(self, user_id: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT badge FROM badges WHERE user_id = ?", (user_id,)) as cursor:
-                rows = await cursor.fetchall()
-                if not rows:
-                    # Give beta tester badge if they’re new
-                    await db.execute("INSERT OR IGNORE INTO badges (user_id, badge) VALUES (?, ?)", (user_id, BETA_BADGE))
-                    await db.commit()
-                    return [BETA_BADGE]
-                return [r[0] for r in rows]
+        async def load():
+            async with connection(ECONOMY_DB) as db:
+                async with db.execute("SELECT badge FROM badges WHERE user_id = ?", (user_id,)) as cursor:
+                    rows = await cursor.fetchall()
+            return tuple(r[0] for r in rows)
+
+        badges = await read_through(("badges", user_id), load)
+        if not badges:
+            # Give beta tester badge if they’re new
+            await write(ECONOMY_DB, "INSERT OR IGNORE INTO badges (user_id, badge) VALUES (?, ?)", (user_id, BETA_BADGE))
+            badges = (BETA_BADGE,)
+            user_cache.update(("badges", user_id), lambda _: badges)
+        return list(badges)
 
     # ───────────────────────────
     # PROFILE COMMAND
@@ -106,6 +93,7 @@ class Profile(commands.Cog):
         xp, level = await self.get_level_data(member.id)
         balance = await self.get_balance(member.id)
         badges = await self.get_badges(member.id)
+        collection = await collection_stats.get_stats(member.id)
 
         # XP Progress
         xp_needed = 1000 * level
@@ -121,6 +109,18 @@ class Profile(commands.Cog):
         embed.add_field(name="XP", value=f"{xp}/{xp_needed}", inline=True)
         embed.add_field(name="Balance", value=f"{CURRENCY} **{balance}**", inline=False)
         embed.add_field(name="Progress", value=f"`{bar}` {progress*100:.1f}%", inline=False)
+        embed.add_field(
+            name="Cookies",
+            value=(
+                f"**{collection['unlocked']}/{collection['total']}** unlocked • "
+                f"{collection['stars']}⭐ • {collection['ascensions']} ascensions\n"
+                + " • ".join(
+                    f"{rarity} {unlocked}/{total}"
+                    for rarity, (unlocked, total) in collection["rarities"].items()
+                )
+            ),
+            inline=False
+        )
 
         embed.add_field(
             name="Badges",
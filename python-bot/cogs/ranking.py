@@ -1,12 +1,14 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 import io
 import aiohttp
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from utils.database import connection, LEVELS_DB
+from utils.level_settings import get_settings
+from utils.rank_index import guild_ranks
 
-DB = "python-bot/data/levels.db"
+DB = LEVELS_DB
 
 # fonts - try to use a default system font if not provided
 # You may change FONT_PATH to a .ttf you include in your project.
@@ -32,7 +34,7 @@ async def fetch_avatar_bytes(url: str, session: aiohttp.ClientSession):
     async with session.get(url) as resp:
         return await resp.read()
 
-async def generate_rank_card(member: discord.Member, xp: int, level: int, required: int):
+async def generate_rank_card(member: discord.Member, xp: int, level: int, required: int, rank=None):
     # card size
     width, height = 900, 300
     base = Image.new("RGBA", (width, height), (2, 2, 2, 255))  # near-black background
@@ -97,8 +99,19 @@ async def generate_rank_card(member: discord.Member, xp: int, level: int, requir
 
     # xp text
     xp_text = f"XP: {xp} / {required}"
-    tw, th = draw.textsize(xp_text, font=small_font)
-    draw.text((bar_x + (bar_w - tw) // 2, bar_y + (bar_h - th) // 2), xp_text, font=small_font, fill=(255,255,255,255))
+    left, top, right, bottom = draw.textbbox((0, 0), xp_text, font=small_font)
+    tw, th = right - left, bottom - top
+    draw.text((bar_x + (bar_w - tw) // 2 - left, bar_y + (bar_h - th) // 2 - top), xp_text, font=small_font, fill=(255,255,255,255))
+
+    # server rank, e.g. "#3 of 120" with the percentile under it
+    if rank:
+        position, total = rank
+        rank_text = f"#{position} of {total}"
+        rw = draw.textlength(rank_text, font=title_font)
+        draw.text((width - rw - 40, 30), rank_text, font=title_font, fill=(0, 255, 157, 255))
+        pct_text = f"Top {max(0.1, position / total * 100):.1f}%"
+        pw = draw.textlength(pct_text, font=small_font)
+        draw.text((width - pw - 40, 66), pct_text, font=small_font, fill=(180, 180, 180, 255))
 
     # guild watermark (optional small)
     # draw.text((width - 200, height - 30), "White Lily", font=small_font, fill=(40,255,180,60))
@@ -109,36 +122,105 @@ async def generate_rank_card(member: discord.Member, xp: int, level: int, requir
     byte_io.seek(0)
     return byte_io
 
+async def fetch_leaderboard_page(guild_id: int, after, limit: int):
+    """One leaderboard page, ordered level DESC, xp DESC, user_id DESC.
+    `after` is the (level, xp, user_id) of the previous page's last row, or None
+    for page 1. Seeking past it walks idx_leveling_rank, so every page costs the same."""
+    async with connection(DB) as db:
+        if after is None:
+            cursor = await db.execute("""
+                SELECT user_id, level, xp FROM leveling
+                WHERE guild_id=?
+                ORDER BY level DESC, xp DESC, user_id DESC
+                LIMIT ?
+            """, (guild_id, limit))
+        else:
+            cursor = await db.execute("""
+                SELECT user_id, level, xp FROM leveling
+                WHERE guild_id=? AND (level, xp, user_id) < (?, ?, ?)
+                ORDER BY level DESC, xp DESC, user_id DESC
+                LIMIT ?
+            """, (guild_id, *after, limit))
+        return await cursor.fetchall()
+
+
+class LeaderboardView(discord.ui.View):
+    """Prev/Next pages of the rank leaderboard using keyset pagination."""
+
+    def __init__(self, cog, guild, owner_id: int, per_page: int, rows, color):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.guild = guild
+        self.owner_id = owner_id
+        self.per_page = per_page
+        self.color = color
+        self.page = 0
+        # page_starts[i] is the keyset cursor that page i was fetched after
+        self.page_starts = [None]
+        self.rows = rows
+        self.refresh_buttons()
+
+    def next_cursor(self):
+        user_id, level, xp = self.rows[-1]
+        return level, xp, user_id
+
+    def refresh_buttons(self):
+        self.prev_button.disabled = self.page == 0
+        # a short page means there is nothing after it
+        self.next_button.disabled = len(self.rows) < self.per_page
+
+    def build_embed(self):
+        desc_lines = []
+        start = self.page * self.per_page
+        for pos, (user_id, level, xp) in enumerate(self.rows, start=start + 1):
+            member = self.guild.get_member(user_id)
+            name = member.display_name if member else f"<@{user_id}>"
+            desc_lines.append(f"**{pos}.** {name} — Level {level} ({xp} XP)")
+        embed = discord.Embed(
+            title=f"Leaderboard — #{start + 1}–{start + len(self.rows)}",
+            description="\n".join(desc_lines) or "No more entries.",
+            color=self.color
+        )
+        embed.set_footer(text=f"Page {self.page + 1}")
+        return embed
+
+    async def show(self, interaction: discord.Interaction, page: int, after):
+        rows = await fetch_leaderboard_page(self.guild.id, after, self.per_page)
+        if not rows:
+            self.next_button.disabled = True
+            return await interaction.response.edit_message(view=self)
+        if page == len(self.page_starts):
+            self.page_starts.append(after)
+        self.page, self.rows = page, rows
+        self.refresh_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("This isn't your leaderboard.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1, self.page_starts[self.page - 1])
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1, self.next_cursor())
+
+
 class Ranking(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    async def cog_load(self):
-        async with aiosqlite.connect(DB) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS leveling (
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    xp INTEGER,
-                    level INTEGER,
-                    PRIMARY KEY (guild_id, user_id)
-                )
-            """)
-            # add ensure embed_color exists for leaderboard
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS level_config (
-                    guild_id INTEGER PRIMARY KEY,
-                    message TEXT,
-                    attachment_url TEXT,
-                    xp_multiplier REAL DEFAULT 1.0,
-                    level_channel_id INTEGER,
-                    embed_color INTEGER DEFAULT 0x3498db
-                )
-            """)
-            await db.commit()
-
     async def fetch_user_stats(self, guild_id: int, user_id: int):
-        async with aiosqlite.connect(DB) as db:
+        # LevelingCore holds XP gained since its last flush
+        core = self.bot.get_cog("LevelingCore")
+        pending = core.peek_xp(guild_id, user_id) if core else None
+        if pending:
+            return pending
+        async with connection(DB) as db:
             cursor = await db.execute("SELECT xp, level FROM leveling WHERE guild_id=? AND user_id=?", (guild_id, user_id))
             r = await cursor.fetchone()
             if r:
@@ -147,10 +229,7 @@ class Ranking(commands.Cog):
                 return 0, 1
 
     async def get_embed_color(self, guild_id: int):
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("SELECT embed_color FROM level_config WHERE guild_id=?", (guild_id,))
-            row = await cursor.fetchone()
-            return row[0] if row and row[0] is not None else 0x3498db
+        return (await get_settings(guild_id))["color"]
 
     @app_commands.command(name="rank", description="Show your or another user's rank card")
     async def rank(self, interaction: discord.Interaction, member: discord.Member = None):
@@ -159,42 +238,29 @@ class Ranking(commands.Cog):
             member = interaction.user
         xp, level = await self.fetch_user_stats(interaction.guild.id, member.id)
         required = level * 100
-        img_bytes = await generate_rank_card(member, xp, level, required)
+        rank = guild_ranks.rank(interaction.guild.id, member.id)
+        img_bytes = await generate_rank_card(member, xp, level, required, rank)
         file = discord.File(fp=img_bytes, filename="rank.png")
         await interaction.followup.send(file=file)
 
     @app_commands.command(name="rank-leaderboard", description="Show top users by level in this server")
     async def leaderboard(self, interaction: discord.Interaction, limit: int = 10):
+        # limit is the page size; Prev/Next buttons page through the whole guild
         if limit < 1 or limit > 25:
             return await interaction.response.send_message("Limit must be between 1 and 25.", ephemeral=True)
         await interaction.response.defer()
-        async with aiosqlite.connect(DB) as db:
-            cursor = await db.execute("""
-                SELECT user_id, level, xp FROM leveling
-                WHERE guild_id=?
-                ORDER BY level DESC, xp DESC
-                LIMIT ?
-            """, (interaction.guild.id, limit))
-            rows = await cursor.fetchall()
+        core = self.bot.get_cog("LevelingCore")
+        if core:
+            await core.flush_xp()
+        rows = await fetch_leaderboard_page(interaction.guild.id, None, limit)
         if not rows:
             return await interaction.followup.send("No leveling data yet in this server.")
-        desc_lines = []
-        pos = 1
-        for user_id, level, xp in rows:
-            member = interaction.guild.get_member(user_id)
-            name = member.display_name if member else f"<@{user_id}>"
-            desc_lines.append(f"**{pos}.** {name} — Level {level} ({xp} XP)")
-            pos += 1
 
         # FIXED — leaderboard now uses server-level configured embed color
         color = await self.get_embed_color(interaction.guild.id)
 
-        embed = discord.Embed(
-            title=f"Leaderboard — Top {len(rows)}",
-            description="\n".join(desc_lines),
-            color=color
-        )
-        await interaction.followup.send(embed=embed)
+        view = LeaderboardView(self, interaction.guild, interaction.user.id, limit, rows, color)
+        await interaction.followup.send(embed=view.build_embed(), view=view)
 
 async def setup(bot):
     await bot.add_cog(Ranking(bot))
@@ -1,69 +1,19 @@
 import discord
 from discord.ext import commands
-from discord.ui import View, Button
-import aiosqlite
+from typing import Optional
+from discord.ui import Button
+from utils import accounts
+from utils import items
+from utils.paginator import LazyPaginator
 
 CURRENCY = "<:LoD:1411031656055177276>"
 
-# CLEAN SHOP ITEMS — emoji separated from name
-SHOP_ITEMS = [
-    (
-        "<:SMC_cutter:1411067252681211996>",
-        "Deceitful Cutter",
-        300,
-        "Radiates with deceitful energy, it may be used to bring you new cookies. . ."
-    ),
-    (
-        "<:LampOfDeceit:1434966495812653187>",
-        "Lamp of Deceit",
-        1000,
-        "A mysterious trinket of faint power. Legends say it protects your light of deceit from getting stolen. . ."
-    ),
-    (
-        "<:Energy_Potion:1434966305898893465>",
-        "Energy Potion",
-        1500,
-        "This potion will cure you and your pet! If you stumbled upon one, you'd be just the luckiest!"
-    ),
-    (
-        "<:Letter:1434580183595356250>",
-        "Anon Letter",
-        2000,
-        "You want to send a letter to one random cookie without them knowing you? I've got just the right item for you!."
-    ),
-    (
-        "<:Orchid_Locket:1434580197092491488>",
-        "Orchid Locket",
-        2500,
-        "This Orchid Locket is pretty. . . peaceful. Once acquired, your blackjack chances increase to win."
-    ),
-    (
-        "<:Wizard_Wand:1434966466809171988>",
-        "Wizard Wand",
-        3500,
-        "Do not underestimate this wand, it will give you random magical boosts once used. . ."
-    ),
-    (
-        "<:Travel_Ticket:1434580103081230498>",
-        "Travelling Ticket",
-        4000,
-        "This Traveling Ticket will take you to other realms around Beast-Yeast!"
-    ),
-    (
-        "<:Forbidden_Book:1434966390561050747>",
-        "Forbidden Chronicle",
-        5000,
-        "Want in on a tiny little secret? This book includes. . . random confessions from all the cookies using the bot."
-    ),
-]
-
-LEFT_ARROW = "<:arrowleft:1433000307452940309>"
-RIGHT_ARROW = "<:arrowright:1433000252306100294>"
-
-NON_REPEATABLE_ITEMS = {
-    "Forbidden Chronicle",
-}
+# CLEAN SHOP ITEMS — emoji separated from name (emoji, name, price, description), from the item registry
+SHOP_ITEMS = [(item.emoji, item.name, item.price, item.shop_description) for item in items.SHOP_ITEMS]
 
+SHOP_ITEMS_PER_PAGE = 3
+
+NON_REPEATABLE_ITEMS = {item.name for item in items.ITEMS if not item.repeatable}
 
 
 class Shop(commands.Cog):
@@ -72,123 +22,51 @@ class Shop(commands.Cog):
 
     # ---------- Database helpers ----------
     async def get_balance(self, user_id: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                return row[0] if row else 0
+        return await accounts.get_balance(user_id)
 
     async def add_balance(self, user_id: int, amount: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, 0)", (user_id,))
-            await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
-            await db.commit()
+        return await accounts.add_balance(user_id, amount)
 
     async def add_item(self, user_id: int, item_name: str):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    user_id INTEGER,
-                    item_name TEXT,
-                    quantity INTEGER DEFAULT 1,
-                    UNIQUE(user_id, item_name)
-                )
-            """)
-            await db.execute("""
-                INSERT INTO inventory (user_id, item_name, quantity)
-                VALUES (?, ?, 1)
-                ON CONFLICT(user_id, item_name)
-                DO UPDATE SET quantity = quantity + 1
-            """, (user_id, item_name))
-            await db.commit()
+        await accounts.add_item(user_id, item_name)
 
     async def remove_item(self, user_id: int, item_name: str, qty: int = 1):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                UPDATE inventory
-                SET quantity = quantity - ?
-                WHERE user_id = ? AND item_name = ?
-            """, (qty, user_id, item_name))
-            await db.execute("DELETE FROM inventory WHERE quantity <= 0")
-            await db.commit()
+        await accounts.remove_item(user_id, item_name, qty)
 
     async def get_inventory(self, user_id: int):
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    user_id INTEGER,
-                    item_name TEXT,
-                    quantity INTEGER DEFAULT 1,
-                    UNIQUE(user_id, item_name)
-                )
-            """)
-            async with db.execute("SELECT item_name, quantity FROM inventory WHERE user_id = ?", (user_id,)) as cursor:
-                rows = await cursor.fetchall()
-                return rows or []
+        return await accounts.get_inventory(user_id)
 
     # ---------- Commands ----------
 
     @commands.hybrid_command(name="shop", description="View Shadow Milk’s shop of cursed goods.")
     async def shop(self, ctx):
-        pages = []
-        items_per_page = 3
-        total_pages = (len(SHOP_ITEMS) + items_per_page - 1) // items_per_page
-
-        for i in range(total_pages):
-            start = i * items_per_page
-            end = start + items_per_page
-            page_items = SHOP_ITEMS[start:end]
-
-            embed = discord.Embed(
-                title=f"🛍️ Shadow Milk’s Shop (Page {i+1}/{total_pages})",
-                description="Browse the items below. Use `/buy <item>` to purchase, or `/sell <item>` to sell one you own.",
-                color=0x5A189A
-            )
-
-            for idx, (emoji, name, price, desc) in enumerate(page_items, start=start + 1):
-                embed.add_field(
-                    name=f"{idx}. {emoji} **{name}** — {price} {CURRENCY}",
-                    value=desc,
-                    inline=False
-                )
-
-            embed.set_footer(text=f"Page {i+1}/{total_pages}")
-            pages.append(embed)
-
-        view = ShopPages(self.bot, pages, items_per_page, SHOP_ITEMS)
-        view.owner_id = ctx.author.id
-        await ctx.send(embed=pages[0], view=view)
+        view = ShopPages(self.bot, SHOP_ITEMS_PER_PAGE, SHOP_ITEMS, ctx.author.id)
+        await ctx.send(embed=await view.page(0), view=view)
 
     @commands.hybrid_command(name="sell", description="Sell an item back to the shop.")
-    async def sell(self, ctx, *, item_name: str):
-        item_name = item_name.title()
-
-        match = next(
-            (i for i in SHOP_ITEMS if i[1].lower() == item_name.lower()),
-            None
-        )
+    async def sell(self, ctx, quantity: Optional[int] = 1, *, item_name: str):
+        item = items.lookup(item_name)
 
-        if not match:
+        if not item or item.price is None:
             return await ctx.send("You can’t sell that item here.")
+        if quantity is None or quantity <= 0:
+            return await ctx.send("Please enter a **valid positive number**.")
 
-        emoji, clean_name, price, _ = match
-
-        # Stored item name = "emoji + space + name"
-        stored_name = f"{emoji} {clean_name}"
-
-        inventory = await self.get_inventory(ctx.author.id)
-        owned = next((q for n, q in inventory if n == stored_name), 0)
-
-        if owned <= 0:
-            return await ctx.send("You don’t own that item!")
-
+        emoji, clean_name, price = item.emoji, item.name, item.price
         sell_price = price // 2
 
-        await self.remove_item(ctx.author.id, stored_name)
-        await self.add_balance(ctx.author.id, sell_price)
+        # removes the items and pays for them in one transaction, only if all `quantity` are owned
+        balance = await accounts.sell_item(ctx.author.id, item.full_name, quantity, sell_price)
+        if balance is None:
+            owned = await accounts.get_item(ctx.author.id, item.full_name)
+            if owned <= 0:
+                return await ctx.send("You don’t own that item!")
+            return await ctx.send(f"You only own **{owned}× {emoji} {clean_name}**.")
 
+        sold = f"{quantity}× " if quantity > 1 else ""
         embed = discord.Embed(
             title="💰 Item Sold",
-            description=f"You sold **{emoji} {clean_name}** for **{sell_price}** {CURRENCY}.",
+            description=f"You sold **{sold}{emoji} {clean_name}** for **{sell_price * quantity}** {CURRENCY}.",
             color=0x22BB33
         )
         await ctx.send(embed=embed)
@@ -237,6 +115,11 @@ class QuantityModal(discord.ui.Modal, title="Enter Quantity"):
                 "Please enter a **valid positive number**.",
                 ephemeral=True
             )
+        if quantity > 1 and self.item_name in NON_REPEATABLE_ITEMS:
+            return await interaction.response.send_message(
+                f"You may only own ONE {self.emoji} {self.item_name}.",
+                ephemeral=True
+            )
 
         total_cost = self.item_price * quantity
         bal = await self.shop_cog.get_balance(interaction.user.id)
@@ -280,27 +163,21 @@ class ConfirmPurchaseView(discord.ui.View):
 
     @discord.ui.button(label="✅ Confirm", style=discord.ButtonStyle.success)
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
-        bal = await self.shop_cog.get_balance(interaction.user.id)
-        if bal < self.total_cost:
+        stored_name = f"{self.emoji} {self.item_name}"
+        limit = 1 if self.item_name in NON_REPEATABLE_ITEMS else None
+
+        # charge and add the whole quantity in one transaction, only if the balance covers it
+        outcome, _ = await accounts.buy_item(interaction.user.id, stored_name, self.quantity, self.item_price, limit)
+        if outcome == "poor":
             return await interaction.response.send_message(
                 "❌ Not enough balance anymore.",
                 ephemeral=True
             )
-
-        stored_name = f"{self.emoji} {self.item_name}"
-
-        # charge money
-        await self.shop_cog.add_balance(interaction.user.id, -self.total_cost)
-
-        # add quantity
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            await db.execute("""
-                INSERT INTO inventory (user_id, item_name, quantity)
-                VALUES (?, ?, ?)
-                ON CONFLICT(user_id, item_name)
-                DO UPDATE SET quantity = quantity + ?
-            """, (interaction.user.id, stored_name, self.quantity, self.quantity))
-            await db.commit()
+        if outcome == "limit":
+            return await interaction.response.send_message(
+                f"You may only own ONE {self.emoji} {self.item_name}.",
+                ephemeral=True
+            )
 
         await interaction.response.send_message(
             f"✅ Successfully purchased **{self.quantity}× {self.emoji} {self.item_name}** "
@@ -315,29 +192,49 @@ class ConfirmPurchaseView(discord.ui.View):
         self.stop()
 
 # ---------- Pagination System with Buy Buttons ----------
-class ShopPages(View):
-    def __init__(self, bot, pages, items_per_page, shop_items):
-        super().__init__(timeout=300)
+class ShopPages(LazyPaginator):
+    def __init__(self, bot, items_per_page, shop_items, owner_id):
+        total_pages = (len(shop_items) + items_per_page - 1) // items_per_page
+        super().__init__(
+            total_pages, self.render_page, owner_id,
+            timeout=300, wrap=False,
+            denied_message="Only the person who opened this shop can use these buttons."
+        )
         self.bot = bot
-        self.pages = pages
         self.items_per_page = items_per_page
         self.shop_items = shop_items
-        self.current = 0
-        self.owner_id = None
+        self.owner_id = owner_id
         self.shop_cog = bot.get_cog("Shop")
 
-        self.left_button = Button(emoji=LEFT_ARROW, style=discord.ButtonStyle.secondary)
-        self.right_button = Button(emoji=RIGHT_ARROW, style=discord.ButtonStyle.secondary)
+        self.refresh_buttons()
+
+    def render_page(self, i):
+        start = i * self.items_per_page
+        page_items = self.shop_items[start:start + self.items_per_page]
+
+        embed = discord.Embed(
+            title=f"🛍️ Shadow Milk’s Shop (Page {i+1}/{self.page_count})",
+            description="Browse the items below. Use `/buy <item>` to purchase, or `/sell <item>` to sell one you own.",
+            color=0x5A189A
+        )
+
+        for idx, (emoji, name, price, desc) in enumerate(page_items, start=start + 1):
+            embed.add_field(
+                name=f"{idx}. {emoji} **{name}** — {price} {CURRENCY}",
+                value=desc,
+                inline=False
+            )
 
-        self.left_button.callback = self.go_left
-        self.right_button.callback = self.go_right
+        embed.set_footer(text=f"Page {i+1}/{self.page_count}")
+        return embed
 
+    async def on_page_change(self):
         self.refresh_buttons()
 
     def refresh_buttons(self):
         """Rebuilds buttons dynamically for the current page."""
         self.clear_items()
-        self.add_item(self.left_button)
+        self.add_item(self.left)
 
         start = self.current * self.items_per_page
         end = start + self.items_per_page
@@ -366,8 +263,7 @@ class ShopPages(View):
                 # one-time items
                 already_owned = False
                 if item_name in NON_REPEATABLE_ITEMS:
-                    inv = await self.shop_cog.get_inventory(interaction.user.id)
-                    already_owned = any(full.split(" ", 1)[1] == item_name for full, qty in inv)
+                    already_owned = await accounts.get_item(interaction.user.id, item_name) > 0
 
                 if already_owned:
                     return await interaction.response.send_message(
@@ -379,62 +275,10 @@ class ShopPages(View):
                 modal = QuantityModal(item_name, item_price, item_emoji, self.shop_cog)
                 await interaction.response.send_modal(modal)
 
-                
-                # ----- Block buying items that can only be purchased once -----
-                bal = await self.shop_cog.get_balance(interaction.user.id)
-                if bal < item_price:
-                    await interaction.response.send_message(
-                        f"You don’t have enough {CURRENCY}! You need {item_price} but you only have {bal}.",
-                        ephemeral=True
-                    )
-                    return
-
-                stored_name = f"{item_emoji} {item_name}"
-
-                await self.shop_cog.add_balance(interaction.user.id, -item_price)
-                await self.shop_cog.add_item(interaction.user.id, stored_name)
-
-                await interaction.response.send_message(
-                    f"✅ You bought **{item_emoji} {item_name}** for **{item_price}** {CURRENCY}!",
-                    ephemeral=True
-                )
-
             button.callback = buy_callback
             self.add_item(button)
 
-        self.add_item(self.right_button)
-
-    async def go_left(self, interaction: discord.Interaction):
-        if interaction.user.id != self.owner_id:
-            return await interaction.response.send_message(
-                "Only the person who opened this shop can use these buttons.",
-                ephemeral=True
-            )
-        if self.current > 0:
-            self.current -= 1
-            self.refresh_buttons()
-            await interaction.response.edit_message(
-                embed=self.pages[self.current],
-                view=self
-            )
-        else:
-            await interaction.response.defer()
-
-    async def go_right(self, interaction: discord.Interaction):
-        if interaction.user.id != self.owner_id:
-            return await interaction.response.send_message(
-                "Only the person who opened this shop can use these buttons.",
-                ephemeral=True
-            )
-        if self.current < len(self.pages) - 1:
-            self.current += 1
-            self.refresh_buttons()
-            await interaction.response.edit_message(
-                embed=self.pages[self.current],
-                view=self
-            )
-        else:
-            await interaction.response.defer()
+        self.add_item(self.right)
 
 
 async def setup(bot):
@@ -1,53 +1,16 @@
 import discord
 from discord.ext import commands
-import aiosqlite
-import time
-from typing import List, Tuple, Dict
-from python-bot.utils.item_usage import ITEM_EFFECTS, remove_item  # existing effects and helper
+from typing import List, Tuple
+from utils import accounts
+from utils import items
+from utils.items import parse_full_name
+from utils.cooldowns import cooldowns
+from utils.item_usage import ITEM_EFFECTS, remove_item  # existing effects and helper
 
 CURRENCY = "<:LoD:1411031656055177276>"
 
-# Categories for known items (clean_name -> category). Unknown items default to "Misc".
-CATEGORY_MAP = {
-    "Deceitful Cutter": "Consumables",
-    "Energy Potion": "Consumables",
-    "Starjelly": "Consumables",
-    "Mysterious Portrait": "Consumables",
-    "Lamp of Deceit": "Special",
-    "Anon Letter": "Special",
-    "Forbidden Chronicle": "Special",
-    "Travelling Ticket": "Special",
-    "Wizard Wand": "Buffs",
-    "Orchid Locket": "Buffs",
-    # add other known mappings as needed
-}
-
-# Items that can't be consumed
-NON_CONSUMABLE_ITEMS = {
-    "Forbidden Chronicle",
-}
-
-# Human-readable descriptions for preview (fallbacks accepted).
-ITEM_DESCRIPTIONS = {
-    "Deceitful Cutter": "Radiates with deceitful energy; it may be used to bring you new cookies...",
-    "Lamp of Deceit": "A mysterious trinket of faint power. Activating it summons the Animatronic of Deceit to protect you from theft for a short time.",
-    "Energy Potion": "A potion to restore you and your pet's health.",
-    "Anon Letter": "Send an anonymous message to another user via the bot.",
-    "Forbidden Chronicle": "A book containing confessions from other cookies.",
-    "Wizard Wand": "Grants a random temporary buff (search luck, LoD multiplier, etc.).",
-    "Orchid Locket": "Increases your odds in Blackjack for a limited time.",
-    "Travelling Ticket": "Opens paths to other mysterious realms.",
-    "Starjelly": "Sweet glowing jelly that restores your spirit.",
-    "Wind Gem": "A gemstone that radiates refreshing energy.",
-    "Mysterious Portrait": "An eerie portrait that hums with quiet power.",
-}
-
-# Per-item cooldowns in seconds (optional). 0 = no cooldown.
-ITEM_COOLDOWNS = {
-    "Lamp of Deceit": 600,
-    "Wizard Wand": 600,
-    "Orchid Locket": 1800,
-}
+# Categories, descriptions, cooldowns and consumability come from the item
+# registry (utils/items.py). Unknown items default to "Misc".
 
 PAGE_SIZE = 4  # items per page
 
@@ -66,8 +29,8 @@ class UseViewState:
         else:
             out = []
             for full, qty in self.all_items:
-                clean = parse_clean_name(full)
-                cat = CATEGORY_MAP.get(clean, "Misc")
+                item = items.lookup(full)
+                cat = item.category if item else "Misc"
                 if cat == self.category:
                     out.append((full, qty))
             return out
@@ -77,19 +40,6 @@ class UseViewState:
         return max(1, (len(filtered) + PAGE_SIZE - 1) // PAGE_SIZE)
 
 
-def parse_full_name(full_name: str) -> Tuple[str, str]:
-    """Parse stored full name into (emoji, clean_name).
-    Example: "<:Lamp:12345> Lamp of Deceit" -> ("<:Lamp:12345>", "Lamp of Deceit")
-    If no emoji present, emoji returned as None and clean_name is the full string.
-    """
-    parts = full_name.split(" ", 1)
-    if parts and parts[0].startswith("<:") and parts[0].endswith(">"):
-        emoji = parts[0]
-        clean = parts[1] if len(parts) > 1 else parts[0]
-        return emoji, clean
-    return None, full_name
-
-
 def parse_clean_name(full_name: str) -> str:
     return parse_full_name(full_name)[1]
 
@@ -97,32 +47,20 @@ def parse_clean_name(full_name: str) -> str:
 class UseCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # cooldowns: {(user_id, clean_name): expires_at_unix}
-        self.item_cooldowns: Dict[Tuple[int, str], float] = {}
 
     async def get_inventory(self, user_id: int) -> List[Tuple[str, int]]:
         """Return list of (full_name, qty) for this user."""
-        async with aiosqlite.connect("python-bot/data/economy.db") as db:
-            async with db.execute(
-                "SELECT item_name, quantity FROM inventory WHERE user_id = ?", (user_id,)
-            ) as cur:
-                rows = await cur.fetchall()
-                return rows or []
+        return await accounts.get_inventory(user_id)
 
     def _check_cooldown(self, user_id: int, clean_name: str) -> Tuple[bool, int]:
         """Return (is_on_cooldown, seconds_left)."""
-        key = (user_id, clean_name)
-        expires = self.item_cooldowns.get(key, 0)
-        now = time.time()
-        if now < expires:
-            return True, int(expires - now)
+        remaining = cooldowns.remaining(("item", user_id, clean_name))
+        if remaining > 0:
+            return True, int(remaining)
         return False, 0
 
     def _set_cooldown(self, user_id: int, clean_name: str, seconds: int):
-        if seconds <= 0:
-            return
-        key = (user_id, clean_name)
-        self.item_cooldowns[key] = time.time() + seconds
+        cooldowns.start(("item", user_id, clean_name), seconds)
 
     # ---------------- UI BUILDERS ----------------
     def _build_main_view(self, state: UseViewState, author_id: int):
@@ -210,7 +148,8 @@ class UseCog(commands.Cog):
 
         for full_name, qty in page_slice:
             emoji, clean = parse_full_name(full_name)
-            desc = ITEM_DESCRIPTIONS.get(clean, "No description available.")
+            item = items.lookup(full_name)
+            desc = item.description if item else "No description available."
             embed.add_field(name=f"{emoji + ' ' if emoji else ''}{clean} (x{qty})", value=desc, inline=False)
 
         return embed
@@ -218,7 +157,8 @@ class UseCog(commands.Cog):
     async def _show_preview_panel(self, interaction: discord.Interaction, full_name: str):
         """Sends an ephemeral preview with Use / Close buttons for the selected item."""
         emoji, clean = parse_full_name(full_name)
-        desc = ITEM_DESCRIPTIONS.get(clean, "No description available.")
+        item = items.lookup(full_name)
+        desc = item.description if item else "No description available."
 
         # Cooldown check
         on_cd, seconds_left = self._check_cooldown(interaction.user.id, clean)
@@ -239,21 +179,27 @@ class UseCog(commands.Cog):
             if on_cd2:
                 return await inner.response.send_message(f"Item is on cooldown: {secs}s left.", ephemeral=True)
 
-            # run effect (ITEM_EFFECTS expects full stored name like "<:emoji:id> Clean Name")
-            func = ITEM_EFFECTS.get(full_name)
+            # run effect (ITEM_EFFECTS is keyed by item id)
+            func = ITEM_EFFECTS.get(item.item_id) if item else None
             if not func:
                 # Fallback for small item effects: try to handle common consumables that were not in ITEM_EFFECTS
                 # (You can expand ITEM_EFFECTS to include them)
                 await inner.response.send_message("This item cannot be used right now (no effect defined).", ephemeral=True)
                 return
 
+            # Take the item first, in one conditional statement (ONLY if it is a consumable),
+            # so a second click or another session can't use the same unit twice
+            if item.consumable:
+                left = await remove_item(inner.user.id, full_name)
+            else:
+                left = await accounts.get_item(inner.user.id, full_name) or None
+            if left is None:
+                return await inner.response.send_message("You don't have this item anymore.", ephemeral=True)
+
             # Call the effect; pass bot and the interaction so the effect can reply/DM etc.
             await func(self.bot, inner)
 
-            # Remove item ONLY if it is a consumable
-            if clean not in NON_CONSUMABLE_ITEMS:
-                await remove_item(inner.user.id, full_name)
-            cd_seconds = ITEM_COOLDOWNS.get(clean, 0)
+            cd_seconds = item.cooldown
             self._set_cooldown(inner.user.id, clean, cd_seconds)
 
             # Confirm used
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# the bot runs from python-bot/ and imports `utils.*` from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Run from an empty directory, so the bot's python-bot/data/*.db paths point at fresh files."""
+    (tmp_path / "python-bot" / "data").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
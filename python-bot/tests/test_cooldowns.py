@@ -0,0 +1,40 @@
+import asyncio
+
+from utils import database, migrations
+from utils.cooldowns import CooldownService, command_key
+from utils.database import connection, ECONOMY_DB
+
+
+async def persisted():
+    async with connection(ECONOMY_DB) as db:
+        async with db.execute("SELECT user_id, command_name FROM cooldowns ORDER BY user_id") as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+def test_reset_is_not_brought_back_by_a_snapshot_or_restart(data_dir):
+    async def scenario():
+        await migrations.run()
+        try:
+            service = CooldownService()
+            service.start(command_key(1, "daily"), 86400)
+            service.start(command_key(2, "daily"), 86400)
+            await service.flush()
+            assert await persisted() == [(1, "daily"), (2, "daily")]
+
+            # reset one that is on disk, and one that is only waiting for the snapshot
+            service.start(command_key(3, "daily"), 86400)
+            await service.reset(command_key(1, "daily"))
+            await service.reset(command_key(3, "daily"))
+            await service.flush()
+            assert await persisted() == [(2, "daily")]
+            assert service.remaining(command_key(1, "daily")) == 0
+
+            restarted = CooldownService()
+            await restarted.load({"daily": 86400})
+            await restarted.close()
+            assert restarted.remaining(command_key(1, "daily")) == 0
+            assert restarted.remaining(command_key(2, "daily")) > 0
+        finally:
+            await database.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,24 @@
+from utils.gacha_sim import get_ascension_cost, plan_ascension, soulstones_to_max
+
+UNLOCK_COST = 20  # cogs/gacha.py
+
+
+def test_plan_ascension_spends_exactly_soulstones_to_max():
+    # a cookie unlocked with UNLOCK_COST and given the rest ends fully ascended with nothing left
+    stars, asc, left = plan_ascension(0, 0, soulstones_to_max() - UNLOCK_COST)
+
+    assert (stars, asc, left) == (5, 5, 0)
+    assert get_ascension_cost(stars, asc) is None
+
+
+def test_plan_ascension_stops_at_max():
+    stars, asc, left = plan_ascension(0, 0, 10_000)
+
+    assert (stars, asc) == (5, 5)
+    assert left == 10_000 - (soulstones_to_max() - UNLOCK_COST)
+
+
+def test_plan_ascension_stops_at_first_unaffordable_step():
+    # 20 + 30 pays for two stars, the third (50) is out of reach
+    assert plan_ascension(0, 0, 99) == (2, 0, 49)
+    assert plan_ascension(5, 4, 99) == (5, 4, 99)
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands
+
+from utils import database, migrations
+from utils.database import connection, ECONOMY_DB
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content or kwargs)
+
+
+async def balance(user_id):
+    async with connection(ECONOMY_DB) as db:
+        async with db.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cursor:
+            row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+def test_game_cogs_load_and_pay_out_through_the_writer(data_dir):
+    async def scenario():
+        await migrations.run()
+        try:
+            bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+            async with bot:
+                await bot.load_extension("cogs.hiddenbeast")
+                await bot.load_extension("cogs.massacre")
+                assert {"HiddenBeast", "Massacre"} <= set(bot.cogs)
+
+                from utils import hiddenbeast_sim, massacre_sim
+
+                # a round of Hidden Beast payouts, all queued at once
+                await asyncio.gather(*(hiddenbeast_sim.add_balance(user_id, 100) for user_id in range(1, 11)))
+                await hiddenbeast_sim.add_balance(1, 1000)
+
+                winner = SimpleNamespace(member=SimpleNamespace(id=42, display_name="winner", send=FakeChannel().send))
+                channel = FakeChannel()
+                await massacre_sim.announce_winner(channel, winner)
+
+                assert ECONOMY_DB in database._writers
+                assert await balance(1) == 1100
+                assert [await balance(user_id) for user_id in range(2, 11)] == [100] * 9
+                assert await balance(42) == 10000
+                assert not any("Could not update" in str(message) for message in channel.sent)
+        finally:
+            await database.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+import asyncio
+import random
+
+from utils import database, migrations
+from utils.database import write, ECONOMY_DB
+from utils.leaderboard import TopBalances
+
+
+async def set_balance(board, user_id, balance):
+    """Commit a balance, then report it the way accounts.update_cached_user does."""
+    rows = await write(ECONOMY_DB, """
+        INSERT INTO users (user_id, balance) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET balance = excluded.balance
+        RETURNING balance
+    """, (user_id, balance))
+    board.update(user_id, rows[0][0])
+
+
+def test_top_k_matches_sql_through_inserts_raises_drops_and_ties(data_dir):
+    async def scenario():
+        await migrations.run()
+        try:
+            board = TopBalances(k=3)
+            await board.load()
+            assert await board.check_consistency() == []
+
+            # inserts until the board is no longer complete
+            for user_id, balance in enumerate((500, 300, 300, 100, 900, 50, 700, 300), start=1):
+                await set_balance(board, user_id, balance)
+                assert await board.check_consistency() == []
+
+            # ties with the entries around them order by user id
+            await set_balance(board, 9, 700)
+            await set_balance(board, 10, 900)
+            assert await board.check_consistency() == []
+
+            # a raise from outside the board, then drops that push tracked users out
+            await set_balance(board, 6, 1000)
+            for user_id in (5, 10, 6, 7, 9):
+                await set_balance(board, user_id, 0)
+                assert await board.check_consistency() == []
+
+            rng = random.Random(1)
+            for _ in range(300):
+                await set_balance(board, rng.randint(1, 25), rng.choice((0, 100, 300, rng.randint(0, 2000))))
+                assert await board.check_consistency() == []
+        finally:
+            await database.shutdown()
+
+    asyncio.run(scenario())
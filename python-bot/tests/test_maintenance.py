@@ -0,0 +1,38 @@
+import asyncio
+import sqlite3
+
+from utils import database, migrations
+from utils.database import ECONOMY_DB
+from utils.maintenance import MaintenanceScheduler, JOBS
+
+
+async def auto_vacuum():
+    # a fresh connection: pooled ones keep the auto_vacuum mode they read when they opened
+    conn = sqlite3.connect(ECONOMY_DB)
+    try:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_only_an_owner_run_converts_to_incremental_vacuum(data_dir):
+    async def scenario():
+        await migrations.run()
+        try:
+            scheduler = MaintenanceScheduler(JOBS)
+            assert await auto_vacuum() == 0
+
+            [(_, _, summary)] = await scheduler.run(["vacuum"])
+            assert "economy.db not converted" in summary
+            assert await auto_vacuum() == 0
+
+            [(_, _, summary)] = await scheduler.run(["vacuum"], manual=True)
+            assert "economy.db converted to incremental" in summary
+            assert await auto_vacuum() == 2
+
+            [(_, _, summary)] = await scheduler.run(["vacuum"])
+            assert "economy.db 0 pages freed" in summary
+        finally:
+            await database.shutdown()
+
+    asyncio.run(scenario())
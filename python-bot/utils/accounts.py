@@ -0,0 +1,292 @@
+import random
+
+from utils.database import connection, transaction, write, ECONOMY_DB
+from utils.user_cache import user_cache, read_through
+from utils.leaderboard import top_balances
+from utils import items
+from utils.buffs import buffs
+
+# --- Balance and inventory helpers shared by every cog ---
+# Reads borrow a pooled connection; every mutation goes through the economy
+# writer queue so concurrent commands are group-committed instead of fighting
+# over the SQLite write lock. The hot `users` row is served from user_cache.
+
+DEFAULT_USER = {"balance": 0, "work_streak": 0, "last_daily": "1970-01-01"}
+
+
+async def get_user(user_id: int) -> dict:
+    """Cached {balance, work_streak, last_daily} for a user. Do not mutate the result."""
+    async def load():
+        async with connection(ECONOMY_DB) as db:
+            async with db.execute(
+                "SELECT balance, work_streak, last_daily FROM users WHERE user_id = ?", (user_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        if row is None:
+            return dict(DEFAULT_USER)
+        return {
+            "balance": int(row[0] or 0),
+            "work_streak": int(row[1] or 0),
+            "last_daily": row[2] or DEFAULT_USER["last_daily"],
+        }
+
+    return await read_through(("users", user_id), load)
+
+
+def update_cached_user(user_id: int, **fields):
+    """Write paths call this with the values they just committed."""
+    user_cache.update(("users", user_id), lambda row: {**row, **fields})
+    if "balance" in fields:
+        top_balances.update(user_id, fields["balance"])
+
+
+def invalidate_user(user_id: int):
+    user_cache.invalidate(("users", user_id))
+
+
+async def get_balance(user_id: int) -> int:
+    return (await get_user(user_id))["balance"]
+
+
+async def add_balance(user_id: int, amount: int) -> int:
+    """Adds (or subtracts) LoD, creating the user if needed. Returns the new balance."""
+    rows = await write(ECONOMY_DB, """
+        INSERT INTO users (user_id, balance) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance
+        RETURNING balance
+    """, (user_id, amount))
+    balance = int(rows[0][0])
+    update_cached_user(user_id, balance=balance)
+    return balance
+
+
+async def set_balance(user_id: int, amount: int):
+    await write(ECONOMY_DB, """
+        INSERT INTO users (user_id, balance) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET balance = excluded.balance
+    """, (user_id, amount))
+    update_cached_user(user_id, balance=amount)
+
+
+# --- Units of work for multi-step economy commands ---
+# Each command's reads and writes run as a single statement or a single
+# transaction() on the writer, so it costs one round trip and one commit and a
+# transfer can never half-apply. Cached rows are refreshed from RETURNING.
+
+def _credit(conn, user_id: int, amount: int) -> int:
+    return conn.execute("""
+        INSERT INTO users (user_id, balance) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance
+        RETURNING balance
+    """, (user_id, amount)).fetchone()[0]
+
+
+async def work(user_id: int, earnings: int):
+    """Pays out a work shift and bumps the streak. Returns (balance, work_streak)."""
+    rows = await write(ECONOMY_DB, """
+        INSERT INTO users (user_id, balance, work_streak) VALUES (?, ?, 1)
+        ON CONFLICT(user_id) DO UPDATE SET
+            balance = balance + excluded.balance,
+            work_streak = COALESCE(work_streak, 0) + 1
+        RETURNING balance, work_streak
+    """, (user_id, earnings))
+    balance, streak = rows[0]
+    update_cached_user(user_id, balance=balance, work_streak=streak)
+    return balance, streak
+
+
+async def claim_daily(user_id: int, today: str, reward: int):
+    """Credits the daily reward unless it was already claimed on `today`.
+    Returns the new balance, or None if already claimed."""
+    rows = await write(ECONOMY_DB, """
+        INSERT INTO users (user_id, balance, last_daily) VALUES (?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            balance = balance + excluded.balance,
+            last_daily = excluded.last_daily
+        WHERE last_daily IS NOT excluded.last_daily
+        RETURNING balance
+    """, (user_id, reward, today))
+    if not rows:
+        update_cached_user(user_id, last_daily=today)
+        return None
+    update_cached_user(user_id, balance=rows[0][0], last_daily=today)
+    return rows[0][0]
+
+
+async def take_up_to(user_id: int, amount: int) -> int:
+    """Removes up to `amount` LoD without going below zero. Returns how much was taken."""
+    def apply(conn):
+        row = conn.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        taken = max(0, min(amount, row[0] if row else 0))
+        if taken:
+            return taken, _credit(conn, user_id, -taken)
+        return 0, None
+
+    taken, balance = await transaction(ECONOMY_DB, apply)
+    if balance is not None:
+        update_cached_user(user_id, balance=balance)
+    return taken
+
+
+async def transfer(sender_id: int, recipient_id: int, amount: int) -> bool:
+    """Moves LoD between users atomically. Returns False if the sender can't afford it."""
+    def apply(conn):
+        row = conn.execute(
+            "UPDATE users SET balance = balance - ? WHERE user_id = ? AND balance >= ? RETURNING balance",
+            (amount, sender_id, amount)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], _credit(conn, recipient_id, amount)
+
+    result = await transaction(ECONOMY_DB, apply)
+    if result is None:
+        return False
+    update_cached_user(sender_id, balance=result[0])
+    update_cached_user(recipient_id, balance=result[1])
+    return True
+
+
+STEAL_MIN_TARGET_BALANCE = 50
+STEAL_LAMP_FINE = 1000
+
+
+async def steal(thief_id: int, target_id: int):
+    """Resolves a steal attempt in one transaction.
+
+    Returns (outcome, amount) where outcome is "poor", "lamp" (the target's
+    Lamp of Deceit fined the thief and was consumed), "stolen" or "caught".
+    The lamp is looked up in memory; only a target holding one costs a delete."""
+    lamp = buffs.has(target_id, "lamp")
+
+    def apply(conn):
+        row = conn.execute("SELECT balance FROM users WHERE user_id = ?", (target_id,)).fetchone()
+        target_balance = row[0] if row else 0
+        if target_balance < STEAL_MIN_TARGET_BALANCE:
+            return "poor", 0, {}
+
+        # the conditional delete settles two steals racing for the same lamp
+        if lamp and buffs.delete_row(conn, target_id, "lamp"):
+            return "lamp", STEAL_LAMP_FINE, {thief_id: _credit(conn, thief_id, -STEAL_LAMP_FINE)}
+
+        if random.random() < 0.5:
+            stolen = random.randint(20, min(150, target_balance))
+            return "stolen", stolen, {
+                thief_id: _credit(conn, thief_id, stolen),
+                target_id: _credit(conn, target_id, -stolen),
+            }
+        fine = random.randint(30, 100)
+        return "caught", fine, {thief_id: _credit(conn, thief_id, -fine)}
+
+    outcome, amount, balances = await transaction(ECONOMY_DB, apply)
+    if outcome == "lamp":
+        buffs.discard(target_id, "lamp")
+    for user_id, balance in balances.items():
+        update_cached_user(user_id, balance=balance)
+    return outcome, amount
+
+
+async def get_inventory(user_id: int):
+    """Return list of (item_name, quantity) for this user, item_name being the item's full display name."""
+    async with connection(ECONOMY_DB) as db:
+        async with db.execute(
+            "SELECT item_id, quantity FROM inventory WHERE user_id = ? AND quantity > 0", (user_id,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+    return [(items.get(item_id).full_name, quantity) for item_id, quantity in rows if items.get(item_id)]
+
+
+async def get_item(user_id: int, item_name: str) -> int:
+    item = items.lookup(item_name)
+    if item is None:
+        return 0
+    async with connection(ECONOMY_DB) as db:
+        async with db.execute(
+            "SELECT quantity FROM inventory WHERE user_id = ? AND item_id = ?",
+            (user_id, item.item_id),
+        ) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+
+INVENTORY_ADD = """
+    INSERT INTO inventory (user_id, item_id, quantity)
+    VALUES (?, ?, ?)
+    ON CONFLICT(user_id, item_id)
+    DO UPDATE SET quantity = quantity + excluded.quantity
+"""
+
+
+async def add_item(user_id: int, item_name: str, qty: int = 1):
+    item = await items.ensure(item_name)
+    await write(ECONOMY_DB, INVENTORY_ADD, (user_id, item.item_id, qty))
+
+
+def _take_item(conn, user_id: int, item_id: int, qty: int):
+    """Removes qty of an item if the user has that many, deleting the row at zero. Returns what's left, or None."""
+    row = conn.execute("""
+        UPDATE inventory SET quantity = quantity - ?
+        WHERE user_id = ? AND item_id = ? AND quantity >= ?
+        RETURNING quantity
+    """, (qty, user_id, item_id, qty)).fetchone()
+    if row is None:
+        return None
+    if row[0] <= 0:
+        conn.execute("DELETE FROM inventory WHERE user_id = ? AND item_id = ?", (user_id, item_id))
+    return row[0]
+
+
+async def remove_item(user_id: int, item_name: str, qty: int = 1):
+    """Removes qty of an item. Returns the quantity left, or None if the user didn't have qty."""
+    item = items.lookup(item_name)
+    if item is None:
+        return None
+    return await transaction(ECONOMY_DB, lambda conn: _take_item(conn, user_id, item.item_id, qty))
+
+
+async def buy_item(user_id: int, item_name: str, qty: int, unit_price: int, limit: int = None):
+    """
+    Charges qty * unit_price and adds qty of the item in one transaction.
+    `limit` caps how many the user may own. Returns (outcome, balance) with outcome
+    "bought", "poor" (can't afford it) or "limit"; nothing changes unless "bought".
+    """
+    item = await items.ensure(item_name)
+    cost = qty * unit_price
+
+    def apply(conn):
+        if limit is not None:
+            owned = conn.execute(
+                "SELECT quantity FROM inventory WHERE user_id = ? AND item_id = ?", (user_id, item.item_id)
+            ).fetchone()
+            if (owned[0] if owned else 0) + qty > limit:
+                return "limit", None
+        row = conn.execute(
+            "UPDATE users SET balance = balance - ? WHERE user_id = ? AND balance >= ? RETURNING balance",
+            (cost, user_id, cost)
+        ).fetchone()
+        if row is None:
+            return "poor", None
+        conn.execute(INVENTORY_ADD, (user_id, item.item_id, qty))
+        return "bought", row[0]
+
+    outcome, balance = await transaction(ECONOMY_DB, apply)
+    if balance is not None:
+        update_cached_user(user_id, balance=balance)
+    return outcome, balance
+
+
+async def sell_item(user_id: int, item_name: str, qty: int, unit_price: int):
+    """Removes qty of an item and pays qty * unit_price in one transaction. Returns the new balance, or None if the user has fewer than qty."""
+    item = items.lookup(item_name)
+    if item is None:
+        return None
+
+    def apply(conn):
+        if _take_item(conn, user_id, item.item_id, qty) is None:
+            return None
+        return _credit(conn, user_id, qty * unit_price)
+
+    balance = await transaction(ECONOMY_DB, apply)
+    if balance is not None:
+        update_cached_user(user_id, balance=balance)
+    return balance
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import os
+import time
+
+from utils.database import connection, transaction, ECONOMY_DB
+
+# --- Active buffs and protections ---
+# Effects granted by items (Lamp of Deceit, Wizard Wand, Orchid Locket) are kept
+# in memory, keyed by (user_id, type), so commands can ask "does this user have
+# buff X, and what value" without touching the database.
+#
+# Every grant is written through to its table (`protections` for PROTECTION_TYPES,
+# `active_buffs` for the rest) and loaded back at startup. A min-heap of expiry
+# times drives a background task that sleeps until the next effect lapses and
+# then deletes its row, so neither table keeps rows that are already over.
+
+PROTECTION_TYPES = {"lamp"}
+UNTIL_USED = 9999999999999          # duration of protections that last until consumed
+BUFF_EXPIRY_MAX_SLEEP = float(os.getenv("BUFF_EXPIRY_MAX_SLEEP", "3600"))
+
+
+def table_for(buff_type: str) -> str:
+    return "protections" if buff_type in PROTECTION_TYPES else "active_buffs"
+
+
+class BuffService:
+    def __init__(self):
+        self._active = {}   # (user_id, type) -> (value, expires_at)
+        self._heap = []     # (expires_at, user_id, type); stale entries are skipped on pop
+        self._wakeup = None
+        self._expiry_task = None
+
+    def get(self, user_id: int, buff_type: str):
+        """The buff's value if the user has it right now, else None."""
+        entry = self._active.get((user_id, buff_type))
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def has(self, user_id: int, buff_type: str) -> bool:
+        return self.get(user_id, buff_type) is not None
+
+    def _remember(self, user_id: int, buff_type: str, value: float, expires_at: float):
+        if buff_type in PROTECTION_TYPES:
+            # protections has one row per user: a new protection replaces the old one
+            for other in PROTECTION_TYPES:
+                self._active.pop((user_id, other), None)
+        self._active[(user_id, buff_type)] = (value, expires_at)
+        heapq.heappush(self._heap, (expires_at, user_id, buff_type))
+        if self._wakeup is not None and self._heap[0][0] == expires_at:
+            self._wakeup.set()
+
+    async def grant(self, user_id: int, buff_type: str, value: float = 1, seconds: float = UNTIL_USED):
+        """Give the user a buff for `seconds`, replacing any running one of the same type."""
+        expires_at = time.time() + seconds
+
+        def apply(conn):
+            if buff_type in PROTECTION_TYPES:
+                conn.execute(
+                    "INSERT OR REPLACE INTO protections (user_id, type, expires_at) VALUES (?, ?, ?)",
+                    (user_id, buff_type, expires_at)
+                )
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO active_buffs (user_id, type, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (user_id, buff_type, value, expires_at)
+                )
+
+        await transaction(ECONOMY_DB, apply)
+        self._remember(user_id, buff_type, value, expires_at)
+
+    @staticmethod
+    def delete_row(conn, user_id: int, buff_type: str) -> bool:
+        """Delete a live buff row inside the caller's transaction; False if it was already gone.
+        Call discard() once the transaction has committed."""
+        return conn.execute(
+            f"DELETE FROM {table_for(buff_type)} WHERE user_id = ? AND type = ? AND expires_at > ? RETURNING 1",
+            (user_id, buff_type, time.time())
+        ).fetchone() is not None
+
+    def discard(self, user_id: int, buff_type: str):
+        """Forget a buff whose row was deleted (heap entries for it are skipped when they come up)."""
+        self._active.pop((user_id, buff_type), None)
+
+    def __len__(self):
+        now = time.time()
+        return sum(1 for _, expires_at in self._active.values() if expires_at > now)
+
+    # ---------------- Expiry ----------------
+    def _pop_due(self, now: float):
+        """Remove lapsed buffs from memory; returns (table, user_id, type) for each."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, user_id, buff_type = heapq.heappop(heap)
+            entry = self._active.get((user_id, buff_type))
+            if entry is not None and entry[1] == expires_at:
+                del self._active[(user_id, buff_type)]
+                due.append((table_for(buff_type), user_id, buff_type))
+        return due
+
+    async def _delete_lapsed(self, due, now: float):
+        def apply(conn):
+            for table in ("protections", "active_buffs"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE user_id = ? AND type = ? AND expires_at <= ?",
+                    [(user_id, buff_type, now) for t, user_id, buff_type in due if t == table]
+                )
+
+        await transaction(ECONOMY_DB, apply)
+
+    async def _expiry_loop(self):
+        while True:
+            now = time.time()
+            due = self._pop_due(now)
+            if due:
+                try:
+                    await self._delete_lapsed(due, now)
+                except Exception as e:
+                    # the rows are dead either way; the sweep in load() removes them next start
+                    print(f"⚠️ Could not delete {len(due)} expired buffs: {e}")
+
+            delay = self._heap[0][0] - time.time() if self._heap else BUFF_EXPIRY_MAX_SLEEP
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0, min(delay, BUFF_EXPIRY_MAX_SLEEP)))
+            except asyncio.TimeoutError:
+                pass
+
+    # ---------------- Startup / shutdown ----------------
+    async def load(self):
+        """Drop rows that lapsed while offline and load the rest."""
+        now = time.time()
+
+        def apply(conn):
+            conn.execute("DELETE FROM protections WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM active_buffs WHERE expires_at <= ?", (now,))
+
+        await transaction(ECONOMY_DB, apply)
+
+        async with connection(ECONOMY_DB) as db:
+            async with db.execute("SELECT user_id, type, 1, expires_at FROM protections") as cursor:
+                rows = await cursor.fetchall()
+            async with db.execute("SELECT user_id, type, value, expires_at FROM active_buffs") as cursor:
+                rows += await cursor.fetchall()
+
+        for user_id, buff_type, value, expires_at in rows:
+            current = self._active.get((user_id, buff_type))
+            if current is None or current[1] < float(expires_at):
+                self._remember(user_id, buff_type, value, float(expires_at))
+
+        if self._expiry_task is None:
+            self._wakeup = asyncio.Event()
+            self._expiry_task = asyncio.get_running_loop().create_task(self._expiry_loop())
+
+    async def close(self):
+        """Stop the expiry task. Called on bot shutdown."""
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+            self._wakeup = None
+
+
+buffs = BuffService()
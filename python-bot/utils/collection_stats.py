@@ -0,0 +1,97 @@
+from utils.database import connection, transaction, ECONOMY_DB
+from utils.cookie_catalog import BY_RARITY, NAME_TO_RARITY, RARITY_ORDER
+from utils import cookie_store
+
+# --- Per-user collection summary ---
+# collection_stats holds one row per user and rarity: cookies unlocked, stars,
+# ascensions and soulstones summed over the user's stored cookies of that
+# rarity. The gacha and ascend write paths add their deltas with add_deltas()
+# inside the same transaction as the cookie writes, so readers get a user's
+# whole summary from at most one row per rarity instead of scanning every cookie.
+# rebuild() recomputes everything from the stored cookies (backfill / repair).
+
+# cookies per rarity as /cookies lists them (BY_RARITY), the "Y" in "X/Y unlocked"
+RARITY_SIZES = {}
+for _rarity, _ in BY_RARITY:
+    RARITY_SIZES[_rarity] = RARITY_SIZES.get(_rarity, 0) + 1
+
+STATS_UPSERT = """
+    INSERT INTO collection_stats (user_id, rarity, unlocked, stars, ascensions, soulstones)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, rarity) DO UPDATE SET
+        unlocked = unlocked + excluded.unlocked,
+        stars = stars + excluded.stars,
+        ascensions = ascensions + excluded.ascensions,
+        soulstones = soulstones + excluded.soulstones
+"""
+
+
+def add_delta(deltas: dict, cookie_name: str, unlocked: int = 0, stars: int = 0, ascensions: int = 0, soulstones: int = 0):
+    """Accumulate one cookie's change into `deltas` (rarity -> [unlocked, stars, ascensions, soulstones])."""
+    rarity = NAME_TO_RARITY.get(cookie_name)
+    if rarity is None:
+        return  # not in the catalog; rebuild() skips these too
+    totals = deltas.setdefault(rarity, [0, 0, 0, 0])
+    totals[0] += unlocked
+    totals[1] += stars
+    totals[2] += ascensions
+    totals[3] += soulstones
+
+
+def add_deltas(conn, user_id: int, deltas: dict):
+    """Apply accumulated deltas for one user. Runs inside the caller's transaction."""
+    conn.executemany(STATS_UPSERT, [
+        (user_id, rarity, *totals) for rarity, totals in deltas.items() if any(totals)
+    ])
+
+
+async def get_stats(user_id: int) -> dict:
+    """{"rarities": {rarity: (unlocked, total)}, "unlocked", "total", "stars", "ascensions", "soulstones"}."""
+    async with connection(ECONOMY_DB) as db:
+        async with db.execute("""
+            SELECT rarity, unlocked, stars, ascensions, soulstones
+            FROM collection_stats WHERE user_id = ?
+        """, (user_id,)) as cursor:
+            rows = await cursor.fetchall()
+
+    unlocked_by_rarity = {rarity: unlocked for rarity, unlocked, _, _, _ in rows}
+    # only rarities /cookies lists, so "X/Y unlocked" matches the list
+    rarities = {rarity: (unlocked_by_rarity.get(rarity, 0), RARITY_SIZES[rarity]) for rarity in RARITY_ORDER if rarity in RARITY_SIZES}
+    return {
+        "rarities": rarities,
+        "unlocked": sum(unlocked for unlocked, _ in rarities.values()),
+        "total": sum(RARITY_SIZES.values()),
+        "stars": sum(row[2] for row in rows),
+        "ascensions": sum(row[3] for row in rows),
+        "soulstones": sum(row[4] for row in rows),
+    }
+
+
+async def rebuild() -> int:
+    """Recompute collection_stats from the stored cookies in one transaction. Returns the number of rows written."""
+    catalog = list(NAME_TO_RARITY.items())
+
+    def apply_packed(conn):
+        per_user = {}
+        for user_id, name, (soulstones, stars, asc, unlocked) in cookie_store.iter_all(conn):
+            add_delta(per_user.setdefault(user_id, {}), name, unlocked, stars, asc, soulstones)
+        conn.execute("DELETE FROM collection_stats")
+        rows = [(user_id, rarity, *totals) for user_id, deltas in per_user.items() for rarity, totals in deltas.items()]
+        conn.executemany(STATS_UPSERT, rows)
+        return len(rows)
+
+    def apply(conn):
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS cookie_rarity (cookie_name TEXT PRIMARY KEY, rarity TEXT)")
+        conn.execute("DELETE FROM temp.cookie_rarity")
+        conn.executemany("INSERT INTO temp.cookie_rarity (cookie_name, rarity) VALUES (?, ?)", catalog)
+        conn.execute("DELETE FROM collection_stats")
+        written = conn.execute("""
+            INSERT INTO collection_stats (user_id, rarity, unlocked, stars, ascensions, soulstones)
+            SELECT c.user_id, r.rarity, SUM(c.unlocked), SUM(c.stars), SUM(c.ascension_level), SUM(c.soulstones)
+            FROM cookies c JOIN temp.cookie_rarity r ON r.cookie_name = c.cookie_name
+            GROUP BY c.user_id, r.rarity
+        """).rowcount
+        conn.execute("DROP TABLE temp.cookie_rarity")
+        return written
+
+    return await transaction(ECONOMY_DB, apply_packed if cookie_store.PACKED else apply)
@@ -0,0 +1,102 @@
+from utils.gacha_sim import RARITY_POOLS
+
+# --- Cookie catalog, built once at import ---
+# Name lookups, canonical (case-insensitive) names, pre-sorted listings and an
+# n-gram index for autocomplete, so commands never rescan RARITY_POOLS.
+
+# Rarity order rarest -> common, as shown by /cookies
+RARITY_ORDER = [
+    "Ancient",
+    "Awakened",
+    "Beast",
+    "Dragon",
+    "Legendary",
+    "SuperEpic",
+    "Epic",
+    "Rare",
+    "Common"
+]
+
+AUTOCOMPLETE_LIMIT = 25
+NGRAM = 3
+
+NAME_TO_RARITY = {}
+for _rarity, _pool in RARITY_POOLS.items():
+    for _name in _pool:
+        NAME_TO_RARITY.setdefault(_name, _rarity)
+
+LOWER_TO_NAME = {}
+for _name in NAME_TO_RARITY:
+    LOWER_TO_NAME.setdefault(_name.lower(), _name)
+
+# (rarity, name) for every cookie in RARITY_ORDER, names alphabetical within a rarity.
+# Each name once, under its NAME_TO_RARITY rarity, even if a pool lists it twice.
+BY_RARITY = tuple(
+    (rarity, name)
+    for rarity in RARITY_ORDER
+    for name in sorted({n for n in RARITY_POOLS.get(rarity, []) if NAME_TO_RARITY[n] == rarity}, key=str.lower)
+)
+# the same (rarity, name) pairs, alphabetical by name
+BY_ALPHA = tuple(sorted(BY_RARITY, key=lambda entry: entry[1].lower()))
+
+# ---------------- Autocomplete index ----------------
+# Every catalog name gets an id in display order (rarest first, then alphabetical).
+# _grams maps each substring of up to NGRAM characters to the ids containing it;
+# longer queries intersect the postings of their NGRAM-grams and then confirm
+# the substring, so a lookup only touches names that can match.
+
+_rarity_rank = {r: i for i, r in enumerate(RARITY_ORDER)}
+_names = sorted(NAME_TO_RARITY, key=lambda n: (_rarity_rank.get(NAME_TO_RARITY[n], len(RARITY_ORDER)), n.lower()))
+_lower = [n.lower() for n in _names]
+_grams = {}
+for _id, _low in enumerate(_lower):
+    for _size in range(1, NGRAM + 1):
+        for _start in range(len(_low) - _size + 1):
+            _grams.setdefault(_low[_start:_start + _size], set()).add(_id)
+
+
+def rarity_of(name: str):
+    """Rarity of an exact catalog name, or None."""
+    return NAME_TO_RARITY.get(name)
+
+
+def canonical(name: str):
+    """Catalog spelling of a cookie name typed in any case, or None."""
+    return LOWER_TO_NAME.get(name.strip().lower())
+
+
+def is_beast(name: str) -> bool:
+    return NAME_TO_RARITY.get(name) == "Beast"
+
+
+def _match_rank(low: str, query: str) -> int:
+    if low == query:
+        return 0
+    if low.startswith(query):
+        return 1
+    if (" " + query) in low:
+        return 2  # start of a later word, e.g. "vanilla" -> "Pure Vanilla Cookie"
+    return 3
+
+
+def search(query: str, limit: int = AUTOCOMPLETE_LIMIT):
+    """Up to `limit` names containing `query`: exact, prefix and word-prefix matches first."""
+    query = query.strip().lower()
+    if not query:
+        return _names[:limit]
+
+    if len(query) <= NGRAM:
+        candidates = _grams.get(query, ())
+    else:
+        postings = []
+        for start in range(len(query) - NGRAM + 1):
+            ids = _grams.get(query[start:start + NGRAM])
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = set.intersection(*postings)
+        candidates = [i for i in candidates if query in _lower[i]]
+
+    ranked = sorted(candidates, key=lambda i: (_match_rank(_lower[i], query), i))
+    return [_names[i] for i in ranked[:limit]]
@@ -0,0 +1,257 @@
+import json
+import os
+import struct
+
+from utils.database import connection, transaction, ECONOMY_DB
+from utils.cookie_catalog import BY_RARITY, NAME_TO_RARITY
+
+# --- Per-user cookie state storage ---
+# A user's cookies (soulstones, stars, ascension level, unlocked) live in one of
+# two layouts, picked with COOKIE_STORAGE:
+#   "rows"   - the `cookies` table, one row per user and cookie name
+#   "packed" - `cookie_state`, one row per user whose `data` blob holds a fixed
+#              RECORD per cookie at offset (cookie_id - 1) * RECORD.size. Records
+#              past the end of the blob, or all zero, are cookies the user doesn't have.
+# Cookie ids come from `cookie_ids` and never change once assigned (new catalog
+# names are appended), so existing blobs stay valid as the catalog grows.
+# prepare() moves existing data into the configured layout at startup, in
+# either direction, so switching COOKIE_STORAGE is just a restart.
+#
+# load()/save() run inside a caller's transaction; the async fetch_* helpers
+# are the read paths for commands.
+
+COOKIE_STORAGE = os.getenv("COOKIE_STORAGE", "rows").lower()
+PACKED = COOKIE_STORAGE == "packed"
+
+RECORD = struct.Struct("<IBBB")  # soulstones, stars, ascension_level, unlocked
+EMPTY = (0, 0, 0, 0)
+
+_ids = {}    # cookie_name -> cookie_id
+_names = {}  # cookie_id -> cookie_name
+
+ROW_UPSERT = """
+    INSERT INTO cookies (user_id, cookie_name, soulstones, stars, ascension_level, unlocked)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, cookie_name) DO UPDATE SET
+        soulstones = excluded.soulstones,
+        stars = excluded.stars,
+        ascension_level = excluded.ascension_level,
+        unlocked = excluded.unlocked
+"""
+
+# packed layout: the blob plus {cookie_name: last pull time} as JSON, in one row
+PACKED_COLLECTION_QUERY = """
+    SELECT data, (
+        SELECT json_group_object(cookie_name, ts) FROM (
+            SELECT cookie_name, MAX(ts) AS ts FROM (
+                SELECT cookie_name, MAX(timestamp) AS ts FROM recent_pulls WHERE user_id = ?1 GROUP BY cookie_name
+                UNION ALL
+                SELECT cookie_name, last_pulled FROM pull_summary WHERE user_id = ?1
+            )
+            GROUP BY cookie_name
+        )
+    )
+    FROM cookie_state WHERE user_id = ?1
+"""
+
+
+# ---------------- Cookie ids ----------------
+def _assign_ids(conn, names) -> dict:
+    """Make sure every name has a cookie_ids row; returns the full name -> id map."""
+    conn.executemany("INSERT OR IGNORE INTO cookie_ids (cookie_name) VALUES (?)", [(name,) for name in names])
+    return dict(conn.execute("SELECT cookie_name, cookie_id FROM cookie_ids"))
+
+
+def _remember(ids: dict):
+    # only called with maps read from committed transactions
+    _ids.clear()
+    _ids.update(ids)
+    _names.clear()
+    _names.update({cookie_id: name for name, cookie_id in ids.items()})
+
+
+async def ensure_ids(names):
+    """Assign ids to cookie names seen for the first time (packed layout only)."""
+    if not PACKED:
+        return
+    missing = [name for name in names if name not in _ids]
+    if missing:
+        _remember(await transaction(ECONOMY_DB, lambda conn: _assign_ids(conn, missing)))
+
+
+# ---------------- Packed records ----------------
+def _decode(data) -> dict:
+    states = {}
+    for index, record in enumerate(RECORD.iter_unpack(data or b"")):
+        if any(record):
+            name = _names.get(index + 1)
+            if name is not None:
+                states[name] = record
+    return states
+
+
+def _encode(data, states: dict, ids: dict = None) -> bytes:
+    ids = ids or _ids
+    blob = bytearray(data or b"")
+    for name, state in states.items():
+        offset = (ids[name] - 1) * RECORD.size
+        if len(blob) < offset + RECORD.size:
+            blob.extend(bytes(offset + RECORD.size - len(blob)))
+        RECORD.pack_into(blob, offset, *state)
+    return bytes(blob)
+
+
+# ---------------- Transactional access ----------------
+def load(conn, user_id: int, names=None) -> dict:
+    """{cookie_name: (soulstones, stars, ascension, unlocked)} for the cookies the user has, optionally only `names`."""
+    if PACKED:
+        row = conn.execute("SELECT data FROM cookie_state WHERE user_id = ?", (user_id,)).fetchone()
+        states = _decode(row[0] if row else None)
+        if names is not None:
+            states = {name: states[name] for name in names if name in states}
+        return states
+
+    if names is None:
+        rows = conn.execute("""
+            SELECT cookie_name, soulstones, stars, ascension_level, unlocked FROM cookies WHERE user_id = ?
+        """, (user_id,))
+    else:
+        names = list(names)
+        placeholders = ",".join("?" * len(names))
+        rows = conn.execute(f"""
+            SELECT cookie_name, soulstones, stars, ascension_level, unlocked
+            FROM cookies WHERE user_id = ? AND cookie_name IN ({placeholders})
+        """, (user_id, *names))
+    return {name: (soulstones, stars, asc, int(unlocked or 0)) for name, soulstones, stars, asc, unlocked in rows}
+
+
+def save(conn, user_id: int, states: dict):
+    """Write full (soulstones, stars, ascension, unlocked) states for some of a user's cookies."""
+    if not states:
+        return
+    if PACKED:
+        row = conn.execute("SELECT data FROM cookie_state WHERE user_id = ?", (user_id,)).fetchone()
+        conn.execute("""
+            INSERT INTO cookie_state (user_id, data) VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET data = excluded.data
+        """, (user_id, _encode(row[0] if row else None, states)))
+        return
+    conn.executemany(ROW_UPSERT, [(user_id, name, *state) for name, state in states.items()])
+
+
+def iter_all(conn):
+    """Yield (user_id, cookie_name, state) for every stored cookie."""
+    if PACKED:
+        for user_id, data in conn.execute("SELECT user_id, data FROM cookie_state"):
+            for name, state in _decode(data).items():
+                yield user_id, name, state
+        return
+    for user_id, name, *state in conn.execute(
+        "SELECT user_id, cookie_name, soulstones, stars, ascension_level, unlocked FROM cookies"
+    ):
+        yield user_id, name, tuple(state)
+
+
+# ---------------- Reads for commands ----------------
+async def fetch_collection(user_id: int) -> dict:
+    """A user's cookies with their last pull time: {name: {soulstones, stars, ascension, unlocked, recent_ts}}."""
+    collection = {}
+    async with connection(ECONOMY_DB) as db:
+        if PACKED:
+            async with db.execute(PACKED_COLLECTION_QUERY, (user_id,)) as cursor:
+                row = await cursor.fetchone()
+            data, recent = row if row else (None, None)
+            recent = json.loads(recent) if recent else {}
+            rows = [(name, *state, recent.get(name, 0)) for name, state in _decode(data).items()]
+        else:
+            async with db.execute("""
+                WITH recent AS (
+                    SELECT cookie_name, MAX(timestamp) AS ts FROM recent_pulls
+                    WHERE user_id = ?1 GROUP BY cookie_name
+                )
+                SELECT c.cookie_name, c.soulstones, c.stars, c.ascension_level, c.unlocked,
+                       MAX(COALESCE(r.ts, 0), COALESCE(s.last_pulled, 0))
+                FROM cookies c
+                LEFT JOIN recent r ON r.cookie_name = c.cookie_name
+                LEFT JOIN pull_summary s ON s.user_id = c.user_id AND s.cookie_name = c.cookie_name
+                WHERE c.user_id = ?1
+            """, (user_id,)) as cursor:
+                rows = await cursor.fetchall()
+
+    for name, soulstones, stars, asc, unlocked, recent_ts in rows:
+        collection[name] = {
+            "soulstones": soulstones,
+            "stars": stars,
+            "ascension": asc,
+            "unlocked": bool(unlocked),
+            "recent_ts": recent_ts or 0
+        }
+    return collection
+
+
+async def fetch_cookie(user_id: int, cookie_name: str):
+    """(soulstones, stars, ascension, unlocked) for one cookie, or None if the user doesn't have it."""
+    async with connection(ECONOMY_DB) as db:
+        if PACKED:
+            cookie_id = _ids.get(cookie_name)
+            if cookie_id is None:
+                return None
+            async with db.execute(
+                "SELECT substr(data, ?, ?) FROM cookie_state WHERE user_id = ?",
+                ((cookie_id - 1) * RECORD.size + 1, RECORD.size, user_id)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if not row or len(row[0]) < RECORD.size:
+                return None
+            state = RECORD.unpack(row[0])
+            return state if any(state) else None
+
+        async with db.execute("""
+            SELECT soulstones, stars, ascension_level, unlocked
+            FROM cookies WHERE user_id = ? AND cookie_name = ?
+        """, (user_id, cookie_name)) as cursor:
+            row = await cursor.fetchone()
+        return (row[0], row[1], row[2], int(row[3] or 0)) if row else None
+
+
+# ---------------- Startup / migration ----------------
+async def prepare():
+    """Assign catalog ids and migrate stored cookies into the configured layout."""
+    # catalog order first, so ids of a fresh database follow the /cookies listing
+    catalog = [name for _, name in BY_RARITY] + sorted(set(NAME_TO_RARITY) - {name for _, name in BY_RARITY})
+
+    def migrate(conn):
+        if PACKED:
+            stored = [name for (name,) in conn.execute("SELECT DISTINCT cookie_name FROM cookies")]
+            ids = _assign_ids(conn, catalog + stored)
+            per_user = {}
+            for user_id, name, *state in conn.execute(
+                "SELECT user_id, cookie_name, soulstones, stars, ascension_level, unlocked FROM cookies"
+            ):
+                per_user.setdefault(user_id, {})[name] = (state[0] or 0, state[1] or 0, state[2] or 0, int(state[3] or 0))
+            for user_id, states in per_user.items():
+                row = conn.execute("SELECT data FROM cookie_state WHERE user_id = ?", (user_id,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cookie_state (user_id, data) VALUES (?, ?)",
+                    (user_id, _encode(row[0] if row else None, states, ids))
+                )
+            conn.execute("DELETE FROM cookies")
+            return ids, len(per_user)
+
+        ids = _assign_ids(conn, catalog)
+        names = {cookie_id: name for name, cookie_id in ids.items()}
+        users = 0
+        for user_id, data in conn.execute("SELECT user_id, data FROM cookie_state").fetchall():
+            users += 1
+            conn.executemany(ROW_UPSERT, [
+                (user_id, names[index + 1], *record)
+                for index, record in enumerate(RECORD.iter_unpack(data)) if any(record)
+            ])
+        conn.execute("DELETE FROM cookie_state")
+        return ids, users
+
+    ids, users = await transaction(ECONOMY_DB, migrate)
+    _remember(ids)
+    if users:
+        target = "packed cookie_state" if PACKED else "cookies rows"
+        print(f"✅ Migrated {users} users' cookies to {target} (VACUUM reclaims the freed pages).")
@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import os
+import time
+
+from utils.database import transaction, write, connection, ECONOMY_DB
+
+# --- One cooldown service for every cog ---
+# Cooldowns live in memory, keyed by tuples such as ("command", user_id, "work"),
+# ("xp", guild_id, user_id) or ("item", user_id, "Wizard Wand"). A min-heap of
+# expiry times evicts finished cooldowns as time passes, so memory only holds
+# what is actually cooling down and a check never touches disk.
+#
+# Long command cooldowns (daily/work/steal) are also snapshotted write-behind
+# into the `cooldowns` table every COOLDOWN_SNAPSHOT_INTERVAL seconds and on
+# shutdown, and loaded back at startup so restarts don't reset them.
+
+PERSIST_MIN_SECONDS = 300
+COOLDOWN_SNAPSHOT_INTERVAL = float(os.getenv("COOLDOWN_SNAPSHOT_INTERVAL", "30"))
+
+
+def command_key(user_id: int, command_name: str):
+    return ("command", user_id, command_name)
+
+
+def format_remaining(seconds: float) -> str:
+    """"1m 5s" / "42s" style text used in cooldown replies."""
+    minutes, seconds = divmod(int(seconds), 60)
+    if minutes > 0:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+class CooldownService:
+    def __init__(self):
+        self._expires = {}  # key -> expires_at (unix time)
+        self._heap = []     # (expires_at, key); stale entries are skipped on pop
+        self._dirty = {}    # (user_id, command_name) -> last_used, waiting for the next snapshot
+        self._flush_task = None
+
+    def _evict(self, now: float):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            if self._expires.get(key) == expires_at:
+                del self._expires[key]
+
+    def remaining(self, key) -> float:
+        """Seconds left on key's cooldown (0 if it is not cooling down)."""
+        now = time.time()
+        self._evict(now)
+        expires_at = self._expires.get(key)
+        return expires_at - now if expires_at else 0
+
+    def start(self, key, seconds: float, now: float = None):
+        """Put key on cooldown for `seconds`, replacing any running cooldown."""
+        if seconds <= 0:
+            return
+        now = time.time() if now is None else now
+        expires_at = now + seconds
+        self._expires[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+        if key[0] == "command" and seconds >= PERSIST_MIN_SECONDS:
+            self._dirty[(key[1], key[2])] = int(now)
+
+    def check(self, key, seconds: float) -> float:
+        """Starts the cooldown and returns 0 if key is free; otherwise returns the seconds left.
+        A blocked attempt does not reset the cooldown."""
+        remaining = self.remaining(key)
+        if remaining > 0:
+            return remaining
+        self.start(key, seconds)
+        return 0
+
+    async def reset(self, key):
+        """End key's cooldown now. A command cooldown is also dropped from the
+        pending snapshot and deleted from the cooldowns table, so a restart doesn't bring it back."""
+        self._expires.pop(key, None)
+        if key[0] == "command":
+            user_id, name = key[1], key[2]
+            self._dirty.pop((user_id, name), None)
+            await write(
+                ECONOMY_DB, "DELETE FROM cooldowns WHERE user_id = ? AND command_name = ?", (user_id, name)
+            )
+
+    def __len__(self):
+        self._evict(time.time())
+        return len(self._expires)
+
+    # ---------------- Persistence ----------------
+    async def load(self, durations: dict):
+        """Restore persisted command cooldowns named in `durations` (command -> seconds)."""
+        names = [name for name, seconds in durations.items() if seconds >= PERSIST_MIN_SECONDS]
+        if names:
+            now = time.time()
+            placeholders = ",".join("?" * len(names))
+            async with connection(ECONOMY_DB) as db:
+                async with db.execute(
+                    f"SELECT user_id, command_name, last_used FROM cooldowns WHERE command_name IN ({placeholders})",
+                    names
+                ) as cursor:
+                    rows = await cursor.fetchall()
+            for user_id, name, last_used in rows:
+                key = command_key(user_id, name)
+                expires_at = int(last_used) + durations[name]
+                if expires_at > now and self._expires.get(key, 0) < expires_at:
+                    self._expires[key] = expires_at
+                    heapq.heappush(self._heap, (expires_at, key))
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(COOLDOWN_SNAPSHOT_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Cooldown snapshot failed: {e}")
+
+    async def flush(self):
+        """Write every cooldown started since the last snapshot."""
+        if not self._dirty:
+            return
+        rows = [(user_id, name, last_used) for (user_id, name), last_used in self._dirty.items()]
+        self._dirty = {}
+
+        def apply(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO cooldowns (user_id, command_name, last_used) VALUES (?, ?, ?)", rows
+            )
+
+        try:
+            await transaction(ECONOMY_DB, apply)
+        except Exception:
+            # keep them for the next snapshot unless a newer cooldown replaced them or they were reset
+            for user_id, name, last_used in rows:
+                if command_key(user_id, name) in self._expires:
+                    self._dirty.setdefault((user_id, name), last_used)
+            raise
+
+    async def close(self):
+        """Stop the snapshot task and write out anything pending. Called on bot shutdown."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"⚠️ Could not save cooldowns on shutdown: {e}")
+
+
+cooldowns = CooldownService()
@@ -0,0 +1,331 @@
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+# --- Shared SQLite access for every cog ---
+# Cogs used to open a fresh aiosqlite connection (and a fresh thread) for every
+# helper call. This module keeps a small pool of long-lived connections per
+# database file instead; cogs borrow one with `async with connection(DB) as db`.
+
+ECONOMY_DB = "python-bot/data/economy.db"
+LEVELS_DB = "python-bot/data/levels.db"
+CONFESSIONS_DB = "python-bot/data/confessions.db"
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "128"))
+WRITE_BATCH_WINDOW = float(os.getenv("DB_WRITE_BATCH_WINDOW_MS", "5")) / 1000
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+
+# Applied once to every pooled connection when it is opened.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",       # ~16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",     # 128 MB memory-mapped reads
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class ConnectionPool:
+    """A fixed-size pool of persistent aiosqlite connections to one database file."""
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = path
+        self.size = max(1, size)
+        self._idle = asyncio.Queue()
+        self._connections = []
+        self._open_lock = asyncio.Lock()
+        self._closed = False
+
+    async def _open(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        for pragma in PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def acquire(self) -> aiosqlite.Connection:
+        if self._closed:
+            raise RuntimeError(f"Connection pool for {self.path} is closed")
+
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        # Grow the pool lazily up to its size, then wait for a connection to come back.
+        async with self._open_lock:
+            if len(self._connections) < self.size:
+                conn = await self._open()
+                self._connections.append(conn)
+                return conn
+
+        return await self._idle.get()
+
+    async def release(self, conn: aiosqlite.Connection):
+        # Never hand out a connection with a half-finished transaction on it.
+        if conn.in_transaction:
+            try:
+                await conn.rollback()
+            except Exception as e:
+                print(f"⚠️ Rollback failed on pooled connection for {self.path}: {e}")
+
+        if self._closed:
+            await conn.close()
+            return
+        self._idle.put_nowait(conn)
+
+    async def close(self):
+        self._closed = True
+        for conn in self._connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                print(f"⚠️ Could not close connection for {self.path}: {e}")
+        self._connections.clear()
+
+
+_pools = {}
+
+
+def get_pool(path: str) -> ConnectionPool:
+    pool = _pools.get(path)
+    if pool is None:
+        pool = ConnectionPool(path)
+        _pools[path] = pool
+    return pool
+
+
+@asynccontextmanager
+async def connection(path: str):
+    """Borrow a pooled connection for the duration of the block."""
+    pool = get_pool(path)
+    conn = await pool.acquire()
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+async def close_pools():
+    """Close every pooled connection."""
+    for pool in list(_pools.values()):
+        await pool.close()
+    _pools.clear()
+
+
+# --- Single writer with group commit ---
+# All mutations for a database file go through one WriteQueue. A dedicated task
+# collects whatever is queued (up to WRITE_BATCH_SIZE ops, waiting at most
+# WRITE_BATCH_WINDOW for stragglers) and applies it on one writer thread inside a
+# single BEGIN IMMEDIATE transaction, so a burst of commands costs one fsync
+# instead of one per helper call. Each mutation runs under its own SAVEPOINT:
+# a failing mutation is rolled back alone and only its caller sees the error.
+# Callers are resolved only after the batch has committed.
+#
+# Statements that can't run inside a transaction (VACUUM, wal_checkpoint) go
+# through exclusive(): they run alone on the writer thread between two batches.
+
+class WriteQueue:
+    """Serialises and batches every write to one database file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._conn = None  # only ever touched on the writer thread
+        self._task = None
+        self._held = None  # exclusive op found while collecting a batch, run next
+        self._closing = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            cached_statements=CACHED_STATEMENTS,
+            isolation_level=None,  # transactions are managed explicitly below
+            check_same_thread=False,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    async def submit(self, fn, exclusive: bool = False):
+        """Queue fn(conn) to run in the next batch and return its result once committed.
+        With exclusive=True fn runs alone, outside any transaction."""
+        if self._closing:
+            raise RuntimeError(f"Writer for {self.path} is shutting down")
+        loop = asyncio.get_running_loop()
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((fn, future, exclusive))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._held is not None:
+                item, self._held = self._held, None
+            else:
+                item = await self._queue.get()
+            if item is None:
+                break
+            if item[2]:
+                fn, future, _ = item
+                try:
+                    value = await loop.run_in_executor(self._executor, self._apply_exclusive, fn)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(value)
+                continue
+
+            batch = [item]
+            if WRITE_BATCH_WINDOW > 0 and self._queue.qsize() < WRITE_BATCH_SIZE:
+                await asyncio.sleep(WRITE_BATCH_WINDOW)
+
+            stop = False
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                if item[2]:
+                    self._held = item
+                    break
+                batch.append(item)
+
+            try:
+                results = await loop.run_in_executor(self._executor, self._apply, [fn for fn, _, _ in batch])
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+
+            for (_, future, _), (ok, value) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+            if stop:
+                break
+
+    def _apply(self, fns):
+        """Runs on the writer thread: one transaction, one savepoint per mutation."""
+        if self._conn is None:
+            self._conn = self._connect()
+        conn = self._conn
+
+        conn.execute("BEGIN IMMEDIATE")
+        results = []
+        try:
+            for fn in fns:
+                conn.execute("SAVEPOINT mutation")
+                try:
+                    value = fn(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO mutation")
+                    conn.execute("RELEASE mutation")
+                    results.append((False, e))
+                else:
+                    conn.execute("RELEASE mutation")
+                    results.append((True, value))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return [(False, e)] * len(fns)
+        return results
+
+    def _apply_exclusive(self, fn):
+        """Runs on the writer thread with no transaction open (autocommit)."""
+        if self._conn is None:
+            self._conn = self._connect()
+        return fn(self._conn)
+
+    def _close_conn(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        """Flush everything already queued, then stop the writer."""
+        self._closing = True
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close_conn)
+        self._executor.shutdown(wait=True)
+
+
+_writers = {}
+
+
+def get_writer(path: str) -> WriteQueue:
+    writer = _writers.get(path)
+    if writer is None:
+        writer = WriteQueue(path)
+        _writers[path] = writer
+    return writer
+
+
+def _run_statements(statements):
+    def apply(conn):
+        rows = []
+        for sql, params in statements:
+            rows = conn.execute(sql, params).fetchall()
+        return rows
+    return apply
+
+
+async def transaction(path: str, fn):
+    """Run fn(conn) as one unit of work and return its result once committed.
+
+    fn is a plain (sync) function that runs on the writer thread inside the
+    batch's BEGIN IMMEDIATE transaction, so its reads see exactly the rows its
+    writes will change. Raising from fn rolls back everything it did."""
+    return await get_writer(path).submit(fn)
+
+
+async def exclusive(path: str, fn):
+    """Run fn(conn) on the writer thread between batches, outside any transaction.
+    For VACUUM, wal_checkpoint and other statements a transaction would refuse."""
+    return await get_writer(path).submit(fn, exclusive=True)
+
+
+async def write(path: str, sql: str, params=()):
+    """Queue one statement on the writer. Returns its rows (useful with RETURNING)."""
+    return await transaction(path, _run_statements([(sql, params)]))
+
+
+async def write_many(path: str, statements):
+    """Queue several (sql, params) statements that must apply together.
+    Returns the rows of the last statement."""
+    return await transaction(path, _run_statements(list(statements)))
+
+
+async def close_writers():
+    for writer in list(_writers.values()):
+        await writer.close()
+    _writers.clear()
+
+
+async def shutdown():
+    """Drain pending writes and close every connection. Called once on bot shutdown."""
+    await close_writers()
+    await close_pools()
+    print("✅ Database writes flushed and connections closed.")
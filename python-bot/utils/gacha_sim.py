@@ -1,4 +1,4 @@
-import random
+import numpy as np
 
 RARITY_POOLS = {
     "Common": [
@@ -276,31 +276,107 @@ MAX_STARS = {
 }
 
 
-def simulate_gacha(draws: int):
+FULL_COOKIE_CHANCE = 0.2   # 20% chance of full cookie, 80% chance of soulstones (3)
+FULL_COOKIE_SOULSTONES = 20
+SOULSTONE_DROP = 3
+
+_rng = np.random.default_rng()
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(1) weighted sampling, vectorised over N draws."""
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(weights)
+        scaled = weights * n / weights.sum()
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # leftovers are 1.0 up to rounding error; prob/alias already say "keep"
+
+    def sample(self, n: int, rng=None):
+        rng = rng or _rng
+        column = rng.integers(0, len(self.prob), size=n)
+        keep = rng.random(n) < self.prob[column]
+        return np.where(keep, column, self.alias[column])
+
+
+class Banner:
+    """
+    A set of pull rates. Rarity is picked by RARITY_WEIGHTS and the cookie uniformly
+    from its pool, unless `rate_up` gives some cookies extra weight inside their pool
+    (e.g. {"Moonlight Cookie": 3} for a rate-up banner). Both steps are folded into
+    one alias table over every (rarity, cookie) entry, so a pull is a single draw.
+    """
+
+    def __init__(self, rarity_weights=None, pools=None, rate_up=None):
+        rarity_weights = rarity_weights or RARITY_WEIGHTS
+        pools = pools or RARITY_POOLS
+        rate_up = rate_up or {}
+
+        self.rarities = [r for r in rarity_weights if pools.get(r)]
+        self.cookies, self.rarity_index, weights = [], [], []
+        total_rarity_weight = sum(rarity_weights[r] for r in self.rarities)
+        for r_index, rarity in enumerate(self.rarities):
+            pool = pools[rarity]
+            cookie_weights = [rate_up.get(cookie, 1) for cookie in pool]
+            pool_weight = sum(cookie_weights)
+            for cookie, weight in zip(pool, cookie_weights):
+                self.cookies.append(cookie)
+                self.rarity_index.append(r_index)
+                weights.append(rarity_weights[rarity] / total_rarity_weight * weight / pool_weight)
+
+        self.rarity_index = np.asarray(self.rarity_index)
+        self.probabilities = np.asarray(weights)
+        self.table = AliasTable(weights)
+
+    def pull_indices(self, n: int, rng=None):
+        """Raw vectorised pulls: (entry index, soulstones) arrays of length n."""
+        rng = rng or _rng
+        entries = self.table.sample(n, rng)
+        full = rng.random(n) < FULL_COOKIE_CHANCE
+        soulstones = np.where(full, FULL_COOKIE_SOULSTONES, SOULSTONE_DROP)
+        return entries, soulstones
+
+    def pull(self, n: int, rng=None):
+        """N pulls as the list of dicts the gacha command works with."""
+        entries, soulstones = self.pull_indices(n, rng)
+        results = []
+        for entry, stones in zip(entries.tolist(), soulstones.tolist()):
+            cookie = self.cookies[entry]
+            results.append({
+                "rarity": self.rarities[self.rarity_index[entry]],
+                "cookie": cookie,
+                "emoji": COOKIE_EMOJIS.get(cookie, "🍪"),
+                "soulstones": stones,
+                "pull_type": "Full Cookie" if stones == FULL_COOKIE_SOULSTONES else "Soulstones",
+            })
+        return results
+
+
+DEFAULT_BANNER = Banner()
+
+
+def simulate_gacha(draws: int, banner: Banner = DEFAULT_BANNER):
     """Simulates gacha pulls. Returns list of dicts containing cookie data."""
-    results = []
-    for _ in range(draws):
-        rarity = random.choices(list(RARITY_WEIGHTS.keys()), weights=RARITY_WEIGHTS.values(), k=1)[0]
-        cookie = random.choice(RARITY_POOLS[rarity])
-
-        # 20% chance of full cookie, 80% chance of soulstones (3)
-        if random.random() < 0.2:
-            soulstones = 20
-            pull_type = "Full Cookie"
-        else:
-            soulstones = 3
-            pull_type = "Soulstones"
+    return banner.pull(draws)
 
-        emoji = COOKIE_EMOJIS.get(cookie, "🍪")
-        results.append({
-            "rarity": rarity,
-            "cookie": cookie,
-            "emoji": emoji,
-            "soulstones": soulstones,
-            "pull_type": pull_type
-        })
 
-    return results
+def soulstones_to_max() -> int:
+    """
+    Soulstones needed to unlock a cookie and ascend it to 5 stars and A5 (per ASCENSION_COSTS).
+    Every cookie, Beasts included, ascends to A5: /ascend has never enforced MAX_STARS.
+    """
+    return sum(ASCENSION_COSTS.values())
 
 
 def get_ascension_cost(stars: int, ascension: int):
@@ -341,6 +417,22 @@ def get_ascension_cost(stars: int, ascension: int):
     return None
 
 
+def plan_ascension(stars: int, ascension: int, soulstones: int):
+    """
+    Applies every upgrade the soulstones can pay for, in order.
+    Returns (stars, ascension, soulstones) after the last affordable step.
+    """
+    cost = get_ascension_cost(stars, ascension)
+    while cost is not None and soulstones >= cost:
+        soulstones -= cost
+        if stars < 5:
+            stars += 1
+        else:
+            ascension += 1
+        cost = get_ascension_cost(stars, ascension)
+    return stars, ascension, soulstones
+
+
 def generate_ascension_embed(cookie_name, stars, ascension, soulstones_owned):
     """
     Creates an embed-style dict containing:
@@ -400,3 +492,78 @@ def generate_ascension_embed(cookie_name, stars, ascension, soulstones_owned):
         ],
         "color": 0x9b59b6
     }
+
+
+# ---------------- Headless Monte Carlo ----------------
+# python python-bot/utils/gacha_sim.py --pulls 10000000
+# Checks observed drop rates against the configured ones and estimates how many
+# pulls (cutters) it takes to max one specific cookie.
+
+def monte_carlo(pulls: int = 10_000_000, trials: int = 100_000, cookie: str = None,
+                banner: Banner = DEFAULT_BANNER, seed: int = None):
+    import time
+
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    chunk = 1_000_000
+    counts = np.zeros(len(banner.cookies), dtype=np.int64)
+    done = 0
+    while done < pulls:
+        n = min(chunk, pulls - done)
+        entries, _ = banner.pull_indices(n, rng)
+        counts += np.bincount(entries, minlength=len(banner.cookies))
+        done += n
+    elapsed = time.perf_counter() - started
+
+    rarity_counts = np.bincount(banner.rarity_index, weights=counts, minlength=len(banner.rarities))
+    rarity_expected = np.bincount(banner.rarity_index, weights=banner.probabilities, minlength=len(banner.rarities))
+    rates = {
+        rarity: (rarity_counts[i] / pulls, rarity_expected[i])
+        for i, rarity in enumerate(banner.rarities)
+    }
+
+    # Cost to max: each pull hits the cookie with probability p and then drops 3 or 20
+    # soulstones. Draw the drops per trial, find how many hits reach the target, then
+    # the pulls for that many hits are negative-binomial.
+    cookie = cookie or banner.cookies[int(np.argmin(banner.probabilities))]
+    entry = banner.cookies.index(cookie)
+    p = banner.probabilities[entry]
+    target = soulstones_to_max()
+    max_hits = -(-target // SOULSTONE_DROP)
+    drops = np.where(rng.random((trials, max_hits)) < FULL_COOKIE_CHANCE, FULL_COOKIE_SOULSTONES, SOULSTONE_DROP)
+    hits = np.argmax(np.cumsum(drops, axis=1) >= target, axis=1) + 1
+    cost = rng.negative_binomial(hits, p) + hits
+
+    return {
+        "pulls": pulls,
+        "seconds": elapsed,
+        "pulls_per_second": pulls / elapsed if elapsed else float("inf"),
+        "rarity_rates": rates,
+        "cookie": cookie,
+        "soulstones_to_max": target,
+        "pulls_to_max": {
+            "mean": float(cost.mean()),
+            "median": float(np.median(cost)),
+            "p90": float(np.percentile(cost, 90)),
+        },
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monte Carlo check of gacha rates and cost to max a cookie.")
+    parser.add_argument("--pulls", type=int, default=10_000_000)
+    parser.add_argument("--trials", type=int, default=100_000)
+    parser.add_argument("--cookie", default=None, help="cookie to max (default: the rarest one)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    report = monte_carlo(args.pulls, args.trials, args.cookie, seed=args.seed)
+    print(f"{report['pulls']:,} pulls in {report['seconds']:.2f}s ({report['pulls_per_second']:,.0f}/s)")
+    print(f"{'Rarity':<10} {'observed':>9} {'expected':>9}")
+    for rarity, (observed, expected) in report["rarity_rates"].items():
+        print(f"{rarity:<10} {observed:>9.4%} {expected:>9.4%}")
+    cost = report["pulls_to_max"]
+    print(f"Maxing {report['cookie']} ({report['soulstones_to_max']} soulstones): "
+          f"mean {cost['mean']:,.0f} pulls, median {cost['median']:,.0f}, p90 {cost['p90']:,.0f}")
@@ -1,8 +1,8 @@
 import discord
 import random
 import asyncio
-import aiosqlite
 from typing import List, Dict, Optional
+from utils import accounts
 
 CURRENCY = "<:LoD:1411031656055177276>"
 SPECIAL_ROLES = ["Detective", "Healer", "Trickster", "Guardian", "Beast"]
@@ -10,17 +10,13 @@ SPECIAL_ROLES = ["Detective", "Healer", "Trickster", "Guardian", "Beast"]
 CHOICE_TIMEOUT = 180       # 3 minutes
 DISCUSSION_DURATION = 90  # 1 minute and 30 seconds
 VOTE_DURATION = 60         # 1 minutes
-DB_PATH = "python-bot/data/economy.db"
 
 
 # ---------------------------
 # Database helper
 # ---------------------------
 async def add_balance(user_id: int, amount: int):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, 0)", (user_id,))
-        await db.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (amount, user_id))
-        await db.commit()
+    await accounts.add_balance(user_id, amount)
 
 
 # ---------------------------
@@ -1,43 +1,28 @@
 import discord
 import random
 import asyncio
-import aiosqlite
+from utils.database import connection, CONFESSIONS_DB
+from utils import accounts
+from utils import items
+from utils.paginator import LazyPaginator
+from utils.buffs import buffs
 
 # --- This file handles what happens when an item is USED ---
+# /use takes the item out of the inventory before calling an effect.
 
 CURRENCY = "<:LoD:1411031656055177276>"
 
 # Helper to make sure inventory exists
 async def remove_item(user_id: int, item_name: str, qty: int = 1):
-    async with aiosqlite.connect("python-bot/data/economy.db") as db:
-        await db.execute("""
-            UPDATE inventory
-            SET quantity = quantity - ?
-            WHERE user_id = ? AND item_name = ?
-        """, (qty, user_id, item_name))
-        await db.execute("DELETE FROM inventory WHERE quantity <= 0")
-        await db.commit()
+    return await accounts.remove_item(user_id, item_name, qty)
 
 
 # ---------------- Lamp of Deceit ----------------
 async def use_lamp_of_deceit(bot, interaction: discord.Interaction):
     """Protects the user from one /steal attempt."""
     user_id = interaction.user.id
-    await remove_item(user_id, "<:LampOfDeceit:1434966495812653187> Lamp of Deceit")
-
-    async with aiosqlite.connect("python-bot/data/economy.db") as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS protections (
-                user_id INTEGER PRIMARY KEY,
-                type TEXT,
-                expires_at REAL
-            )
-        """)
-        await db.execute("""
-            INSERT OR REPLACE INTO protections (user_id, type, expires_at)
-            VALUES (?, ?, strftime('%s','now') + 9999999999999)
-        """, (user_id, "lamp"))
-        await db.commit()
+
+    await buffs.grant(user_id, "lamp")
 
     gif = "https://cdn.discordapp.com/attachments/1286016432538386587/1435295873864175616/M40215-m40215-battle_idle.gif?ex=690b72f2&is=690a2172&hm=ecd835e7bad537cec4182f8535a325da2c4e09cc966d6a177c5fff9594875802&"
     embed = discord.Embed(
@@ -53,7 +38,6 @@ async def use_lamp_of_deceit(bot, interaction: discord.Interaction):
 async def use_anon_letter(bot, interaction: discord.Interaction):
     """Lets user send an anonymous message to another server member."""
     user = interaction.user
-    await remove_item(user.id, "<:Letter:1434580183595356250> Anon Letter")
 
     # Ask for recipient through modal
     class RecipientModal(discord.ui.Modal, title="📨 Anonymous Letter - Step 1"):
@@ -130,7 +114,6 @@ async def use_anon_letter(bot, interaction: discord.Interaction):
 async def use_wizard_wand(bot, interaction: discord.Interaction):
     """Applies a random temporary buff to the user."""
     user_id = interaction.user.id
-    await remove_item(user_id, "<:Wizard_Wand:1434966466809171988> Wizard Wand")
 
     boosts = [
         ("lod_multiplier", 1.5, 600, "✨ Your Light of Deceit rewards are increased by **1.5x** for 10 minutes!"),
@@ -140,21 +123,7 @@ async def use_wizard_wand(bot, interaction: discord.Interaction):
     chosen = random.choice(boosts)
     boost_type, value, duration, desc = chosen
 
-    async with aiosqlite.connect("python-bot/data/economy.db") as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS active_buffs (
-                user_id INTEGER,
-                type TEXT,
-                value REAL,
-                expires_at REAL,
-                UNIQUE(user_id, type)
-            )
-        """)
-        await db.execute("""
-            INSERT OR REPLACE INTO active_buffs (user_id, type, value, expires_at)
-            VALUES (?, ?, ?, strftime('%s','now') + ?)
-        """, (user_id, boost_type, value, duration))
-        await db.commit()
+    await buffs.grant(user_id, boost_type, value, duration)
 
     embed = discord.Embed(
         title="🪄 Wizard Wand Used",
@@ -168,23 +137,8 @@ async def use_wizard_wand(bot, interaction: discord.Interaction):
 async def use_orchid_locket(bot, interaction: discord.Interaction):
     """Increases Blackjack win chance temporarily."""
     user_id = interaction.user.id
-    await remove_item(user_id, "<:Orchid_Locket:1434580197092491488> Orchid Locket")
-
-    async with aiosqlite.connect("python-bot/data/economy.db") as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS active_buffs (
-                user_id INTEGER,
-                type TEXT,
-                value REAL,
-                expires_at REAL,
-                UNIQUE(user_id, type)
-            )
-        """)
-        await db.execute("""
-            INSERT OR REPLACE INTO active_buffs (user_id, type, value, expires_at)
-            VALUES (?, ?, ?, strftime('%s','now') + ?)
-        """, (user_id, "blackjack_luck", 0.3, 1800))
-        await db.commit()
+
+    await buffs.grant(user_id, "blackjack_luck", 0.3, 1800)
 
     embed = discord.Embed(
         title="💠 Orchid Locket Activated",
@@ -194,68 +148,78 @@ async def use_orchid_locket(bot, interaction: discord.Interaction):
     await interaction.response.send_message(embed=embed)
 
 # ---------------- Forbidden Chronicle ----------------
-async def use_forbidden_chronicle(bot, interaction: discord.Interaction):
-    """Displays confessions from confessions.db in a paginated book view."""
-    user_id = interaction.user.id
-
-    async with aiosqlite.connect("python-bot/data/confessions.db") as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS confessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                confession TEXT,
-                timestamp TEXT
+class ConfessionBook(LazyPaginator):
+    """One confession per page, newest first, read from confessions.db as the pages are flipped.
+
+    Page i is found by keyset from a neighbouring page's id (next/previous
+    confession by id), or from either end of the table when wrapping, so a flip
+    is one indexed lookup however many confessions there are.
+    """
+
+    def __init__(self, total: int, reader_id: int):
+        super().__init__(total, self.render_page, reader_id, timeout=120, denied_message="You can’t flip this book.")
+        self._ids = {}  # page index -> confession id, for the pages still in the render cache
+
+    async def _fetch(self, index: int):
+        if index - 1 in self._ids:
+            query, params = "WHERE id < ? ORDER BY id DESC LIMIT 1", (self._ids[index - 1],)
+        elif index + 1 in self._ids:
+            query, params = "WHERE id > ? ORDER BY id ASC LIMIT 1", (self._ids[index + 1],)
+        elif index == self.page_count - 1:
+            query, params = "ORDER BY id ASC LIMIT 1", ()
+        else:
+            query, params = "ORDER BY id DESC LIMIT 1 OFFSET ?", (index,)
+
+        async with connection(CONFESSIONS_DB) as db:
+            async with db.execute(f"SELECT id, confession, timestamp FROM confessions {query}", params) as cursor:
+                return await cursor.fetchone()
+
+    async def render_page(self, index: int):
+        row = await self._fetch(index)
+        if row is None:
+            return discord.Embed(
+                title=f"📜 Forbidden Chronicle — Page {index + 1}/{self.page_count}",
+                description="*This page has been torn out...*",
+                color=0x8B0000
             )
-        """)
-        async with db.execute("SELECT user_id, confession, timestamp FROM confessions ORDER BY id DESC") as cursor:
-            confessions = await cursor.fetchall()
 
-    if not confessions:
-        return await interaction.response.send_message(
-            "📖 The Forbidden Chronicle is empty... no confessions lie within.",
-            ephemeral=True
-        )
+        confession_id, text, timestamp = row
+        self._ids = {i: cid for i, cid in self._ids.items() if i in self._rendered}
+        self._ids[index] = confession_id
 
-    pages = []
-    for i, (uid, text, timestamp) in enumerate(confessions, start=1):
         embed = discord.Embed(
-            title=f"📜 Forbidden Chronicle — Page {i}/{len(confessions)}",
+            title=f"📜 Forbidden Chronicle — Page {index + 1}/{self.page_count}",
             description=f"**Confession:** {text}",
             color=0x8B0000
         )
         embed.set_footer(text=f"Confessed anonymously • Date: {timestamp}")
-        pages.append(embed)
+        return embed
 
-    class ConfessionBook(discord.ui.View):
-        def __init__(self):
-            super().__init__(timeout=120)
-            self.index = 0
 
-        @discord.ui.button(emoji="<:arrowleft:1433000307452940309>", style=discord.ButtonStyle.secondary)
-        async def left(self, interaction2: discord.Interaction, button: discord.ui.Button):
-            if interaction2.user.id != user_id:
-                return await interaction2.response.send_message("You can’t flip this book.", ephemeral=True)
-            self.index = (self.index - 1) % len(pages)
-            await interaction2.response.edit_message(embed=pages[self.index], view=self)
+async def use_forbidden_chronicle(bot, interaction: discord.Interaction):
+    """Displays confessions from confessions.db in a paginated book view."""
+    user_id = interaction.user.id
 
-        @discord.ui.button(emoji="<:arrowright:1433000252306100294>", style=discord.ButtonStyle.secondary)
-        async def right(self, interaction2: discord.Interaction, button: discord.ui.Button):
-            if interaction2.user.id != user_id:
-                return await interaction2.response.send_message("You can’t flip this book.", ephemeral=True)
-            self.index = (self.index + 1) % len(pages)
-            await interaction2.response.edit_message(embed=pages[self.index], view=self)
+    async with connection(CONFESSIONS_DB) as db:
+        async with db.execute("SELECT COUNT(*) FROM confessions") as cursor:
+            (total,) = await cursor.fetchone()
 
-    view = ConfessionBook()
-    await interaction.response.send_message(embed=pages[0], view=view)
+    if not total:
+        return await interaction.response.send_message(
+            "📖 The Forbidden Chronicle is empty... no confessions lie within.",
+            ephemeral=True
+        )
 
+    view = ConfessionBook(total, user_id)
+    await interaction.response.send_message(embed=await view.page(0), view=view)
 
 
-# --- Item to function mapping ---
-ITEM_EFFECTS = {
-    "<:LampOfDeceit:1434966495812653187> Lamp of Deceit": use_lamp_of_deceit,
-    "<:Letter:1434580183595356250> Anon Letter": use_anon_letter,
-    "<:Wizard_Wand:1434966466809171988> Wizard Wand": use_wizard_wand,
-    "<:Orchid_Locket:1434580197092491488> Orchid Locket": use_orchid_locket,
-    "<:Forbidden_Book:1434966390561050747> Forbidden Chronicle": use_forbidden_chronicle,
 
+# --- Item id to function mapping ---
+ITEM_EFFECTS = {
+    items.LAMP_OF_DECEIT.item_id: use_lamp_of_deceit,
+    items.ANON_LETTER.item_id: use_anon_letter,
+    items.WIZARD_WAND.item_id: use_wizard_wand,
+    items.ORCHID_LOCKET.item_id: use_orchid_locket,
+    items.FORBIDDEN_CHRONICLE.item_id: use_forbidden_chronicle,
 }
@@ -0,0 +1,212 @@
+from utils.database import transaction, ECONOMY_DB
+
+# --- Item registry ---
+# Every item the bot knows, with a stable integer id. Ids are part of the saved
+# data (inventory is keyed by (user_id, item_id)): never renumber or reuse one,
+# only append. Items are stored by id and shown with their emoji + name
+# ("full name", the string the inventory used to be keyed by).
+#
+# Names found in old inventories that aren't listed here are given ids from
+# LEGACY_ID_START up, recorded in the `items` table and registered at startup,
+# so nothing a user owns is lost.
+
+LEGACY_ID_START = 1000
+
+
+class Item:
+    __slots__ = (
+        "item_id", "emoji", "name", "full_name", "category", "price",
+        "shop_description", "description", "cooldown", "consumable", "repeatable"
+    )
+
+    def __init__(self, item_id: int, emoji: str, name: str, category: str = "Misc", price: int = None,
+                 shop_description: str = None, description: str = "No description available.",
+                 cooldown: int = 0, consumable: bool = True, repeatable: bool = True):
+        self.item_id = item_id
+        self.emoji = emoji
+        self.name = name
+        self.full_name = f"{emoji} {name}" if emoji else name
+        self.category = category
+        self.price = price
+        self.shop_description = shop_description
+        self.description = description
+        self.cooldown = cooldown
+        self.consumable = consumable
+        self.repeatable = repeatable
+
+    def __repr__(self):
+        return f"<Item {self.item_id} {self.name}>"
+
+
+DECEITFUL_CUTTER = Item(
+    1, "<:SMC_cutter:1411067252681211996>", "Deceitful Cutter", "Consumables", 300,
+    "Radiates with deceitful energy, it may be used to bring you new cookies. . .",
+    "Radiates with deceitful energy; it may be used to bring you new cookies...",
+)
+LAMP_OF_DECEIT = Item(
+    2, "<:LampOfDeceit:1434966495812653187>", "Lamp of Deceit", "Special", 1000,
+    "A mysterious trinket of faint power. Legends say it protects your light of deceit from getting stolen. . .",
+    "A mysterious trinket of faint power. Activating it summons the Animatronic of Deceit to protect you from theft for a short time.",
+    cooldown=600,
+)
+ENERGY_POTION = Item(
+    3, "<:Energy_Potion:1434966305898893465>", "Energy Potion", "Consumables", 1500,
+    "This potion will cure you and your pet! If you stumbled upon one, you'd be just the luckiest!",
+    "A potion to restore you and your pet's health.",
+)
+ANON_LETTER = Item(
+    4, "<:Letter:1434580183595356250>", "Anon Letter", "Special", 2000,
+    "You want to send a letter to one random cookie without them knowing you? I've got just the right item for you!.",
+    "Send an anonymous message to another user via the bot.",
+)
+ORCHID_LOCKET = Item(
+    5, "<:Orchid_Locket:1434580197092491488>", "Orchid Locket", "Buffs", 2500,
+    "This Orchid Locket is pretty. . . peaceful. Once acquired, your blackjack chances increase to win.",
+    "Increases your odds in Blackjack for a limited time.",
+    cooldown=1800,
+)
+WIZARD_WAND = Item(
+    6, "<:Wizard_Wand:1434966466809171988>", "Wizard Wand", "Buffs", 3500,
+    "Do not underestimate this wand, it will give you random magical boosts once used. . .",
+    "Grants a random temporary buff (search luck, LoD multiplier, etc.).",
+    cooldown=600,
+)
+TRAVELLING_TICKET = Item(
+    7, "<:Travel_Ticket:1434580103081230498>", "Travelling Ticket", "Special", 4000,
+    "This Traveling Ticket will take you to other realms around Beast-Yeast!",
+    "Opens paths to other mysterious realms.",
+)
+FORBIDDEN_CHRONICLE = Item(
+    8, "<:Forbidden_Book:1434966390561050747>", "Forbidden Chronicle", "Special", 5000,
+    "Want in on a tiny little secret? This book includes. . . random confessions from all the cookies using the bot.",
+    "A book containing confessions from other cookies.",
+    consumable=False, repeatable=False,
+)
+OLD_COIN = Item(9, "<:PV_coin:1351245204203634799>", "Old Coin")
+MYSTERIOUS_PORTRAIT = Item(
+    10, "<:Lost_Portrait:1434580123063029860>", "Mysterious Portrait", "Consumables",
+    description="An eerie portrait that hums with quiet power.",
+)
+WIND_GEM = Item(
+    11, "<:Gem:1434993304654581842>", "Wind Gem",
+    description="A gemstone that radiates refreshing energy.",
+)
+
+ITEMS = (
+    DECEITFUL_CUTTER, LAMP_OF_DECEIT, ENERGY_POTION, ANON_LETTER, ORCHID_LOCKET,
+    WIZARD_WAND, TRAVELLING_TICKET, FORBIDDEN_CHRONICLE, OLD_COIN, MYSTERIOUS_PORTRAIT, WIND_GEM,
+)
+
+# shop listing order
+SHOP_ITEMS = tuple(item for item in ITEMS if item.price is not None)
+
+BY_ID = {}
+BY_FULL_NAME = {}
+BY_NAME = {}   # lowercase clean name
+BY_EMOJI = {}
+
+
+def _register(item: Item):
+    BY_ID.setdefault(item.item_id, item)
+    BY_FULL_NAME.setdefault(item.full_name, item)
+    BY_NAME.setdefault(item.name.lower(), item)
+    if item.emoji:
+        BY_EMOJI.setdefault(item.emoji, item)
+
+
+for _item in ITEMS:
+    _register(_item)
+
+
+def parse_full_name(full_name: str):
+    """"<:emoji:id> Clean Name" -> ("<:emoji:id>", "Clean Name"); (None, full_name) without an emoji."""
+    parts = full_name.split(" ", 1)
+    if parts[0].startswith("<") and parts[0].endswith(">"):
+        return parts[0], parts[1] if len(parts) > 1 else parts[0]
+    return None, full_name
+
+
+def get(item_id: int):
+    return BY_ID.get(item_id)
+
+
+def lookup(text: str):
+    """Item for a full stored name, a clean name (any case) or an emoji, or None."""
+    text = text.strip()
+    item = BY_FULL_NAME.get(text) or BY_EMOJI.get(text)
+    if item:
+        return item
+    emoji, name = parse_full_name(text)
+    return BY_NAME.get(name.lower()) or (BY_EMOJI.get(emoji) if emoji else None)
+
+
+def _add_legacy(conn, full_name: str) -> int:
+    row = conn.execute("SELECT item_id FROM items WHERE name = ?", (full_name,)).fetchone()
+    if row:
+        return row[0]
+    return conn.execute("""
+        INSERT INTO items (item_id, name)
+        VALUES (MAX(?, (SELECT COALESCE(MAX(item_id), 0) + 1 FROM items)), ?)
+        RETURNING item_id
+    """, (LEGACY_ID_START, full_name)).fetchone()[0]
+
+
+def _legacy_item(item_id: int, full_name: str) -> Item:
+    emoji, name = parse_full_name(full_name)
+    return Item(item_id, emoji, name)
+
+
+async def ensure(full_name: str) -> Item:
+    """Registered item for a name, recording a new legacy item if nothing matches."""
+    item = lookup(full_name)
+    if item:
+        return item
+    item_id = await transaction(ECONOMY_DB, lambda conn: _add_legacy(conn, full_name))
+    item = _legacy_item(item_id, full_name)
+    _register(item)
+    return item
+
+
+def migrate_inventory(conn) -> int:
+    """Create the inventory table keyed by item id, moving rows over from an
+    inventory keyed by item_name. Runs inside a schema migration (utils/migrations.py).
+    Returns the number of (user, item) rows moved."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(inventory)")]
+    totals = {}
+    if "item_name" in columns:
+        for user_id, item_name, quantity in conn.execute("SELECT user_id, item_name, quantity FROM inventory"):
+            if not quantity or quantity <= 0:
+                continue
+            item = lookup(item_name)
+            item_id = item.item_id if item else _add_legacy(conn, item_name)
+            totals[(user_id, item_id)] = totals.get((user_id, item_id), 0) + quantity
+        conn.execute("ALTER TABLE inventory RENAME TO inventory_by_name")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            user_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, item_id)
+        ) WITHOUT ROWID
+    """)
+    if "item_name" in columns:
+        conn.executemany(
+            "INSERT INTO inventory (user_id, item_id, quantity) VALUES (?, ?, ?)",
+            [(user_id, item_id, quantity) for (user_id, item_id), quantity in totals.items()]
+        )
+        conn.execute("DROP TABLE inventory_by_name")
+    return len(totals)
+
+
+async def prepare():
+    """Record the registry's ids in the items table and register legacy items found there."""
+    def apply(conn):
+        conn.executemany("""
+            INSERT INTO items (item_id, name) VALUES (?, ?)
+            ON CONFLICT(item_id) DO UPDATE SET name = excluded.name
+        """, [(item.item_id, item.full_name) for item in ITEMS])
+        return conn.execute("SELECT item_id, name FROM items WHERE item_id >= ?", (LEGACY_ID_START,)).fetchall()
+
+    for item_id, full_name in await transaction(ECONOMY_DB, apply):
+        _register(_legacy_item(item_id, full_name))
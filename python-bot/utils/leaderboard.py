@@ -0,0 +1,97 @@
+import os
+from bisect import bisect_left, insort
+
+from utils.database import connection, ECONOMY_DB
+
+# --- Live top-K balance leaderboard ---
+# Loaded from SQL once at startup, then kept current by accounts.update_cached_user,
+# which every balance write path already calls with the committed balance.
+# /leaderboard reads it in O(K) without touching the database.
+#
+# Entries are (-balance, user_id) kept sorted, so ties order by user id like the
+# SQL query. Invariant: every user not tracked ranks below every tracked one.
+# A tracked user whose balance drops below the last tracked entry therefore has
+# to be dropped (someone untracked may now outrank them); we keep 2*K entries as
+# slack and only reload from SQL if fewer than K remain.
+
+LEADERBOARD_K = int(os.getenv("LEADERBOARD_K", "10"))
+
+TOP_QUERY = "SELECT user_id, balance FROM users ORDER BY balance DESC, user_id ASC LIMIT ?"
+
+
+class TopBalances:
+    def __init__(self, k: int = LEADERBOARD_K):
+        self.k = k
+        self.capacity = 2 * k
+        self._entries = []      # sorted [(-balance, user_id)]
+        self._balances = {}     # tracked user_id -> balance
+        self._complete = False  # True while every user with a row is tracked
+        self._stale = True      # needs a (re)load from SQL before the next read
+        self._pending = None    # updates seen while a load is in flight
+
+    async def load(self):
+        """(Re)build from SQL. Updates that land during the query are replayed after it."""
+        self._pending = []
+        try:
+            async with connection(ECONOMY_DB) as db:
+                async with db.execute(TOP_QUERY, (self.capacity,)) as cursor:
+                    rows = await cursor.fetchall()
+        except BaseException:
+            self._pending = None
+            raise
+        pending, self._pending = self._pending, None
+
+        self._entries = sorted((-int(balance), user_id) for user_id, balance in rows)
+        self._balances = {user_id: int(balance) for user_id, balance in rows}
+        self._complete = len(rows) < self.capacity
+        self._stale = False
+        for user_id, balance in pending:
+            self.update(user_id, balance)
+
+    def update(self, user_id: int, balance: int):
+        """Record a user's committed balance."""
+        if self._pending is not None:
+            self._pending.append((user_id, balance))
+            return
+        if self._stale:
+            return
+
+        old = self._balances.pop(user_id, None)
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (-old, user_id))]
+
+        key = (-balance, user_id)
+        if self._complete or (self._entries and key < self._entries[-1]):
+            insort(self._entries, key)
+            self._balances[user_id] = balance
+            if len(self._entries) > self.capacity:
+                _, evicted = self._entries.pop()
+                del self._balances[evicted]
+                self._complete = False
+
+        if not self._complete and len(self._entries) < self.k:
+            self._stale = True
+
+    async def top(self, n: int = None):
+        """[(user_id, balance)] for the n (<= K) richest users."""
+        if self._stale:
+            await self.load()
+        n = self.k if n is None else min(n, self.k)
+        return [(user_id, -neg_balance) for neg_balance, user_id in self._entries[:n]]
+
+    async def check_consistency(self) -> list:
+        """Compare the in-memory top K with SQL. Returns a list of mismatch descriptions (empty = consistent)."""
+        mine = await self.top()
+        async with connection(ECONOMY_DB) as db:
+            async with db.execute(TOP_QUERY, (self.k,)) as cursor:
+                expected = [(user_id, int(balance)) for user_id, balance in await cursor.fetchall()]
+        problems = []
+        for rank in range(max(len(mine), len(expected))):
+            got = mine[rank] if rank < len(mine) else None
+            want = expected[rank] if rank < len(expected) else None
+            if got != want:
+                problems.append(f"#{rank + 1}: memory {got} != sql {want}")
+        return problems
+
+
+top_balances = TopBalances()
@@ -0,0 +1,56 @@
+from utils.database import connection, LEVELS_DB
+
+# --- Per-guild leveling configuration snapshot ---
+# LevelingCore.on_message runs for every guild message, so it reads the guild's
+# config (blocked channels, multiplier, level-up message, color, channel and
+# level -> role rewards) from this in-memory snapshot instead of SQLite.
+# Snapshots load lazily on first use; every LevelConfig setter calls
+# invalidate() after committing so the next message reloads it.
+
+DEFAULT_MSG = "<a:SMC_SPARKLES:1435957094598578246> {user} leveled up to **Level {level}**!"
+DEFAULT_COLOR = 0x3498db
+
+_settings = {}     # guild_id -> settings dict
+_generations = {}  # guild_id -> bumped on every invalidate, so a racing load isn't cached
+
+
+async def _load(guild_id: int) -> dict:
+    async with connection(LEVELS_DB) as db:
+        cursor = await db.execute(
+            "SELECT message, attachment_url, xp_multiplier, level_channel_id, embed_color "
+            "FROM level_config WHERE guild_id=?",
+            (guild_id,)
+        )
+        row = await cursor.fetchone()
+        cursor = await db.execute("SELECT level, role_id FROM level_roles WHERE guild_id=?", (guild_id,))
+        roles = {int(level): int(role_id) for level, role_id in await cursor.fetchall()}
+        cursor = await db.execute("SELECT channel_id FROM level_block_channels WHERE guild_id=?", (guild_id,))
+        blocked = frozenset(r[0] for r in await cursor.fetchall())
+
+    message, attachment, multiplier, channel, color = row or (None, None, None, None, None)
+    return {
+        "message": message or DEFAULT_MSG,
+        "attachment": attachment,
+        "multiplier": multiplier if multiplier is not None else 1.0,
+        "channel": channel,
+        "color": color if color is not None else DEFAULT_COLOR,
+        "roles": roles,
+        "blocked": blocked,
+    }
+
+
+async def get_settings(guild_id: int) -> dict:
+    """Cached leveling config for a guild. Do not mutate the result."""
+    settings = _settings.get(guild_id)
+    if settings is None:
+        generation = _generations.get(guild_id, 0)
+        settings = await _load(guild_id)
+        if _generations.get(guild_id, 0) == generation:
+            _settings[guild_id] = settings
+    return settings
+
+
+def invalidate(guild_id: int):
+    """Drop a guild's snapshot after its config changed."""
+    _settings.pop(guild_id, None)
+    _generations[guild_id] = _generations.get(guild_id, 0) + 1
@@ -0,0 +1,257 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from utils.database import transaction, exclusive, ECONOMY_DB, LEVELS_DB, CONFESSIONS_DB
+from utils import pull_history
+
+# --- Scheduled SQLite housekeeping ---
+# Jobs that keep the database files from only ever growing:
+#   sweep      - delete dead rows (old cooldowns, expired protections/buffs,
+#                empty inventory slots) in bounded batches
+#   pulls      - fold old recent_pulls into pull_summary (see utils/pull_history.py)
+#   checkpoint - PRAGMA wal_checkpoint(TRUNCATE) so the WAL files don't stay large
+#   vacuum     - PRAGMA incremental_vacuum on files in auto_vacuum=INCREMENTAL
+#   optimize   - ANALYZE the first time, PRAGMA optimize after that
+#
+# Jobs run only inside MAINTENANCE_WINDOW (UTC hours, e.g. "3-7"; "" = any time),
+# each at most every `interval` seconds. Work is split into transactions of
+# MAINTENANCE_BATCH_SIZE rows or MAINTENANCE_VACUUM_PAGES pages with a pause in
+# between, so commands queued on the writer meanwhile are never held up for long.
+# Every run is printed with its timings; the owner command `maintenance` runs
+# jobs on demand and shows the report.
+#
+# A file only becomes INCREMENTAL through one full VACUUM, which rewrites the
+# whole file on the writer thread (every queued write waits for it) and needs
+# about twice the file size in free disk. The scheduled vacuum job never does
+# that: it reports the file as not converted. The owner converts a file by
+# running `maintenance vacuum` explicitly, at a quiet time.
+# MAINTENANCE_FULL_VACUUM=1 lets the schedule convert as well.
+
+MAINTENANCE_WINDOW = os.getenv("MAINTENANCE_WINDOW", "3-7")
+MAINTENANCE_JOBS = os.getenv("MAINTENANCE_JOBS", "sweep,pulls,checkpoint,vacuum,optimize")
+MAINTENANCE_CHECK_INTERVAL = float(os.getenv("MAINTENANCE_CHECK_INTERVAL", "600"))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "500"))
+MAINTENANCE_BATCH_PAUSE = float(os.getenv("MAINTENANCE_BATCH_PAUSE_MS", "50")) / 1000
+MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", "1000"))
+MAINTENANCE_FULL_VACUUM = os.getenv("MAINTENANCE_FULL_VACUUM", "0") == "1"
+
+# cooldowns rows are only read back while the cooldown runs; the longest (daily) is a day
+COOLDOWN_ROW_RETENTION = float(os.getenv("COOLDOWN_ROW_RETENTION_HOURS", "48")) * 3600
+
+DATABASES = (ECONOMY_DB, LEVELS_DB, CONFESSIONS_DB)
+
+# (label, table, key column(s), condition); conditions may use :now and :cooldown_cutoff
+SWEEPS = (
+    ("cooldowns", "cooldowns", "rowid", "last_used < :cooldown_cutoff"),
+    ("protections", "protections", "rowid", "expires_at <= :now"),
+    ("buffs", "active_buffs", "rowid", "expires_at <= :now"),
+    ("inventory", "inventory", "user_id, item_id", "quantity <= 0"),
+)
+
+
+def _parse_window(text: str):
+    text = text.strip()
+    if not text:
+        return None
+    start, end = (int(part) % 24 for part in text.split("-", 1))
+    return start, end
+
+
+def in_window(now: datetime = None) -> bool:
+    window = _parse_window(MAINTENANCE_WINDOW)
+    if window is None:
+        return True
+    hour = (now or datetime.now(timezone.utc)).hour
+    start, end = window
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+def _existing_databases():
+    return [path for path in DATABASES if os.path.exists(path)]
+
+
+def _db_name(path: str) -> str:
+    return os.path.basename(path)
+
+
+# ---------------- Jobs ----------------
+async def _in_batches(path: str, apply) -> int:
+    """Run apply(conn) -> rows touched as separate transactions until a batch comes back short."""
+    total = 0
+    while True:
+        done = await transaction(path, apply)
+        total += done
+        if done < MAINTENANCE_BATCH_SIZE:
+            return total
+        await asyncio.sleep(MAINTENANCE_BATCH_PAUSE)
+
+
+async def sweep():
+    now = time.time()
+    params = {"now": now, "cooldown_cutoff": now - COOLDOWN_ROW_RETENTION, "limit": MAINTENANCE_BATCH_SIZE}
+    parts = []
+    for label, table, key, condition in SWEEPS:
+        def apply(conn, table=table, key=key, condition=condition):
+            return conn.execute(f"""
+                DELETE FROM {table} WHERE ({key}) IN (
+                    SELECT {key} FROM {table} WHERE {condition} LIMIT :limit
+                )
+            """, params).rowcount
+
+        parts.append(f"{label} {await _in_batches(ECONOMY_DB, apply)}")
+    return "deleted " + ", ".join(parts)
+
+
+async def compact_pulls():
+    total = 0
+    while True:
+        done = await pull_history.compact(limit=MAINTENANCE_BATCH_SIZE)
+        total += done
+        if done < MAINTENANCE_BATCH_SIZE:
+            return f"compacted {total} pulls"
+        await asyncio.sleep(MAINTENANCE_BATCH_PAUSE)
+
+
+async def checkpoint():
+    parts = []
+    for path in _existing_databases():
+        busy, log_pages, done = await exclusive(
+            path, lambda conn: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        )
+        parts.append(f"{_db_name(path)} {done}/{log_pages} pages" + (" (busy)" if busy else ""))
+    return ", ".join(parts)
+
+
+def _pragma(conn, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def _vacuum_step(conn, convert: bool):
+    """One bounded step. Returns (pages freed, state): state is "converted", "not converted" or None."""
+    if _pragma(conn, "auto_vacuum") != 2:
+        if not convert:
+            return 0, "not converted"
+        # auto_vacuum only changes on an empty file or through a full VACUUM
+        before = _pragma(conn, "page_count")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return before - _pragma(conn, "page_count"), "converted"
+
+    free = _pragma(conn, "freelist_count")
+    if free:
+        # execute() would stop after the first page; executescript() runs the pragma to completion
+        conn.executescript(f"PRAGMA incremental_vacuum({MAINTENANCE_VACUUM_PAGES});")
+    return free - _pragma(conn, "freelist_count"), None
+
+
+async def vacuum(convert: bool = MAINTENANCE_FULL_VACUUM):
+    """incremental_vacuum every INCREMENTAL file; with convert, switch the others over first (full VACUUM)."""
+    parts = []
+    for path in _existing_databases():
+        freed = 0
+        while True:
+            pages, state = await exclusive(path, lambda conn: _vacuum_step(conn, convert))
+            freed += pages
+            if state == "converted":
+                parts.append(f"{_db_name(path)} converted to incremental ({pages} pages freed)")
+                break
+            if state == "not converted":
+                parts.append(f"{_db_name(path)} not converted (run `maintenance vacuum` to convert)")
+                break
+            if pages < MAINTENANCE_VACUUM_PAGES:
+                parts.append(f"{_db_name(path)} {freed} pages freed")
+                break
+            await asyncio.sleep(MAINTENANCE_BATCH_PAUSE)
+    return ", ".join(parts)
+
+
+def _optimize(conn):
+    analyzed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    if analyzed:
+        conn.execute("PRAGMA optimize").fetchall()
+        return "optimize"
+    conn.execute("ANALYZE")
+    return "ANALYZE"
+
+
+async def optimize():
+    parts = []
+    for path in _existing_databases():
+        parts.append(f"{_db_name(path)} {await exclusive(path, _optimize)}")
+    return ", ".join(parts)
+
+
+class Job:
+    __slots__ = ("name", "interval", "run", "manual_run", "last_run")
+
+    def __init__(self, name: str, interval: float, run, manual_run=None):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.manual_run = manual_run or run  # used when the owner names the job
+        self.last_run = 0.0
+
+
+JOBS = (
+    Job("sweep", 3600, sweep),
+    Job("pulls", pull_history.PULL_COMPACTION_INTERVAL, compact_pulls),
+    Job("checkpoint", 3600, checkpoint),
+    Job("vacuum", 86400, vacuum, manual_run=lambda: vacuum(convert=True)),
+    Job("optimize", 86400, optimize),
+)
+
+
+# ---------------- Scheduler ----------------
+class MaintenanceScheduler:
+    def __init__(self, jobs=JOBS):
+        enabled = {name.strip() for name in MAINTENANCE_JOBS.split(",")}
+        self.jobs = {job.name: job for job in jobs if job.name in enabled}
+        self.last_report = []  # (job name, seconds, summary or error) of the latest run
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    async def run(self, names=None, manual: bool = False):
+        """Run the named jobs (all enabled ones by default) now, one after another. Returns the report.
+        manual (the owner named the jobs) runs each job's manual_run instead."""
+        jobs = [self.jobs[name] for name in names] if names else list(self.jobs.values())
+        report = []
+        async with self._lock:
+            for job in jobs:
+                started = time.perf_counter()
+                try:
+                    summary = await (job.manual_run if manual else job.run)()
+                except Exception as e:
+                    summary = f"failed: {e}"
+                    print(f"⚠️ Maintenance {job.name} failed: {e}")
+                else:
+                    print(f"🧹 Maintenance {job.name} ({time.perf_counter() - started:.2f}s): {summary}")
+                job.last_run = time.time()
+                report.append((job.name, time.perf_counter() - started, summary))
+        self.last_report = report
+        return report
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(MAINTENANCE_CHECK_INTERVAL)
+            if not in_window():
+                continue
+            now = time.time()
+            due = [job.name for job in self.jobs.values() if now - job.last_run >= job.interval]
+            if due:
+                await self.run(due)
+
+    def start(self):
+        """Start the background schedule (no-op if already running)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def close(self):
+        """Stop the schedule. Called on bot shutdown, before the database closes."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+maintenance = MaintenanceScheduler()
@@ -1,9 +1,8 @@
 import random
 import asyncio
 import discord
-import aiosqlite
+from utils import accounts
 
-DATABASE_PATH = "python-bot/data/economy.db"
 
 class ParticipantStatus:
     def __init__(self, member: discord.Member):
@@ -615,10 +614,7 @@ async def announce_winner(channel, winner):
 
     # Reward 10,000 LoD to winner
     try:
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            await db.execute("INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, 0)", (winner.member.id,))
-            await db.execute("UPDATE users SET balance = balance + 10000 WHERE user_id = ?", (winner.member.id,))
-            await db.commit()
+        await accounts.add_balance(winner.member.id, 10000)
     except Exception as e:
         await channel.send(f"⚠️ Could not update {winner.member.display_name}'s balance: {e}")
 
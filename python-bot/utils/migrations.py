@@ -0,0 +1,321 @@
+import time
+
+from utils.database import connection, transaction, ECONOMY_DB, LEVELS_DB, CONFESSIONS_DB
+from utils import items
+
+# --- Versioned schema migrations ---
+# Every table and index the bot uses is created here, and nowhere else. Each
+# database file records the steps it has applied in `schema_version`; run() is
+# called once at startup, before any cog loads, and applies the missing steps in
+# order, each in its own transaction together with its schema_version row.
+#
+# Steps are append-only: never edit or renumber one that has shipped, add a new
+# step instead. Databases from before this runner start at version 0 with some
+# of the tables already there, so the early steps only create what is missing
+# and add columns older files lack.
+
+DEFAULT_EMBED_COLOR = 0x3498db
+
+
+def _columns(conn, table: str) -> dict:
+    """column name -> declared type ({} if the table doesn't exist)."""
+    return {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn, table: str, column: str, definition: str):
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# ---------------- economy.db ----------------
+def _economy_core(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            balance INTEGER DEFAULT 0,
+            last_daily TEXT DEFAULT '1970-01-01',
+            work_streak INTEGER DEFAULT 0
+        )
+    """)
+    # users created by older versions may lack these
+    _add_column(conn, "users", "last_daily", "TEXT DEFAULT '1970-01-01'")
+    _add_column(conn, "users", "work_streak", "INTEGER DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_balance ON users (balance DESC)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cooldowns (
+            user_id INTEGER,
+            command_name TEXT,
+            last_used INTEGER,
+            PRIMARY KEY(user_id, command_name)
+        )
+    """)
+    # display names for leaderboards (see utils/names.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_names (
+            user_id INTEGER PRIMARY KEY,
+            name TEXT,
+            fetched_at INTEGER
+        )
+    """)
+
+
+def _profile(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS levels (
+            user_id INTEGER PRIMARY KEY,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS badges (
+            user_id INTEGER,
+            badge TEXT,
+            UNIQUE(user_id, badge)
+        )
+    """)
+
+
+def _gacha(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cookies (
+            user_id INTEGER,
+            cookie_name TEXT,
+            soulstones INTEGER DEFAULT 0,
+            stars INTEGER DEFAULT 0,
+            ascension_level INTEGER DEFAULT 0,
+            unlocked INTEGER DEFAULT 0,
+            UNIQUE(user_id, cookie_name)
+        )
+    """)
+    _add_column(conn, "cookies", "unlocked", "INTEGER DEFAULT 0")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS recent_pulls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            cookie_name TEXT,
+            rarity TEXT,
+            soulstones INTEGER,
+            timestamp INTEGER
+        )
+    """)
+    # covers the MAX(timestamp) lookups per user and cookie
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recent_pulls_user_cookie
+        ON recent_pulls (user_id, cookie_name, timestamp)
+    """)
+    # pulls older than the retention window, folded per user and cookie (see utils/pull_history.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pull_summary (
+            user_id INTEGER,
+            cookie_name TEXT,
+            last_pulled INTEGER,
+            total_pulls INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, cookie_name)
+        )
+    """)
+    # per-user, per-rarity collection totals (see utils/collection_stats.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS collection_stats (
+            user_id INTEGER,
+            rarity TEXT,
+            unlocked INTEGER DEFAULT 0,
+            stars INTEGER DEFAULT 0,
+            ascensions INTEGER DEFAULT 0,
+            soulstones INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, rarity)
+        )
+    """)
+
+
+def _packed_cookies(conn):
+    # see utils/cookie_store.py
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cookie_ids (
+            cookie_id INTEGER PRIMARY KEY,
+            cookie_name TEXT UNIQUE NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cookie_state (
+            user_id INTEGER PRIMARY KEY,
+            data BLOB NOT NULL
+        )
+    """)
+
+
+def _item_ids(conn):
+    # see utils/items.py
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS items (
+            item_id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )
+    """)
+    moved = items.migrate_inventory(conn)
+    if moved:
+        return f"moved {moved} inventory rows to item ids"
+
+
+def _buffs(conn):
+    # see utils/buffs.py
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS protections (
+            user_id INTEGER PRIMARY KEY,
+            type TEXT,
+            expires_at REAL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS active_buffs (
+            user_id INTEGER,
+            type TEXT,
+            value REAL,
+            expires_at REAL,
+            UNIQUE(user_id, type)
+        )
+    """)
+
+
+# ---------------- levels.db ----------------
+LEVEL_CONFIG = f"""
+    CREATE TABLE IF NOT EXISTS level_config (
+        guild_id INTEGER PRIMARY KEY,
+        message TEXT,
+        attachment_url TEXT,
+        xp_multiplier REAL DEFAULT 1.0,
+        level_channel_id INTEGER,
+        embed_color INTEGER DEFAULT {DEFAULT_EMBED_COLOR}
+    )
+"""
+
+
+def _leveling(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS leveling (
+            guild_id INTEGER,
+            user_id INTEGER,
+            xp INTEGER,
+            level INTEGER,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """)
+    # per-guild top-N and keyset pages become an index range scan
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_leveling_rank
+        ON leveling (guild_id, level DESC, xp DESC, user_id DESC)
+    """)
+    conn.execute(LEVEL_CONFIG)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS level_roles (
+            guild_id INTEGER,
+            level INTEGER,
+            role_id INTEGER,
+            PRIMARY KEY (guild_id, level)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS level_block_channels (
+            guild_id INTEGER,
+            channel_id INTEGER,
+            PRIMARY KEY (guild_id, channel_id)
+        )
+    """)
+
+
+def _level_config(conn):
+    """Rebuild level_config with one definition.
+
+    Three cogs used to create it differently. LevelingCore's copy was missing
+    a comma, which left out embed_color and gave level_channel_id a default
+    of 0x3498db (so guilds without a level-up channel pointed at a channel
+    that doesn't exist). The config cog's copy gave message a default that
+    hid DEFAULT_MSG. Stored values are kept, except that broken channel default."""
+    columns = _columns(conn, "level_config")
+    broken = "embed_color" not in columns
+    channel = f"NULLIF(level_channel_id, {DEFAULT_EMBED_COLOR})" if broken else "level_channel_id"
+    color = "NULL" if broken else "embed_color"
+
+    conn.execute("ALTER TABLE level_config RENAME TO level_config_old")
+    conn.execute(LEVEL_CONFIG)
+    conn.execute(f"""
+        INSERT INTO level_config (guild_id, message, attachment_url, xp_multiplier, level_channel_id, embed_color)
+        SELECT guild_id, message, attachment_url, xp_multiplier, {channel}, {color} FROM level_config_old
+    """)
+    conn.execute("DROP TABLE level_config_old")
+    if broken:
+        return "repaired level_config (embed_color column, level-up channel default)"
+
+
+# ---------------- confessions.db ----------------
+def _confessions(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS confessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            confession TEXT,
+            timestamp TEXT
+        )
+    """)
+
+
+# database -> ordered (version, description, step); step(conn) may return a note to print
+MIGRATIONS = {
+    ECONOMY_DB: (
+        (1, "users, cooldowns and display names", _economy_core),
+        (2, "profile levels and badges", _profile),
+        (3, "gacha cookies, pulls and collection stats", _gacha),
+        (4, "packed cookie storage", _packed_cookies),
+        (5, "item registry and inventory by item id", _item_ids),
+        (6, "protections and active buffs", _buffs),
+    ),
+    LEVELS_DB: (
+        (1, "leveling, level config, role rewards and blocked channels", _leveling),
+        (2, "one level_config definition", _level_config),
+    ),
+    CONFESSIONS_DB: (
+        (1, "confessions", _confessions),
+    ),
+}
+
+
+async def current_version(path: str) -> int:
+    async with connection(path) as db:
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+        ) as cursor:
+            if await cursor.fetchone() is None:
+                return 0
+        async with db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version") as cursor:
+            return (await cursor.fetchone())[0]
+
+
+async def run():
+    """Bring every database up to its latest schema version. Raises if a step fails."""
+    for path, steps in MIGRATIONS.items():
+        version = await current_version(path)
+        for number, description, step in steps:
+            if number <= version:
+                continue
+
+            def apply(conn, number=number, description=description, step=step):
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT,
+                        applied_at INTEGER
+                    )
+                """)
+                note = step(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (number, description, int(time.time()))
+                )
+                return note
+
+            try:
+                note = await transaction(path, apply)
+            except Exception as e:
+                print(f"❌ Migration {path} v{number} ({description}) failed: {e}")
+                raise
+            print(f"✅ Migrated {path} to v{number}: {description}" + (f" - {note}" if note else ""))
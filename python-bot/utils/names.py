@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import discord
+
+from utils.database import connection, transaction, ECONOMY_DB
+
+# --- Display-name resolution for leaderboards ---
+# Looks names up in the gateway user/member cache first, then in a persistent
+# `user_names` table (entries older than NAME_TTL are ignored), and only then
+# fetches the remaining users from the API, a few at a time. Fetched names are
+# written back to the table so the next leaderboard needs no API calls.
+
+NAME_TTL = 7 * 24 * 3600
+NAME_FETCH_CONCURRENCY = 3
+
+_fetch_semaphore = None  # created on first use, inside the bot's event loop
+
+
+async def _fetch_name(bot, user_id: int):
+    global _fetch_semaphore
+    if _fetch_semaphore is None:
+        _fetch_semaphore = asyncio.Semaphore(NAME_FETCH_CONCURRENCY)
+    async with _fetch_semaphore:
+        try:
+            user = await bot.fetch_user(user_id)
+        except discord.NotFound:
+            return None
+        except discord.HTTPException as e:
+            # discord.py already waits out ordinary rate limits; give up on this one instead of retrying
+            print(f"⚠️ Could not fetch user {user_id}: {e}")
+            return None
+        return user.display_name
+
+
+async def resolve_names(bot, user_ids, guild=None) -> dict:
+    """Map each user id to a display name, falling back to "User <id>"."""
+    names = {}
+    missing = []
+    for user_id in user_ids:
+        user = bot.get_user(user_id) or (guild.get_member(user_id) if guild else None)
+        if user:
+            names[user_id] = user.display_name
+        else:
+            missing.append(user_id)
+
+    if missing:
+        placeholders = ",".join("?" * len(missing))
+        async with connection(ECONOMY_DB) as db:
+            async with db.execute(
+                f"SELECT user_id, name FROM user_names WHERE user_id IN ({placeholders}) AND fetched_at > ?",
+                (*missing, int(time.time()) - NAME_TTL)
+            ) as cursor:
+                for user_id, name in await cursor.fetchall():
+                    names[user_id] = name
+        missing = [user_id for user_id in missing if user_id not in names]
+
+    if missing:
+        fetched = await asyncio.gather(*(_fetch_name(bot, user_id) for user_id in missing))
+        now = int(time.time())
+        rows = [(user_id, name, now) for user_id, name in zip(missing, fetched) if name]
+        for user_id, name, _ in rows:
+            names[user_id] = name
+        if rows:
+            def apply(conn):
+                conn.executemany("INSERT OR REPLACE INTO user_names (user_id, name, fetched_at) VALUES (?, ?, ?)", rows)
+            await transaction(ECONOMY_DB, apply)
+
+    for user_id in user_ids:
+        names.setdefault(user_id, f"User {user_id}")
+    return names
@@ -0,0 +1,78 @@
+import inspect
+from collections import OrderedDict
+
+import discord
+from discord.ui import View, Button
+
+LEFT_ARROW = "<:arrowleft:1433000307452940309>"
+RIGHT_ARROW = "<:arrowright:1433000252306100294>"
+
+# --- Shared left/right paginator ---
+# Pages are rendered only when they are shown: the view holds the page count and
+# a render(index) callback (sync or async) over whatever backs the pages - a
+# sorted entry list, a constant table or a database query - instead of a list of
+# prebuilt embeds. The last PAGE_CACHE_SIZE rendered pages are kept in an LRU so
+# flipping back and forth doesn't re-render them.
+
+PAGE_CACHE_SIZE = 4
+
+
+class LazyPaginator(View):
+    def __init__(self, page_count: int, render, author_id: int = None, *, timeout: float = 180,
+                 wrap: bool = True, denied_message: str = "Only the command invoker may use these buttons."):
+        super().__init__(timeout=timeout)
+        self.page_count = page_count
+        self.render = render
+        self.author_id = author_id
+        self.wrap = wrap
+        self.denied_message = denied_message
+        self.current = 0
+        self._rendered = OrderedDict()  # page index -> embed, least recently shown first
+
+        self.left = Button(style=discord.ButtonStyle.secondary, emoji=LEFT_ARROW)
+        self.left.callback = self.on_left
+        self.add_item(self.left)
+
+        self.right = Button(style=discord.ButtonStyle.secondary, emoji=RIGHT_ARROW)
+        self.right.callback = self.on_right
+        self.add_item(self.right)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.author_id is not None and interaction.user.id != self.author_id:
+            await interaction.response.send_message(self.denied_message, ephemeral=True)
+            return False
+        return True
+
+    async def page(self, index: int) -> discord.Embed:
+        """The embed for page `index`, rendered on first use."""
+        embed = self._rendered.get(index)
+        if embed is not None:
+            self._rendered.move_to_end(index)
+            return embed
+
+        embed = self.render(index)
+        if inspect.isawaitable(embed):
+            embed = await embed
+        self._rendered[index] = embed
+        if len(self._rendered) > PAGE_CACHE_SIZE:
+            self._rendered.popitem(last=False)
+        return embed
+
+    async def on_page_change(self):
+        """Called after `current` moves, before the page is shown. Subclasses rebuild per-page items here."""
+
+    async def go_to(self, interaction: discord.Interaction, index: int):
+        if self.wrap:
+            index %= self.page_count
+        elif not 0 <= index < self.page_count:
+            return await interaction.response.defer()
+
+        self.current = index
+        await self.on_page_change()
+        await interaction.response.edit_message(embed=await self.page(index), view=self)
+
+    async def on_left(self, interaction: discord.Interaction):
+        await self.go_to(interaction, self.current - 1)
+
+    async def on_right(self, interaction: discord.Interaction):
+        await self.go_to(interaction, self.current + 1)
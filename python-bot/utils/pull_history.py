@@ -0,0 +1,57 @@
+import os
+import time
+
+from utils.database import connection, transaction, ECONOMY_DB
+
+# --- recent_pulls retention ---
+# recent_pulls keeps one row per pull only for the last RECENT_PULLS_RETENTION_DAYS.
+# compact() folds anything older into pull_summary (one row per user and cookie
+# with last_pulled / total_pulls) and deletes it, so the table stays bounded
+# while "Last Pulled" and the recent sort stay exact: the latest pull of a
+# cookie is always the max over both tables.
+#
+# compact() is run by the maintenance scheduler (utils/maintenance.py).
+
+RECENT_PULLS_RETENTION_DAYS = float(os.getenv("RECENT_PULLS_RETENTION_DAYS", "30"))
+PULL_COMPACTION_INTERVAL = float(os.getenv("PULL_COMPACTION_INTERVAL", str(6 * 3600)))
+
+
+async def compact(now: float = None, limit: int = None) -> int:
+    """Fold pulls older than the retention window into pull_summary. Returns rows compacted.
+    With `limit`, only the oldest `limit` of them are folded (one bounded batch)."""
+    cutoff = int((now or time.time()) - RECENT_PULLS_RETENTION_DAYS * 86400)
+
+    def apply(conn):
+        # ids grow with time, so the batch is every old pull up to the limit-th one
+        row = conn.execute(
+            "SELECT MAX(id) FROM (SELECT id FROM recent_pulls WHERE timestamp < ? ORDER BY id LIMIT ?)",
+            (cutoff, -1 if limit is None else limit)
+        ).fetchone()
+        if row[0] is None:
+            return 0
+        conn.execute("""
+            INSERT INTO pull_summary (user_id, cookie_name, last_pulled, total_pulls)
+            SELECT user_id, cookie_name, MAX(timestamp), COUNT(*)
+            FROM recent_pulls WHERE id <= ? AND timestamp < ?
+            GROUP BY user_id, cookie_name
+            ON CONFLICT(user_id, cookie_name) DO UPDATE SET
+                last_pulled = MAX(last_pulled, excluded.last_pulled),
+                total_pulls = total_pulls + excluded.total_pulls
+        """, (row[0], cutoff))
+        return conn.execute("DELETE FROM recent_pulls WHERE id <= ? AND timestamp < ?", (row[0], cutoff)).rowcount
+
+    return await transaction(ECONOMY_DB, apply)
+
+
+async def last_pulled(user_id: int, cookie_name: str):
+    """Unix time of the user's latest pull of this cookie, or None."""
+    async with connection(ECONOMY_DB) as db:
+        async with db.execute("""
+            SELECT MAX(ts) FROM (
+                SELECT MAX(timestamp) AS ts FROM recent_pulls WHERE user_id = ? AND cookie_name = ?
+                UNION ALL
+                SELECT last_pulled FROM pull_summary WHERE user_id = ? AND cookie_name = ?
+            )
+        """, (user_id, cookie_name, user_id, cookie_name)) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
@@ -0,0 +1,133 @@
+from bisect import bisect_left, insort
+
+from utils.database import connection, LEVELS_DB
+
+# --- Per-guild rank index for /rank ---
+# Answers "you are #N of M" without a COUNT(*) over the guild. Each guild keeps
+# its members' keys in an order-statistic list: sorted sublists of ~LOAD keys
+# plus a Fenwick tree over the sublist lengths, so finding a key's position is
+# a bisect over sublist maxima, a Fenwick prefix sum and a bisect inside one
+# sublist - O(log n) - and an update touches one sublist.
+#
+# Keys sort in leaderboard order (level DESC, xp DESC, user_id DESC). The index
+# is rebuilt from levels.db when LevelingCore loads and then kept in sync by
+# its XP path, so it already includes XP that hasn't been flushed yet.
+
+LOAD = 256
+
+
+class OrderStatisticList:
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._lists = [keys[i:i + LOAD] for i in range(0, len(keys), LOAD)]
+        self._maxes = [sub[-1] for sub in self._lists]
+        self._len = len(keys)
+        self._rebuild_tree()
+
+    def __len__(self):
+        return self._len
+
+    # ---------------- Fenwick tree over sublist lengths ----------------
+    def _rebuild_tree(self):
+        tree = [len(sub) for sub in self._lists]
+        for i in range(len(tree)):
+            parent = i | (i + 1)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, i, delta):
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i |= i + 1
+
+    def _prefix(self, i):
+        """Total length of the first i sublists."""
+        total = 0
+        while i > 0:
+            total += self._tree[i - 1]
+            i &= i - 1
+        return total
+
+    # ---------------- Operations ----------------
+    def add(self, key):
+        if not self._lists:
+            self._lists, self._maxes, self._len = [[key]], [key], 1
+            self._rebuild_tree()
+            return
+        i = min(bisect_left(self._maxes, key), len(self._lists) - 1)
+        sub = self._lists[i]
+        insort(sub, key)
+        self._maxes[i] = sub[-1]
+        self._len += 1
+        if len(sub) > 2 * LOAD:
+            self._lists[i:i + 1] = [sub[:LOAD], sub[LOAD:]]
+            self._maxes[i:i + 1] = [sub[LOAD - 1], sub[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        sub = self._lists[i]
+        del sub[bisect_left(sub, key)]
+        self._len -= 1
+        if sub:
+            self._maxes[i] = sub[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._lists[i]
+            del self._maxes[i]
+            self._rebuild_tree()
+
+    def index(self, key) -> int:
+        """Number of keys that sort before key."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._lists):
+            return self._len
+        return self._prefix(i) + bisect_left(self._lists[i], key)
+
+
+def _key(user_id: int, level: int, xp: int):
+    return (-level, -xp, -user_id)
+
+
+class GuildRanks:
+    def __init__(self):
+        self._guilds = {}  # guild_id -> OrderStatisticList
+        self._keys = {}    # (guild_id, user_id) -> current key
+
+    async def load(self):
+        """Rebuild every guild's index from levels.db."""
+        async with connection(LEVELS_DB) as db:
+            cursor = await db.execute("SELECT guild_id, user_id, level, xp FROM leveling")
+            rows = await cursor.fetchall()
+        keys = {(guild_id, user_id): _key(user_id, level, xp) for guild_id, user_id, level, xp in rows}
+        per_guild = {}
+        for (guild_id, _), key in keys.items():
+            per_guild.setdefault(guild_id, []).append(key)
+        self._keys = keys
+        self._guilds = {guild_id: OrderStatisticList(guild_keys) for guild_id, guild_keys in per_guild.items()}
+
+    def update(self, guild_id: int, user_id: int, level: int, xp: int):
+        key = _key(user_id, level, xp)
+        old = self._keys.get((guild_id, user_id))
+        if old == key:
+            return
+        ranks = self._guilds.setdefault(guild_id, OrderStatisticList())
+        if old is not None:
+            ranks.remove(old)
+        ranks.add(key)
+        self._keys[(guild_id, user_id)] = key
+
+    def rank(self, guild_id: int, user_id: int):
+        """(rank, member_count) with rank 1 = top, or None if the user has no XP here."""
+        key = self._keys.get((guild_id, user_id))
+        if key is None:
+            return None
+        ranks = self._guilds[guild_id]
+        return ranks.index(key) + 1, len(ranks)
+
+
+guild_ranks = GuildRanks()
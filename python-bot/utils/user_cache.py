@@ -0,0 +1,125 @@
+import os
+import sys
+from collections import OrderedDict
+
+# --- In-process cache of hot per-user rows ---
+# Keys are (table, user_id) tuples, e.g. ("users", 123) or ("levels", 123).
+# Values are small tuples/dicts loaded from SQLite on a miss. Write paths either
+# update an entry in place (when they know the new value, e.g. via RETURNING)
+# or invalidate it, so repeated reads during a burst never touch the database.
+
+USER_CACHE_MAX_BYTES = int(os.getenv("USER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+_MISSING = object()
+
+
+def _sizeof(value) -> int:
+    """Rough memory footprint of a cached value (container + its members)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (tuple, list)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by an approximate byte budget."""
+
+    def __init__(self, max_bytes: int = USER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (value, size)
+        # key -> [loaders in flight, written since load began]
+        self._loading = {}
+
+    def get(self, key, default=None):
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        size = _sizeof(key) + _sizeof(value)
+        self._data[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._data:
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def _mark_written(self, key):
+        loading = self._loading.get(key)
+        if loading is not None:
+            loading[1] = True
+
+    def invalidate(self, key):
+        self._mark_written(key)
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+
+    def update(self, key, fn):
+        """Apply fn(old_value) -> new_value in place, only if the key is cached."""
+        self._mark_written(key)
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING:
+            self.put(key, fn(entry[0]))
+
+    # A read-through load awaits the database, and a write may land meanwhile.
+    # begin_load/finish_load make sure such a load never caches the stale row.
+    def begin_load(self, key):
+        self._loading.setdefault(key, [0, False])[0] += 1
+
+    def finish_load(self, key, value):
+        loading = self._loading[key]
+        loading[0] -= 1
+        if not loading[1]:
+            self.put(key, value)
+        if loading[0] == 0:
+            del self._loading[key]
+
+    def abort_load(self, key):
+        loading = self._loading[key]
+        loading[0] -= 1
+        if loading[0] == 0:
+            del self._loading[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+user_cache = LRUCache()
+
+
+async def read_through(key, loader):
+    """Return the cached value for key, calling `await loader()` on a miss."""
+    value = user_cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    user_cache.begin_load(key)
+    try:
+        value = await loader()
+    except BaseException:
+        user_cache.abort_load(key)
+        raise
+    user_cache.finish_load(key, value)
+    return value